@@ -9,8 +9,10 @@ Hardware:
 - DC Motor for walking
 
 Protocol:
-- Serial communication with RaspberryPi (9600 baud)
+- Serial communication with RaspberryPi (115200 baud)
 - Command format: [COMMAND][ID][VALUE]\n
+- Multi-servo command: M followed by up to MAX_BATCH_SERVOS [ID:2][ANGLE:3] pairs, one OK reply
+- Distance response (DL/DR): 5-byte packet [0xAA, side, mm_hi, mm_lo, XOR]
 */
 
 #include <Wire.h>
@@ -46,7 +48,16 @@ const int KNEE_DOWNR = 150;  // 右足を下ろす
 #define MOTOR_PIN2 6
 
 // Serial communication
-#define BAUD_RATE 9600
+#define BAUD_RATE 115200
+#define MAX_BATCH_SERVOS 8   // "M" command: 1 + 8*5 + '\n' = 42 bytes fits the 64-byte RX buffer
+#define DIST_SYNC_BYTE 0xAA  // Start of binary distance packet
+
+// Simulated ball crossing for unattended tests (armed by "TS" command)
+// Next high-speed monitoring reports SIM_FAR_CM, then SIM_NEAR_CM after SIM_STEP_MS
+#define SIM_FAR_CM 25.0
+#define SIM_NEAR_CM 5.0
+#define SIM_STEP_MS 500
+bool simulateBall = false;
 
 Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver(SERVO_DRIVER_ADDR);
 
@@ -106,6 +117,23 @@ void processCommand() {
       }
       break;
 
+    case 'M': // Multi-servo command: M([ID:2][ANGLE:3]){1..MAX_BATCH_SERVOS}
+      {
+        int count = (cmd.length() - 1) / 5;
+        if (count >= 1 && count <= MAX_BATCH_SERVOS && cmd.length() == 1 + count * 5) {
+          for (int i = 0; i < count; i++) {
+            int pos = 1 + i * 5;
+            int servoId = cmd.substring(pos, pos + 2).toInt();
+            int angle = cmd.substring(pos + 2, pos + 5).toInt();
+            setServo(servoId, angle);
+          }
+          Serial.println("OK");
+        } else {
+          Serial.println("ERR");
+        }
+      }
+      break;
+
     case 'D': // Distance sensor read: DL or DR (Left or Right)
       if (cmd.length() == 2) {
         char side = cmd.charAt(1);
@@ -120,11 +148,17 @@ void processCommand() {
           break;
         }
 
-        // Format: D[VALUE:5] (in mm, e.g., D00125 = 12.5cm)
-        int distanceMM = (int)(distance * 10);
-        char buffer[10];
-        sprintf(buffer, "D%05d", distanceMM);
-        Serial.println(buffer);
+        // Format: 5-byte packet [0xAA, side, mm_hi, mm_lo, mm_hi ^ mm_lo]
+        // (distance in mm, e.g., 0x007D = 12.5cm; no echo is reported as 0)
+        unsigned int distanceMM = distance > 0 ? (unsigned int)(distance * 10) : 0;
+        byte packet[5] = {
+          DIST_SYNC_BYTE,
+          (byte)side,
+          highByte(distanceMM),
+          lowByte(distanceMM),
+          (byte)(highByte(distanceMM) ^ lowByte(distanceMM))
+        };
+        Serial.write(packet, 5);
       } else {
         Serial.println("ERR");
       }
@@ -142,6 +176,16 @@ void processCommand() {
         } else {
           Serial.println("ERR");
         }
+        simulateBall = false;
+      } else {
+        Serial.println("ERR");
+      }
+      break;
+
+    case 'T': // Test command: TS (simulate ball crossing on next monitoring)
+      if (cmd.length() == 2 && cmd.charAt(1) == 'S') {
+        simulateBall = true;
+        Serial.println("OK");
       } else {
         Serial.println("ERR");
       }
@@ -244,6 +288,10 @@ void highSpeedMonitorLeft() {
     float distance = readDistanceLeft();
     unsigned long currentTime = millis() - startTime;
 
+    if (simulateBall) {
+      distance = currentTime < SIM_STEP_MS ? SIM_FAR_CM : SIM_NEAR_CM;
+    }
+
     if (distance > 0 && distance < 400.0) {
       // 移動平均に追加
       distanceBuffer[bufferIndex] = distance;
@@ -311,6 +359,10 @@ void highSpeedMonitorRight() {
     float distance = readDistanceRight();
     unsigned long currentTime = millis() - startTime;
 
+    if (simulateBall) {
+      distance = currentTime < SIM_STEP_MS ? SIM_FAR_CM : SIM_NEAR_CM;
+    }
+
     if (distance > 0 && distance < 400.0) {
       // 移動平均に追加
       distanceBuffer[bufferIndex] = distance;
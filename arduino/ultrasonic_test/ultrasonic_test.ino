@@ -28,7 +28,7 @@ void setup() {
   Serial.println("Mode: Optimized for maximum measurement rate");
   Serial.println("Interval: 60ms (~16.7 Hz)");
   Serial.println("Format: D:<distance_cm>");
-  Serial.println("Ready");
+  Serial.println("Ready");  // test_ultrasonic.pyはこの行を受信して同期する（変更しないこと）
   Serial.println();
 
   lastMeasurementTime = millis();
@@ -3,13 +3,20 @@ Arduino Serial Controller
 Communication with Arduino for servo and sensor control
 """
 
-from typing import Optional
+from typing import Dict, Optional
 import serial
 import logging
 import time
 
 logger = logging.getLogger(__name__)
 
+# Binary distance packet: [SYNC, side, mm_hi, mm_lo, mm_hi ^ mm_lo]
+DISTANCE_SYNC_BYTE = 0xAA
+DISTANCE_PACKET_SIZE = 5
+
+# Max servos per "M" batch command (keeps the line within the Uno's 64-byte RX buffer)
+SERVO_BATCH_MAX = 8
+
 
 class SerialController:
     """
@@ -19,12 +26,15 @@ class SerialController:
     - Send servo commands
     - Receive sensor readings
     - Protocol serialization/deserialization
+
+    Not thread-safe: requests and responses share one UART, so call it from
+    a single thread (e.g. BallBlocker also writes to .serial directly).
     """
 
     def __init__(
         self,
         port: str = "/dev/ttyACM0",
-        baudrate: int = 9600,
+        baudrate: int = 115200,
         timeout: float = 1.0
     ):
         """
@@ -71,6 +81,10 @@ class SerialController:
 
         except Exception as e:
             logger.error(f"Failed to connect to Arduino: {e}")
+            # Close a partially opened port so cleanup() has nothing to do
+            if self.serial:
+                self.serial.close()
+                self.serial = None
             return False
 
     def disconnect(self) -> None:
@@ -123,6 +137,85 @@ class SerialController:
             logger.error(f"Failed to send servo command: {e}")
             return False
 
+    def send_servo_batch(self, commands: Dict[int, float]) -> bool:
+        """
+        Send several servo positions in one framed command per batch.
+
+        One write and one "OK" round-trip per SERVO_BATCH_MAX servos,
+        instead of one per servo with send_servo_command().
+
+        Args:
+            commands: {servo_id (0-15): angle in degrees (0-180)}
+
+        Returns:
+            True if every batch was acknowledged
+        """
+        if not self.is_connected:
+            logger.error("Not connected to Arduino")
+            return False
+
+        items = list(commands.items())
+        success = True
+        try:
+            for start in range(0, len(items), SERVO_BATCH_MAX):
+                # Format command: M([ID:2][ANGLE:3])...
+                command = "M" + "".join(
+                    f"{servo_id:02d}{int(max(0, min(180, angle))):03d}"
+                    for servo_id, angle in items[start:start + SERVO_BATCH_MAX]
+                ) + "\n"
+
+                self.serial.write(command.encode())
+
+                response = self.serial.readline().decode().strip()
+                if response != "OK":
+                    logger.error(f"Servo batch command failed: {response}")
+                    success = False
+
+            return success
+
+        except Exception as e:
+            logger.error(f"Failed to send servo batch command: {e}")
+            return False
+
+    def _read_exact(self, size: int) -> bytes:
+        """
+        Read exactly `size` bytes, looping until data arrives or timeout.
+
+        Args:
+            size: Number of bytes to read
+
+        Returns:
+            Bytes read (shorter than `size` on timeout)
+        """
+        data = b""
+        deadline = time.monotonic() + self.timeout
+
+        while len(data) < size and time.monotonic() < deadline:
+            data += self.serial.read(size - len(data))
+
+        return data
+
+    def _read_packet(self, sync: int, size: int) -> bytes:
+        """
+        Read a fixed-size packet, discarding any bytes before the sync byte.
+
+        Args:
+            sync: Packet start byte
+            size: Packet size in bytes (including sync byte)
+
+        Returns:
+            Packet bytes (shorter than `size` on timeout)
+        """
+        buf = self._read_exact(size)
+        start = buf.find(bytes((sync,)))
+
+        if start < 0:
+            return b""
+        if start > 0:
+            buf = buf[start:] + self._read_exact(start)
+
+        return buf
+
     def read_distance(self, side: str = "L") -> Optional[float]:
         """
         Read ultrasonic distance sensor.
@@ -146,16 +239,19 @@ class SerialController:
             command = f"D{side}\n"
             self.serial.write(command.encode())
 
-            # Read response: D[VALUE:5] (in mm)
-            response = self.serial.readline().decode().strip()
+            # Read response: 5-byte packet (distance in mm)
+            packet = self._read_packet(DISTANCE_SYNC_BYTE, DISTANCE_PACKET_SIZE)
 
-            if response.startswith("D") and len(response) == 6:
-                distance_mm = int(response[1:])
-                distance_cm = distance_mm / 10.0
+            if (
+                len(packet) == DISTANCE_PACKET_SIZE
+                and packet[1] == ord(side)
+                and packet[4] == packet[2] ^ packet[3]
+            ):
+                distance_cm = ((packet[2] << 8) | packet[3]) / 10.0
                 logger.debug(f"Distance ({side}): {distance_cm:.1f} cm")
                 return distance_cm
             else:
-                logger.error(f"Invalid distance response: {response}")
+                logger.error(f"Invalid distance response: {packet!r}")
                 return None
 
         except Exception as e:
@@ -257,8 +353,42 @@ class SerialController:
             logger.error(f"Failed to send block right command: {e}")
             return False
 
+    def simulate_ball_crossing(self) -> bool:
+        """
+        Arm a simulated ball crossing for the next high-speed monitoring.
+
+        The Arduino replaces sensor readings with a synthetic far -> near
+        distance step 500ms into the monitoring window (for unattended tests).
+
+        Returns:
+            True if successful
+        """
+        if not self.is_connected:
+            logger.error("Not connected to Arduino")
+            return False
+
+        try:
+            # Send simulate command: TS
+            command = "TS\n"
+            self.serial.write(command.encode())
+
+            response = self.serial.readline().decode().strip()
+
+            if response == "OK":
+                logger.debug("Simulated ball crossing armed")
+                return True
+            else:
+                logger.error(f"Simulate command failed: {response}")
+                return False
+
+        except Exception as e:
+            logger.error(f"Failed to send simulate command: {e}")
+            return False
+
     def cleanup(self) -> None:
         """Clean up serial connection"""
+        if not self.is_connected:
+            return
         self.disconnect()
 
     def __enter__(self):
@@ -24,17 +24,17 @@ Features:
 import time
 import logging
 from typing import Optional
-from enum import Enum
+from enum import IntEnum
 
 logger = logging.getLogger(__name__)
 
 
-class BallSide(Enum):
+class BallSide(IntEnum):
     """Ball detection side"""
-    LEFT = "left"
-    RIGHT = "right"
-    CENTER = "center"
-    NONE = "none"
+    LEFT = 0
+    RIGHT = 1
+    CENTER = 2
+    NONE = 3
 
 
 class BallBlocker:
@@ -49,6 +49,13 @@ class BallBlocker:
     5. Python monitors serial output for confirmation
     """
 
+    __slots__ = (
+        'serial', 'left_threshold', 'right_threshold', 'monitoring_duration',
+        'is_monitoring', 'blocking_active', 'last_ball_side',
+        'total_detections', 'successful_blocks', 'failed_blocks',
+        '_stats_cache'
+    )
+
     def __init__(
         self,
         serial_controller,
@@ -80,6 +87,9 @@ class BallBlocker:
         self.successful_blocks = 0
         self.failed_blocks = 0
 
+        # Cached get_statistics() result, cleared whenever state changes
+        self._stats_cache = None
+
     def determine_ball_side(
         self,
         ball_x: float,
@@ -98,12 +108,12 @@ class BallBlocker:
         # Normalize to 0.0-1.0
         normalized_x = ball_x / frame_width
 
+        # Center is checked first: the tracked ball spends most frames there
+        if self.left_threshold <= normalized_x <= self.right_threshold:
+            return BallSide.CENTER
         if normalized_x < self.left_threshold:
             return BallSide.LEFT
-        elif normalized_x > self.right_threshold:
-            return BallSide.RIGHT
-        else:
-            return BallSide.CENTER
+        return BallSide.RIGHT
 
     def process_ball_detection(
         self,
@@ -138,7 +148,7 @@ class BallBlocker:
             return False
 
         # Ball detected on left or right side - trigger monitoring
-        logger.info(f"Ball detected on {ball_side.value} side at ({ball_x:.0f}, {ball_y:.0f}), conf: {confidence:.2f}")
+        logger.info(f"Ball detected on {ball_side.name.lower()} side at ({ball_x:.0f}, {ball_y:.0f}), conf: {confidence:.2f}")
         self.total_detections += 1
 
         # Trigger high-speed monitoring on Arduino
@@ -151,6 +161,8 @@ class BallBlocker:
             self.failed_blocks += 1
             logger.warning(f"Blocking failed or no ball crossing detected")
 
+        self._stats_cache = None
+
         return success
 
     def trigger_blocking(self, side: BallSide) -> bool:
@@ -174,11 +186,12 @@ class BallBlocker:
 
         self.is_monitoring = True
         self.last_ball_side = side
+        self._stats_cache = None
 
         try:
             # Send high-speed monitoring command to Arduino
             # Format: HL (left) or HR (right)
-            command = f"H{side.value[0].upper()}\n"
+            command = f"H{side.name[0]}\n"
 
             logger.info(f"Sending high-speed monitoring command: {command.strip()}")
             self.serial.serial.write(command.encode())
@@ -235,11 +248,13 @@ class BallBlocker:
                 )
 
             self.blocking_active = ball_detected
+            self._stats_cache = None
 
             # Wait for servo to complete blocking motion if detected
             if ball_detected:
                 time.sleep(2.5)  # Servo holds for 2 seconds, add buffer
                 self.blocking_active = False
+                self._stats_cache = None
 
             return ball_detected
 
@@ -249,33 +264,42 @@ class BallBlocker:
 
         finally:
             self.is_monitoring = False
+            self._stats_cache = None
 
     def get_statistics(self) -> dict:
         """
         Get blocking statistics.
 
+        The dictionary is cached until the blocker state changes, so callers
+        polling at display rate share one instance and must not modify it.
+
         Returns:
             Dictionary with statistics
         """
+        if self._stats_cache is not None:
+            return self._stats_cache
+
         success_rate = 0.0
         if self.total_detections > 0:
             success_rate = (self.successful_blocks / self.total_detections) * 100
 
-        return {
+        self._stats_cache = {
             "total_detections": self.total_detections,
             "successful_blocks": self.successful_blocks,
             "failed_blocks": self.failed_blocks,
             "success_rate": success_rate,
             "is_monitoring": self.is_monitoring,
             "blocking_active": self.blocking_active,
-            "last_side": self.last_ball_side.value
+            "last_side": self.last_ball_side.name.lower()
         }
+        return self._stats_cache
 
     def reset_statistics(self):
         """Reset statistics counters."""
         self.total_detections = 0
         self.successful_blocks = 0
         self.failed_blocks = 0
+        self._stats_cache = None
         logger.info("Statistics reset")
 
     def cleanup(self):
@@ -284,3 +308,4 @@ class BallBlocker:
         # Reset any active states
         self.is_monitoring = False
         self.blocking_active = False
+        self._stats_cache = None
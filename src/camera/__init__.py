@@ -26,4 +26,6 @@ else:
             from .camera_controller_mock import MockCameraController as CameraController
             logger.warning("Using MockCameraController (fallback)")
 
-__all__ = ["CameraController"]
+from .frame_ring import SharedFrameRing, SharedFrameSlot
+
+__all__ = ["CameraController", "SharedFrameRing", "SharedFrameSlot"]
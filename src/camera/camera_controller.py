@@ -5,6 +5,7 @@ Uses picamera2 library for image capture and processing.
 Target: 30 FPS @ 640x480 resolution
 """
 
+import cv2
 import numpy as np
 import logging
 from typing import Optional, Tuple
@@ -51,7 +52,10 @@ class CameraController:
         resolution: Tuple[int, int] = (640, 480),
         framerate: int = 30,
         sensor_mode: int = 0,
-        debug: bool = False
+        debug: bool = False,
+        pixel_format: str = "RGB888",
+        lores_size: Optional[Tuple[int, int]] = None,
+        buffer_count: int = 6
     ):
         """
         Initialize camera controller.
@@ -61,11 +65,20 @@ class CameraController:
             framerate: Target FPS. Default: 30
             sensor_mode: libcamera sensor mode (0=auto). Default: 0
             debug: Enable debug logging. Default: False
+            pixel_format: "RGB888" or "BGR888" frame layout. Default: "RGB888"
+            lores_size: (width, height) of an ISP-scaled RGB stream for
+                inference, or None to disable. Default: None
+            buffer_count: Number of frame buffers libcamera allocates. More
+                buffers keep the sensor from stalling while a consumer
+                (detection, MJPEG encode) holds frames. Default: 6
         """
         self.resolution = resolution
         self.framerate = framerate
         self.sensor_mode = sensor_mode
         self.debug = debug
+        self.pixel_format = pixel_format
+        self.lores_size = lores_size
+        self.buffer_count = buffer_count
 
         self.picam2: Optional[Picamera2] = None
         self.is_running = False
@@ -87,19 +100,38 @@ class CameraController:
             logger.info("Initializing camera...")
             self.picam2 = Picamera2()
 
-            # Configure main stream
+            # Configure main stream (+ optional lores stream scaled by the ISP)
+            # Note: Pi 4 ISP only supports YUV420 for the lores stream
+            lores = None
+            if self.lores_size is not None:
+                lores = {"format": "YUV420", "size": self.lores_size}
+
             config = self.picam2.create_preview_configuration(
                 main={
-                    "format": "RGB888",
+                    "format": self.pixel_format,
                     "size": self.resolution
                 },
+                lores=lores,
                 controls={
                     "FrameRate": self.framerate
-                }
+                },
+                buffer_count=self.buffer_count
             )
 
             self.picam2.configure(config)
-            logger.info(f"Camera configured: {self.resolution} @ {self.framerate} FPS")
+
+            # libcamera may align the requested lores size; report the real one
+            # so callers comparing lores_size with a model input size fall back
+            # to resizing instead of feeding a wrongly sized frame
+            if self.lores_size is not None:
+                actual = tuple(self.picam2.stream_configuration("lores")["size"])
+                if actual != tuple(self.lores_size):
+                    logger.warning(f"Lores size adjusted by libcamera: "
+                                   f"{tuple(self.lores_size)} -> {actual}")
+                    self.lores_size = actual
+
+            logger.info(f"Camera configured: {self.resolution} @ {self.framerate} FPS, "
+                        f"{self.buffer_count} buffers")
 
             return True
 
@@ -158,7 +190,7 @@ class CameraController:
         Capture a single frame from the camera.
 
         Returns:
-            numpy array (RGB888, shape: height x width x 3) or None on error
+            numpy array (pixel_format, shape: height x width x 3) or None on error
         """
         try:
             if not self.is_running:
@@ -188,6 +220,41 @@ class CameraController:
             logger.error(f"Failed to capture frame: {e}")
             return None
 
+    def capture_frame_and_lores(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Capture a main frame and its ISP-scaled lores frame from one request.
+
+        The YUV420 lores buffer is (height * 3 / 2, stride) with the stride
+        padded past the width, so the converted frame is cropped to lores_size.
+
+        Returns:
+            (main frame, lores RGB frame of lores_size) or (None, None) on error
+        """
+        try:
+            if not self.is_running:
+                logger.warning("Camera not running. Call start() first.")
+                return None, None
+
+            if self.lores_size is None:
+                logger.error("Lores stream not configured (lores_size=None)")
+                return None, None
+
+            request = self.picam2.capture_request()
+            frame = request.make_array("main")
+            lores_yuv = request.make_array("lores")
+            request.release()
+
+            self.frame_count += 1
+
+            # Chroma rows share the padded stride, so converting the whole
+            # buffer is valid; only the columns past the width are garbage
+            lores = cv2.cvtColor(lores_yuv, cv2.COLOR_YUV2RGB_I420)
+            return frame, lores[:, :self.lores_size[0]]
+
+        except Exception as e:
+            logger.error(f"Failed to capture frame: {e}")
+            return None, None
+
     def capture_jpeg(self, filepath: str) -> bool:
         """
         Capture a frame and save as JPEG.
@@ -214,6 +281,37 @@ class CameraController:
             logger.error(f"Failed to save JPEG: {e}")
             return False
 
+    def capture_jpeg_bytes(self, quality: int = 95) -> Optional[bytes]:
+        """
+        Capture a frame and encode it as JPEG in memory (no disk I/O).
+
+        Args:
+            quality: JPEG quality (0-100, same default as cv2.imwrite)
+
+        Returns:
+            JPEG bytes or None on error
+        """
+        try:
+            frame = self.capture_frame()
+            if frame is None:
+                return None
+
+            if self.pixel_format == "BGR888":
+                frame_bgr = frame
+            else:
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+            success, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not success:
+                logger.error("Failed to encode JPEG")
+                return None
+
+            return jpeg.tobytes()
+
+        except Exception as e:
+            logger.error(f"Failed to encode JPEG: {e}")
+            return None
+
     def get_camera_info(self) -> dict:
         """
         Get camera information and capabilities.
@@ -39,7 +39,10 @@ class CameraControllerLibcameraCLI:
         resolution: Tuple[int, int] = (640, 480),
         framerate: int = 30,
         sensor_mode: int = 0,
-        debug: bool = False
+        debug: bool = False,
+        pixel_format: str = "RGB888",
+        lores_size: Optional[Tuple[int, int]] = None,
+        buffer_count: int = 6
     ):
         """
         Initialize camera controller.
@@ -49,11 +52,20 @@ class CameraControllerLibcameraCLI:
             framerate: Target FPS. Default: 30
             sensor_mode: libcamera sensor mode (0=auto). Default: 0
             debug: Enable debug logging. Default: False
+            pixel_format: "RGB888" or "BGR888" frame layout. Default: "RGB888"
+            lores_size: (width, height) of a downscaled RGB frame returned by
+                capture_frame_and_lores(), or None. Default: None
+            buffer_count: Number of frame buffers rpicam-vid/libcamera-vid
+                allocates (--buffer-count). More buffers keep the sensor from
+                stalling while frames are being read out. Default: 6
         """
         self.resolution = resolution
         self.framerate = framerate
         self.sensor_mode = sensor_mode
         self.debug = debug
+        self.pixel_format = pixel_format
+        self.lores_size = lores_size
+        self.buffer_count = buffer_count
         self.camera_cmd: Optional[str] = None  # Will be set in initialize()
 
         self.process: Optional[subprocess.Popen] = None
@@ -66,6 +78,7 @@ class CameraControllerLibcameraCLI:
         self.capture_thread: Optional[threading.Thread] = None
         self.latest_frame: Optional[np.ndarray] = None
         self.frame_lock = threading.Lock()
+        self.frame_ready = threading.Event()  # Set by the capture loop on each new frame
 
         if debug:
             logger.setLevel(logging.DEBUG)
@@ -131,6 +144,7 @@ class CameraControllerLibcameraCLI:
                 "--width", str(width),
                 "--height", str(height),
                 "--framerate", str(self.framerate),
+                "--buffer-count", str(self.buffer_count),
                 "-t", "0",  # Run indefinitely (0 = infinite)
                 "--codec", "yuv420",  # Raw YUV output
                 "-o", "-",  # Output to stdout
@@ -213,15 +227,16 @@ class CameraControllerLibcameraCLI:
                     yuv = np.frombuffer(yuv_data, dtype=np.uint8)
                     yuv = yuv.reshape((height * 3 // 2, width))
 
-                    # Convert to BGR first (OpenCV uses BGR)
-                    bgr = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+                    # Convert directly to the requested channel order
+                    if self.pixel_format == "BGR888":
+                        frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR_I420)
+                    else:
+                        frame = cv2.cvtColor(yuv, cv2.COLOR_YUV2RGB_I420)
 
-                    # Convert to RGB (to match picamera2 API)
-                    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
-
-                    # Update latest frame
+                    # Update latest frame and wake up a waiting capture_frame()
                     with self.frame_lock:
-                        self.latest_frame = rgb
+                        self.latest_frame = frame
+                        self.frame_ready.set()
 
                 except Exception as e:
                     if self.debug:
@@ -265,20 +280,31 @@ class CameraControllerLibcameraCLI:
             logger.error(f"Failed to stop camera: {e}")
             return False
 
-    def capture_frame(self) -> Optional[np.ndarray]:
+    def capture_frame(self, timeout: float = 1.0) -> Optional[np.ndarray]:
         """
         Capture a single frame from the camera.
 
+        Blocks until the capture loop delivers a frame that has not been
+        returned yet, so callers never receive the same frame twice.
+
+        Args:
+            timeout: Maximum time in seconds to wait for a new frame
+
         Returns:
-            numpy array (RGB888, shape: height x width x 3) or None on error
+            numpy array (pixel_format, shape: height x width x 3) or None on error
         """
         try:
             if not self.is_running:
                 logger.warning("Camera not running. Call start() first.")
                 return None
 
+            # Wait for a new frame from the capture loop
+            if not self.frame_ready.wait(timeout):
+                return None
+
             # Get latest frame from buffer
             with self.frame_lock:
+                self.frame_ready.clear()
                 if self.latest_frame is None:
                     return None
                 frame = self.latest_frame.copy()
@@ -302,6 +328,33 @@ class CameraControllerLibcameraCLI:
             logger.error(f"Failed to capture frame: {e}")
             return None
 
+    def capture_frame_and_lores(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Capture a main frame and a downscaled RGB copy for inference.
+
+        libcamera-vid only outputs one stream, so the lores frame is
+        resized on the CPU (API compatibility with the picamera2 controller).
+
+        Returns:
+            (main frame, lores RGB frame of lores_size) or (None, None) on error
+        """
+        if self.lores_size is None:
+            logger.error("Lores stream not configured (lores_size=None)")
+            return None, None
+
+        frame = self.capture_frame()
+        if frame is None:
+            return None, None
+
+        # INTER_NEAREST: ~2x faster than INTER_LINEAR for 640x480 -> 300x300
+        # (INTER_AREA is ~10x slower at this non-integer ratio). The INT8
+        # detector re-quantizes its input, so the accuracy cost is small.
+        lores = cv2.resize(frame, self.lores_size, interpolation=cv2.INTER_NEAREST)
+        if self.pixel_format == "BGR888":
+            lores = cv2.cvtColor(lores, cv2.COLOR_BGR2RGB)
+
+        return frame, lores
+
     def capture_jpeg(self, filepath: str) -> bool:
         """
         Capture a frame and save as JPEG.
@@ -318,7 +371,10 @@ class CameraControllerLibcameraCLI:
                 return False
 
             # Convert RGB to BGR for OpenCV
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            if self.pixel_format == "BGR888":
+                frame_bgr = frame
+            else:
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
 
             success = cv2.imwrite(filepath, frame_bgr)
 
@@ -333,6 +389,37 @@ class CameraControllerLibcameraCLI:
             logger.error(f"Failed to save JPEG: {e}")
             return False
 
+    def capture_jpeg_bytes(self, quality: int = 95) -> Optional[bytes]:
+        """
+        Capture a frame and encode it as JPEG in memory (no disk I/O).
+
+        Args:
+            quality: JPEG quality (0-100, same default as cv2.imwrite)
+
+        Returns:
+            JPEG bytes or None on error
+        """
+        try:
+            frame = self.capture_frame()
+            if frame is None:
+                return None
+
+            if self.pixel_format == "BGR888":
+                frame_bgr = frame
+            else:
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+            success, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not success:
+                logger.error("Failed to encode JPEG")
+                return None
+
+            return jpeg.tobytes()
+
+        except Exception as e:
+            logger.error(f"Failed to encode JPEG: {e}")
+            return None
+
     def get_camera_info(self) -> dict:
         """
         Get camera information and capabilities.
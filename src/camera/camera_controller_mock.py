@@ -25,7 +25,10 @@ class MockCameraController:
         self,
         resolution: Tuple[int, int] = (640, 480),
         framerate: int = 30,
-        debug: bool = False
+        debug: bool = False,
+        pixel_format: str = "RGB888",
+        lores_size: Optional[Tuple[int, int]] = None,
+        buffer_count: int = 6
     ):
         """
         Initialize mock camera controller.
@@ -34,10 +37,16 @@ class MockCameraController:
             resolution: (width, height) tuple
             framerate: Target FPS
             debug: Enable debug logging
+            pixel_format: "RGB888" or "BGR888" frame layout
+            lores_size: (width, height) of the lores RGB frame, or None
+            buffer_count: Accepted for interface compatibility (unused)
         """
         self.resolution = resolution
         self.framerate = framerate
         self.debug = debug
+        self.pixel_format = pixel_format
+        self.lores_size = lores_size
+        self.buffer_count = buffer_count
         self.is_running = False
         self.frame_count = 0
         self.last_fps_check = datetime.now()
@@ -76,9 +85,10 @@ class MockCameraController:
         frame = np.zeros((height, width, 3), dtype=np.uint8)
 
         # Add some pattern/noise
-        frame[:, :, 0] = np.random.randint(50, 100, (height, width))  # R channel
+        r, b = (2, 0) if self.pixel_format == "BGR888" else (0, 2)
+        frame[:, :, r] = np.random.randint(50, 100, (height, width))  # R channel
         frame[:, :, 1] = np.random.randint(100, 150, (height, width))  # G channel
-        frame[:, :, 2] = np.random.randint(150, 200, (height, width))  # B channel
+        frame[:, :, b] = np.random.randint(150, 200, (height, width))  # B channel
 
         self.frame_count += 1
 
@@ -91,6 +101,25 @@ class MockCameraController:
 
         return frame
 
+    def capture_frame_and_lores(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Capture synthetic main frame and lores frame
+
+        Returns:
+            (main frame, lores RGB frame of lores_size) or (None, None)
+        """
+        if self.lores_size is None:
+            return None, None
+
+        frame = self.capture_frame()
+        if frame is None:
+            return None, None
+
+        width, height = self.lores_size
+        lores = np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+
+        return frame, lores
+
     def get_camera_info(self) -> dict:
         """Get mock camera info"""
         return {
@@ -36,7 +36,8 @@ class CameraControllerV4L2:
         framerate: int = 30,
         sensor_mode: int = 0,
         debug: bool = False,
-        device: str = "/dev/video0"
+        device: str = "/dev/video0",
+        pixel_format: str = "RGB888"
     ):
         """
         Initialize camera controller.
@@ -47,12 +48,14 @@ class CameraControllerV4L2:
             sensor_mode: Unused for v4l2 (kept for API compatibility)
             debug: Enable debug logging. Default: False
             device: v4l2 device path. Default: /dev/video0
+            pixel_format: "RGB888" or "BGR888" frame layout. Default: "RGB888"
         """
         self.resolution = resolution
         self.framerate = framerate
         self.sensor_mode = sensor_mode
         self.debug = debug
         self.device = device
+        self.pixel_format = pixel_format
 
         self.cap: Optional[cv2.VideoCapture] = None
         self.is_running = False
@@ -101,6 +104,10 @@ class CameraControllerV4L2:
             # Set framerate
             self.cap.set(cv2.CAP_PROP_FPS, self.framerate)
 
+            # Keep a single driver buffer so read() returns the newest frame
+            # instead of one queued up to ~4 frames (~133 ms at 30 FPS) ago
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
             # Verify settings
             actual_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
             actual_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
@@ -173,7 +180,7 @@ class CameraControllerV4L2:
         Capture a single frame from the camera.
 
         Returns:
-            numpy array (RGB888, shape: height x width x 3) or None on error
+            numpy array (pixel_format, shape: height x width x 3) or None on error
         """
         try:
             if not self.is_running:
@@ -187,7 +194,8 @@ class CameraControllerV4L2:
                 return None
 
             # Convert BGR (OpenCV default) to RGB (picamera2 format)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            if self.pixel_format != "BGR888":
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
             self.frame_count += 1
 
@@ -202,7 +210,7 @@ class CameraControllerV4L2:
 
                 self.last_fps_check = current_time
 
-            return frame_rgb
+            return frame
 
         except Exception as e:
             logger.error(f"Failed to capture frame: {e}")
@@ -224,7 +232,10 @@ class CameraControllerV4L2:
                 return False
 
             # Convert RGB back to BGR for OpenCV imwrite
-            frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            if self.pixel_format == "BGR888":
+                frame_bgr = frame
+            else:
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
 
             success = cv2.imwrite(filepath, frame_bgr)
 
@@ -239,6 +250,37 @@ class CameraControllerV4L2:
             logger.error(f"Failed to save JPEG: {e}")
             return False
 
+    def capture_jpeg_bytes(self, quality: int = 95) -> Optional[bytes]:
+        """
+        Capture a frame and encode it as JPEG in memory (no disk I/O).
+
+        Args:
+            quality: JPEG quality (0-100, same default as cv2.imwrite)
+
+        Returns:
+            JPEG bytes or None on error
+        """
+        try:
+            frame = self.capture_frame()
+            if frame is None:
+                return None
+
+            if self.pixel_format == "BGR888":
+                frame_bgr = frame
+            else:
+                frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+
+            success, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not success:
+                logger.error("Failed to encode JPEG")
+                return None
+
+            return jpeg.tobytes()
+
+        except Exception as e:
+            logger.error(f"Failed to encode JPEG: {e}")
+            return None
+
     def get_camera_info(self) -> dict:
         """
         Get camera information and capabilities.
@@ -260,6 +302,7 @@ class CameraControllerV4L2:
                 "actual_width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
                 "actual_height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
                 "actual_fps": int(self.cap.get(cv2.CAP_PROP_FPS)),
+                "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
             }
 
         except Exception as e:
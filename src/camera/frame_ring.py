@@ -0,0 +1,257 @@
+"""
+Shared-memory frame buffers for passing frames between processes.
+
+A multiprocessing.Queue pickles and copies every frame (~922 KB for a
+640x480x3 frame). SharedFrameRing instead keeps a few frame slots in a
+multiprocessing.shared_memory block: the writer copies each frame into the
+next slot once, and the reader copies the newest one straight into its
+destination (e.g. the TPU input tensor) without pickling.
+
+SharedFrameSlot holds just the latest variable-size encoded frame (JPEG) so
+an MJPEG server can run in its own process.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+# The first 8 bytes of the block hold the sequence number of the last
+# completed write (0 = nothing written yet); the frame slots follow.
+_HEADER_SIZE = 8
+
+
+class SharedFrameRing:
+    """
+    Single-writer ring buffer of fixed-size frames in shared memory.
+
+    The creating process owns the block and must call unlink() when done.
+    Other processes attach with the same name, shape and slot count
+    (pass ring.name, the shape, slots and ring.ready to the child).
+    """
+
+    def __init__(
+        self,
+        shape: Tuple[int, ...],
+        slots: int = 3,
+        dtype=np.uint8,
+        name: Optional[str] = None,
+        ready=None
+    ):
+        """
+        Create a new ring or attach to an existing one.
+
+        Args:
+            shape: Shape of a single frame, e.g. (480, 640, 3)
+            slots: Number of frame slots (3 lets the writer run ahead of a reader)
+            dtype: Frame dtype
+            name: Shared memory name to attach to, or None to create a new block
+            ready: Semaphore released once per written frame (created if None)
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.frame_nbytes = int(np.prod(self.shape)) * self.dtype.itemsize
+
+        self.owner = name is None
+        size = _HEADER_SIZE + self.frame_nbytes * slots
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        self.ready = ready if ready is not None else multiprocessing.Semaphore(0)
+
+        self._seq = np.ndarray((1,), dtype=np.uint64, buffer=self.shm.buf[:_HEADER_SIZE])
+        self._frames = np.ndarray(
+            (slots,) + self.shape, dtype=self.dtype,
+            buffer=self.shm.buf[_HEADER_SIZE:size]
+        )
+        if self.owner:
+            self._seq[0] = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last completed write"""
+        return int(self._seq[0])
+
+    def write(self, frame: np.ndarray) -> int:
+        """
+        Copy a frame into the next slot and signal readers.
+
+        Args:
+            frame: Frame with the ring's shape and dtype
+
+        Returns:
+            Sequence number of the written frame
+        """
+        seq = self.seq + 1
+        np.copyto(self._frames[seq % self.slots], frame)
+        self._seq[0] = seq  # Publish only after the slot is fully written
+        self.ready.release()
+        return seq
+
+    def read_latest(self, dst: np.ndarray, last_seq: int = 0,
+                    timeout: Optional[float] = 1.0) -> Optional[int]:
+        """
+        Copy the newest frame (newer than last_seq) into dst.
+
+        Older unread frames are skipped. A frame whose slot may have been
+        overwritten during the copy (writer lapped the reader) is dropped.
+
+        Args:
+            dst: Destination array (e.g. a view of the TPU input tensor)
+            last_seq: Sequence number of the previously read frame
+            timeout: Seconds to wait for a new frame (None = wait forever)
+
+        Returns:
+            Sequence number of the copied frame, or None on timeout/torn read
+        """
+        while self.seq <= last_seq:
+            if not self.ready.acquire(timeout=timeout):
+                return None
+
+        # Drain pending signals; only the newest frame is used
+        while self.ready.acquire(block=False):
+            pass
+
+        seq = self.seq
+        np.copyto(dst, self._frames[seq % self.slots])
+
+        # The writer reuses this slot after `slots` more writes
+        if self.seq - seq >= self.slots - 1:
+            return None
+        return seq
+
+    def close(self):
+        """Detach from the shared memory block"""
+        # Release the NumPy views before closing the buffer
+        self._seq = None
+        self._frames = None
+        self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory block (owner only, after close())"""
+        if self.owner:
+            self.shm.unlink()
+
+
+# Header of a SharedFrameSlot block: write sequence number, payload length
+# and number of connected readers (clients)
+_SLOT_HEADER_SIZE = 24
+
+
+class SharedFrameSlot:
+    """
+    Latest-frame slot for variable-size encoded frames (e.g. JPEG) in shared memory.
+
+    Offers the same surface as an in-process streaming output (write(),
+    frame, frame_count, wait_for_frame(), clients) so an HTTP server running
+    in another process can serve the frames and the producer can skip
+    encoding while nobody is watching. Instances can be passed as
+    multiprocessing.Process arguments; the child attaches to the same block.
+    """
+
+    def __init__(self, max_bytes: int = 1 << 20, name: Optional[str] = None, condition=None):
+        """
+        Create a new slot or attach to an existing one.
+
+        Args:
+            max_bytes: Largest payload the slot can hold
+            name: Shared memory name to attach to, or None to create a new block
+            condition: multiprocessing.Condition guarding the slot (created if None)
+        """
+        self.max_bytes = max_bytes
+        self.owner = name is None
+        size = _SLOT_HEADER_SIZE + max_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=self.owner, size=size)
+        # A spawn-context lock stays reachable by name from both forked and spawned children
+        self.condition = condition if condition is not None else multiprocessing.get_context('spawn').Condition()
+
+        self._header = np.ndarray((3,), dtype=np.uint64, buffer=self.shm.buf[:_SLOT_HEADER_SIZE])
+        self._data = self.shm.buf[_SLOT_HEADER_SIZE:size]
+        if self.owner:
+            self._header[:] = 0
+
+    def __reduce__(self):
+        # Pickled (e.g. into a spawned process) as an attachment to the same block
+        return (self.__class__, (self.max_bytes, self.shm.name, self.condition))
+
+    @property
+    def frame_count(self) -> int:
+        """Sequence number of the last written frame (0 = none yet)"""
+        return int(self._header[0])
+
+    @property
+    def frame(self) -> Optional[bytes]:
+        """Copy of the latest frame, or None if nothing was written yet"""
+        with self.condition:
+            return self._read()
+
+    @property
+    def clients(self) -> int:
+        """Number of readers registered with add_client()"""
+        return int(self._header[2])
+
+    def add_client(self):
+        """Register a reader (e.g. a connected stream client)"""
+        with self.condition:
+            self._header[2] += 1
+
+    def remove_client(self):
+        """Unregister a reader added with add_client()"""
+        with self.condition:
+            self._header[2] -= 1
+
+    def _read(self) -> Optional[bytes]:
+        if not self._header[0]:
+            return None
+        return bytes(self._data[:int(self._header[1])])
+
+    def write(self, buf) -> int:
+        """
+        Replace the latest frame and wake waiting readers.
+
+        Args:
+            buf: Encoded frame (bytes or a byte-format memoryview)
+
+        Returns:
+            Sequence number of the written frame
+
+        Raises:
+            ValueError: If buf is larger than max_bytes
+        """
+        size = len(buf)
+        if size > self.max_bytes:
+            raise ValueError(f"Frame of {size} bytes exceeds slot size {self.max_bytes}")
+        with self.condition:
+            self._data[:size] = buf
+            self._header[1] = size
+            self._header[0] += 1
+            self.condition.notify_all()
+            return int(self._header[0])
+
+    def wait_for_frame(self, last_seq: int, timeout: Optional[float] = 5.0) -> Tuple[int, Optional[bytes]]:
+        """
+        Wait for a frame newer than last_seq.
+
+        Returns:
+            (seq, frame bytes). On timeout seq == last_seq
+        """
+        with self.condition:
+            if int(self._header[0]) == last_seq:
+                self.condition.wait(timeout)
+            return int(self._header[0]), self._read()
+
+    def close(self):
+        """Detach from the shared memory block"""
+        self._header = None
+        self._data.release()
+        self._data = None
+        self.shm.close()
+
+    def unlink(self):
+        """Free the shared memory block (owner only, after close())"""
+        if self.owner:
+            self.shm.unlink()
@@ -8,9 +8,11 @@ by directly calling the Edge TPU delegate creation function via ctypes.
 import ctypes
 import numpy as np
 import cv2
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 import time
 
+from .labels import load_labels
+
 
 class EdgeTPUDelegate(ctypes.Structure):
     """Placeholder for TfLiteDelegate structure"""
@@ -90,10 +92,9 @@ class EdgeTPUDetector:
         print(f"   Model input shape: {self.input_shape}")
         print(f"   Number of outputs: {len(self.output_details)}")
 
-    def _load_labels(self, labels_path: str) -> List[str]:
-        """Load COCO labels from file"""
-        with open(labels_path, 'r') as f:
-            return [line.strip() for line in f.readlines()]
+    def _load_labels(self, labels_path: str) -> Dict[int, str]:
+        """Load COCO labels from file (class ID -> name)"""
+        return load_labels(labels_path)
 
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """
@@ -209,9 +210,7 @@ class EdgeTPUDetector:
 
     def get_label(self, class_id: int) -> str:
         """Get label name for a class ID"""
-        if 0 <= class_id < len(self.labels):
-            return self.labels[class_id]
-        return f"Unknown ({class_id})"
+        return self.labels.get(class_id, f"Unknown ({class_id})")
 
     def close(self):
         """Clean up resources"""
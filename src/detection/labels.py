@@ -0,0 +1,44 @@
+"""
+Label file loading for detection models.
+
+Supports both plain label files (one name per line, class ID = line number)
+and files with explicit IDs ("37 sports ball" or "37: sports ball"), where
+line numbers no longer match class IDs once gaps are removed.
+"""
+
+import re
+from typing import Dict
+
+
+def load_labels(labels_path: str) -> Dict[int, str]:
+    """
+    Load a label file as a class ID -> name mapping.
+
+    Args:
+        labels_path: Path to labels file
+
+    Returns:
+        Dict mapping class ID to label name
+    """
+    labels = {}
+    with open(labels_path, 'r') as f:
+        for row, line in enumerate(f):
+            parts = re.split(r'[:\s]+', line.strip(), maxsplit=1)
+            if len(parts) == 2 and parts[0].isdigit():
+                labels[int(parts[0])] = parts[1].strip()
+            elif line.strip():
+                labels[row] = line.strip()
+    return labels
+
+
+def find_label_id(labels: Dict[int, str], name: str) -> int:
+    """
+    Look up the class ID of a label name.
+
+    Raises:
+        ValueError: If the label is not in the mapping
+    """
+    for class_id, label in labels.items():
+        if label == name:
+            return class_id
+    raise ValueError(f"Label not found: {name!r}")
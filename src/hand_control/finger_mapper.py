@@ -85,6 +85,15 @@ class FingerMapper:
         self.angle_max = angle_max
         self.invert_mapping = invert_mapping
 
+        # map_hand_to_servos用に手ごとのチャンネル・開/閉角度を配列化
+        # {hand: (指名タプル, チャンネル配列, 開角度配列, 閉-開の差分配列)}
+        self._hand_tables = {}
+        for hand, fingers in self.SERVO_MAPPING.items():
+            channels = np.array(list(fingers.values()))
+            open_angles = np.array([self.SERVO_CONFIG[ch]['open'] for ch in channels], dtype=np.float64)
+            close_angles = np.array([self.SERVO_CONFIG[ch]['close'] for ch in channels], dtype=np.float64)
+            self._hand_tables[hand] = (tuple(fingers), channels, open_angles, close_angles - open_angles)
+
     def map_finger_to_servo(self, finger_angle: float, channel: int = None) -> int:
         """
         指の角度をサーボ角度にマッピング（walk_program.ino準拠）
@@ -148,25 +157,22 @@ class FingerMapper:
         """
         servo_commands = {}
 
-        # 左手を処理（ヒップ制御）
-        if hand_data.get('left_hand'):
-            finger_angles = hand_data['left_hand'].get('finger_angles', {})
-            for finger_name, channel in self.SERVO_MAPPING['left_hand'].items():
-                if finger_name in finger_angles:
-                    angle = finger_angles[finger_name]
-                    # SERVO_CONFIGを使用するためにchannelを渡す
-                    servo_angle = self.map_finger_to_servo(angle, channel=channel)
-                    servo_commands[channel] = servo_angle
-
-        # 右手を処理（膝制御）
-        if hand_data.get('right_hand'):
-            finger_angles = hand_data['right_hand'].get('finger_angles', {})
-            for finger_name, channel in self.SERVO_MAPPING['right_hand'].items():
-                if finger_name in finger_angles:
-                    angle = finger_angles[finger_name]
-                    # SERVO_CONFIGを使用するためにchannelを渡す
-                    servo_angle = self.map_finger_to_servo(angle, channel=channel)
-                    servo_commands[channel] = servo_angle
+        # 左手（ヒップ制御）→ 右手（膝制御）の順に、4本の指をまとめて変換
+        # （map_finger_to_servo(angle, channel) と同じ線形補間を配列演算で行う）
+        for hand, (fingers, channels, open_angles, spans) in self._hand_tables.items():
+            if not hand_data.get(hand):
+                continue
+            finger_angles = hand_data[hand].get('finger_angles', {})
+
+            # 検出されなかった指はNaNにして除外
+            angles = np.array([finger_angles.get(f, np.nan) for f in fingers], dtype=np.float64)
+            present = ~np.isnan(angles)
+
+            normalized = (angles[present] - self.angle_min) / (self.angle_max - self.angle_min)
+            normalized = np.clip(normalized, 0.0, 1.0)
+            servo_angles = (open_angles[present] + normalized * spans[present]).astype(np.int64)
+
+            servo_commands.update(zip(channels[present].tolist(), servo_angles.tolist()))
 
         return servo_commands
 
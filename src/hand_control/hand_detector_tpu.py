@@ -17,6 +17,38 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _input_lut(input_details: Dict) -> Optional[np.ndarray]:
+    """
+    uint8画素値 → モデル入力値の変換テーブル（256要素）を作成
+
+    FLOAT32入力なら0-1正規化、量子化入力なら scale/zero_point による量子化を
+    1回のテーブル参照で行う。uint8入力で変換が恒等（scale=1/255, zero_point=0）
+    の場合はNoneを返し、画素値をそのまま入力テンソルへコピーする。
+    """
+    dtype = np.dtype(input_details['dtype'])
+    normalized = np.arange(256, dtype=np.float32) / 255.0
+    if dtype == np.float32:
+        return normalized
+
+    scale, zero_point = input_details['quantization']
+    if not scale:
+        return None if dtype == np.uint8 else np.arange(256).astype(dtype)
+
+    info = np.iinfo(dtype)
+    lut = np.clip(np.round(normalized / scale + zero_point), info.min, info.max).astype(dtype)
+    if dtype == np.uint8 and np.array_equal(lut, np.arange(256)):
+        return None
+    return lut
+
+
+def _dequantize(tensor: np.ndarray, output_details: Dict) -> np.ndarray:
+    """量子化出力を scale * (q - zero_point) で実数に戻す（FLOAT32出力はそのまま）"""
+    scale, zero_point = output_details['quantization']
+    if not scale or np.issubdtype(tensor.dtype, np.floating):
+        return tensor
+    return scale * (tensor.astype(np.float32) - zero_point)
+
+
 class HandDetectorTPU:
     """
     Edge TPUを使用して手と指を検出するクラス
@@ -46,7 +78,10 @@ class HandDetectorTPU:
         palm_model_path: str = 'models/palm_detection_builtin_256_integer_quant.tflite',
         max_num_hands: int = 2,
         min_detection_confidence: float = 0.5,
-        min_palm_confidence: float = 0.5
+        min_palm_confidence: float = 0.5,
+        bgr_input: bool = False,
+        min_tracking_confidence: float = 0.8,
+        palm_redetect_interval: int = 5
     ):
         """
         Args:
@@ -55,12 +90,24 @@ class HandDetectorTPU:
             max_num_hands: 検出する手の最大数
             min_detection_confidence: Hand landmark検出信頼度の閾値
             min_palm_confidence: Palm detection信頼度の閾値
+            bgr_input: Trueなら入力フレームをBGRとして扱う（モデル入力サイズに
+                       縮小した後でRGBに並べ替えるため、フル解像度の色変換が不要）
+            min_tracking_confidence: この信頼度以上で検出できた手は、次フレームで
+                       同じ領域を再利用してPalm detectionを省略する（追跡）
+            palm_redetect_interval: 追跡中でもこのフレーム数ごとにPalm detectionを再実行
         """
         self.model_path = model_path
         self.palm_model_path = palm_model_path
         self.max_num_hands = max_num_hands
         self.min_detection_confidence = min_detection_confidence
         self.min_palm_confidence = min_palm_confidence
+        self.bgr_input = bgr_input
+        self.min_tracking_confidence = min_tracking_confidence
+        self.palm_redetect_interval = palm_redetect_interval
+
+        # 追跡状態: 前フレームで高信頼度だった手の領域と、最後のPalm detectionからのフレーム数
+        self._tracked_regions: List[Dict] = []
+        self._frames_since_palm = 0
 
         # Palm Detectorの初期化（TFLite通常版）
         logger.info(f"Loading Palm Detection model from {palm_model_path}")
@@ -70,7 +117,9 @@ class HandDetectorTPU:
         self.palm_input_details = self.palm_interpreter.get_input_details()[0]
         self.palm_output_details = self.palm_interpreter.get_output_details()
         self.palm_input_size = tuple(self.palm_input_details['shape'][1:3])
-        logger.info(f"Palm model input size: {self.palm_input_size}")
+        self.palm_input_lut = _input_lut(self.palm_input_details)
+        logger.info(f"Palm model input size: {self.palm_input_size}, "
+                    f"dtype: {np.dtype(self.palm_input_details['dtype']).name}")
 
         # Hand Landmark TPUインタープリタの初期化
         logger.info(f"Loading Hand Landmark TPU model from {model_path}")
@@ -83,13 +132,19 @@ class HandDetectorTPU:
 
         # 入力サイズ取得（通常は256x256）
         self.input_size = common.input_size(self.interpreter)
-        logger.info(f"Hand landmark model input size: {self.input_size}")
+        self.input_lut = _input_lut(self.input_details)
+        logger.info(f"Hand landmark model input size: {self.input_size}, "
+                    f"dtype: {np.dtype(self.input_details['dtype']).name}")
         logger.info(f"Number of output tensors: {len(self.output_details)}")
 
         # 出力テンソルのインデックスを特定
         for i, detail in enumerate(self.output_details):
             logger.info(f"Output {i}: shape={detail['shape']}, dtype={detail['dtype']}")
 
+        # リサイズ先バッファ（毎フレームの配列確保を避けて使い回す）
+        self._palm_resized = np.empty((*self.palm_input_size, 3), dtype=np.uint8)
+        self._roi_resized = np.empty((self.input_size[1], self.input_size[0], 3), dtype=np.uint8)
+
         self.results = None
 
     def detect(self, frame: np.ndarray) -> Dict[str, any]:
@@ -118,10 +173,21 @@ class HandDetectorTPU:
         }
 
         # Step 1: Palm detection - 手のひらの位置を検出
-        palm_regions = self._detect_palms(frame)
+        # 前フレームの手がすべて高信頼度なら、その領域を再利用してPalm detectionを省略
+        # （MediaPipeと同じ「検出→追跡」。palm_redetect_intervalフレームごとに再検出）
+        reuse_tracked = bool(self._tracked_regions) and \
+            self._frames_since_palm < self.palm_redetect_interval - 1
+        if reuse_tracked:
+            palm_regions = self._tracked_regions
+            self._frames_since_palm += 1
+        else:
+            palm_regions = self._detect_palms(frame)
+            self._frames_since_palm = 0
+        tracked_regions = []
 
         if not palm_regions:
             logger.info("No palms detected")
+            self._tracked_regions = []
             self.results = detection_result
             return detection_result
 
@@ -159,6 +225,17 @@ class HandDetectorTPU:
                 'finger_angles': finger_angles
             }
 
+            # 高信頼度の手は次フレームで同じ領域を再利用
+            if confidence >= self.min_tracking_confidence:
+                tracked_regions.append(palm_region)
+
+        # 処理した手が1つでも追跡対象にならなかったら（低信頼度・ランドマーク検出失敗・
+        # 左右の重複）、次フレームでPalm detectionを再実行。Palm detectionを行った
+        # フレームでも同様（一部の手だけを追跡すると残りの手が結果から消えるため）
+        if len(tracked_regions) < min(len(palm_regions), self.max_num_hands):
+            tracked_regions = []
+        self._tracked_regions = tracked_regions
+
         self.results = detection_result
         return detection_result
 
@@ -172,13 +249,13 @@ class HandDetectorTPU:
         Returns:
             前処理済みテンソル
         """
-        # モデル入力サイズにリサイズ
+        # モデル入力サイズにリサイズ（uint8のまま）
         resized = cv2.resize(frame, self.input_size)
 
-        # uint8のまま（量子化モデル）
-        input_tensor = resized.astype(np.uint8)
-
-        return input_tensor
+        # 量子化モデルで変換が恒等ならそのまま、それ以外は1回のテーブル参照で変換
+        if self.input_lut is None:
+            return resized
+        return self.input_lut[resized]
 
     def _detect_palms(self, frame: np.ndarray) -> List[Dict]:
         """
@@ -192,18 +269,25 @@ class HandDetectorTPU:
             各要素: {'bbox': [x, y, w, h], 'confidence': float, 'keypoints': [...]}
         """
         # Palm detection用に前処理
-        input_tensor = cv2.resize(frame, self.palm_input_size)
+        # フル解像度フレームの縮小はここで1回だけ（ランドマーク用ROIは元フレームから切り出す）
+        input_tensor = cv2.resize(frame, self.palm_input_size, dst=self._palm_resized)
+        if self.bgr_input:
+            input_tensor = input_tensor[:, :, ::-1]  # ビュー（入力テンソルへのコピー時に並べ替え）
 
-        # FLOAT32モデルなので0-1に正規化
-        input_tensor = input_tensor.astype(np.float32) / 255.0
-        input_tensor = np.expand_dims(input_tensor, axis=0)
+        # 入力テンソルへ直接書き込む（uint8入力なら正規化・float変換なし）
+        if self.palm_input_lut is not None:
+            input_tensor = self.palm_input_lut[input_tensor]
+        self.palm_interpreter.tensor(self.palm_input_details['index'])()[0] = input_tensor
 
         # Palm detection推論
-        self.palm_interpreter.set_tensor(self.palm_input_details['index'], input_tensor)
         self.palm_interpreter.invoke()
 
         # 出力取得: classificators (1, 2944, 1) と regressors (1, 2944, 18)
-        classificators = self.palm_interpreter.get_tensor(self.palm_output_details[0]['index'])
+        # regressorsは検出されたアンカーの行だけを後で逆量子化する
+        classificators = _dequantize(
+            self.palm_interpreter.get_tensor(self.palm_output_details[0]['index']),
+            self.palm_output_details[0]
+        )
         regressors = self.palm_interpreter.get_tensor(self.palm_output_details[1]['index'])
 
         # Sigmoid適用してスコアを0-1の範囲に変換
@@ -226,7 +310,7 @@ class HandDetectorTPU:
 
                 # Regressorから相対的なバウンディングボックスとキーポイントを取得
                 # regressors[idx] = [cx, cy, w, h, kp0_x, kp0_y, ..., kp6_x, kp6_y]
-                reg = regressors[0, idx, :]
+                reg = _dequantize(regressors[0, idx, :], self.palm_output_details[1])
 
                 # バウンディングボックスをデコード（簡易版）
                 # MediaPipeの正確なデコードには、アンカー座標が必要
@@ -286,7 +370,7 @@ class HandDetectorTPU:
             palm_region: Palm detectorの検出結果
 
         Returns:
-            切り抜かれた手の画像（256x256にリサイズ済み）
+            切り抜かれた手の画像（256x256にリサイズ済み。内部バッファのため次の呼び出しで上書きされる）
         """
         x, y, w, h = palm_region['bbox']
 
@@ -304,7 +388,9 @@ class HandDetectorTPU:
         roi = frame[y:y+h, x:x+w]
 
         # Hand landmarkモデルの入力サイズにリサイズ
-        roi_resized = cv2.resize(roi, self.input_size)
+        roi_resized = cv2.resize(roi, self.input_size, dst=self._roi_resized)
+        if self.bgr_input:
+            roi_resized = roi_resized[:, :, ::-1]  # ビュー（入力テンソルへのコピー時に並べ替え）
 
         return roi_resized
 
@@ -325,8 +411,8 @@ class HandDetectorTPU:
         Returns:
             (landmarks, confidence)
         """
-        # FLOAT32モデルなので0-1に正規化
-        input_tensor = hand_roi.astype(np.float32) / 255.0
+        # uint8入力ならROIをそのまま入力テンソルへコピー（正規化・float変換なし）
+        input_tensor = hand_roi if self.input_lut is None else self.input_lut[hand_roi]
 
         # TPU推論実行
         common.set_input(self.interpreter, input_tensor)
@@ -360,10 +446,15 @@ class HandDetectorTPU:
         # - output 2: landmarks (1, 63) - 21 landmarks x 3 coordinates (x, y, z)
 
         # 手の検出スコア（インデックス0と1）
-        hand_flag = self.interpreter.get_tensor(self.output_details[0]['index'])
+        # 量子化出力は使用する値だけを scale/zero_point で逆量子化する
+        hand_flag = _dequantize(
+            self.interpreter.get_tensor(self.output_details[0]['index']), self.output_details[0]
+        )
         handedness = None
         if len(self.output_details) > 1:
-            handedness = self.interpreter.get_tensor(self.output_details[1]['index'])
+            handedness = _dequantize(
+                self.interpreter.get_tensor(self.output_details[1]['index']), self.output_details[1]
+            )
 
         # ランドマーク取得（インデックス2が座標）
         landmarks_tensor = self.interpreter.get_tensor(self.output_details[2]['index'])
@@ -387,7 +478,8 @@ class HandDetectorTPU:
 
         # ランドマークを正規化座標に変換（0-1の範囲）
         # モデル出力は通常、正規化された座標または画素座標
-        landmarks_flat = landmarks_tensor.flatten()
+        # 21キーポイント × 3座標（63値）だけを逆量子化
+        landmarks_flat = _dequantize(landmarks_tensor.reshape(-1)[:63], self.output_details[2])
 
         # デバッグ: flatten後のサイズを確認
         logger.debug(f"landmarks_flat size: {landmarks_flat.size} (expected: 63 for 21 landmarks × 3)")
@@ -557,12 +649,13 @@ class HandDetectorTPU:
 
         return angle_deg
 
-    def draw_landmarks(self, frame: np.ndarray) -> np.ndarray:
+    def draw_landmarks(self, frame: np.ndarray, inplace: bool = False) -> np.ndarray:
         """
         検出結果をフレームに描画
 
         Args:
-            frame: RGB画像フレーム
+            frame: 画像フレーム（色はBGR順で指定）
+            inplace: Trueならコピーせず frame に直接描画
 
         Returns:
             描画済みフレーム
@@ -570,7 +663,7 @@ class HandDetectorTPU:
         if not self.results:
             return frame
 
-        annotated_frame = frame.copy()
+        annotated_frame = frame if inplace else frame.copy()
         h, w, _ = frame.shape
 
         # 手のランドマークを描画
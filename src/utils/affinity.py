@@ -0,0 +1,47 @@
+"""
+CPU affinity helpers for pinning pipeline threads to cores
+"""
+
+import logging
+import os
+from typing import Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def pin_current_thread(core: int) -> Optional[Set[int]]:
+    """
+    Pin the calling thread to a single CPU core (Linux only).
+
+    Failures are logged and otherwise ignored so callers can keep running
+    unpinned.
+
+    Args:
+        core: CPU core number (wrapped modulo the core count)
+
+    Returns:
+        The previous CPU set for restore_affinity(), or None if not pinned
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        return None
+    try:
+        previous = os.sched_getaffinity(0)
+        os.sched_setaffinity(0, {core % (os.cpu_count() or 1)})
+        return previous
+    except OSError as e:
+        logger.warning(f"Could not pin thread to CPU {core}: {e}")
+        return None
+
+
+def restore_affinity(cores: Optional[Set[int]]) -> None:
+    """
+    Restore the calling thread's CPU set.
+
+    Usable as a ThreadPoolExecutor initializer, since workers inherit the
+    creating thread's affinity.
+
+    Args:
+        cores: CPU set returned by pin_current_thread(); None is a no-op
+    """
+    if cores is not None:
+        os.sched_setaffinity(0, cores)
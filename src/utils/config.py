@@ -32,7 +32,7 @@ class Config:
         },
         "arduino": {
             "port": "/dev/ttyACM0",
-            "baudrate": 9600,
+            "baudrate": 115200,
             "timeout": 1.0,
         },
         "positioning": {
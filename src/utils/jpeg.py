@@ -0,0 +1,48 @@
+"""
+JPEG encoding for the MJPEG streaming scripts
+"""
+
+import logging
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Prefer TurboJPEG (libjpeg-turbo SIMD) when available
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJPF_RGB, TJSAMP_420
+    _tj = TurboJPEG()
+    _TJ_PIXEL_FORMATS = {'BGR': TJPF_BGR, 'RGB': TJPF_RGB}
+except (ImportError, OSError) as e:
+    _tj = None
+    logger.warning(f"TurboJPEG not available, using cv2.imencode: {e}")
+
+
+def encode_jpeg(frame, quality: int = 80, pixel_format: str = 'BGR'):
+    """
+    Encode a frame to JPEG.
+
+    Args:
+        frame: numpy array (H x W x 3)
+        quality: JPEG quality
+        pixel_format: Channel order of frame, 'BGR' or 'RGB'
+
+    Returns:
+        JPEG bytes (bytes, or a memoryview over cv2's output array)
+    """
+    if pixel_format not in ('BGR', 'RGB'):
+        raise ValueError(f"Unsupported pixel format: {pixel_format}")
+
+    # 4:2:0 chroma subsampling (TurboJPEG defaults to 4:2:2; cv2/libjpeg
+    # already uses 4:2:0). TurboJPEG takes RGB directly, without a
+    # conversion copy.
+    if _tj is not None:
+        return _tj.encode(frame, quality=quality,
+                          pixel_format=_TJ_PIXEL_FORMATS[pixel_format],
+                          jpeg_subsample=TJSAMP_420)
+    if pixel_format == 'RGB':
+        frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+    _, jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    # Expose the encoded array without tobytes(); imencode returns a new
+    # array each call, so it is never overwritten while being served
+    return memoryview(jpeg).cast('B')
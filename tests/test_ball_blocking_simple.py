@@ -12,12 +12,15 @@ Usage:
     python3 tests/test_ball_blocking_simple.py --test manual
     python3 tests/test_ball_blocking_simple.py --test ultrasonic
     python3 tests/test_ball_blocking_simple.py --test sides
+    python3 tests/test_ball_blocking_simple.py --unattended   # CI (simulated ball)
 """
 
 import sys
 import time
+import random
 import logging
 import argparse
+from collections import Counter
 from pathlib import Path
 
 # Add project root to path
@@ -34,17 +37,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Banner separators
+_SEP = "=" * 70
+_SUB = "-" * 70
 
-def test_manual_trigger(serial_controller: SerialController):
+
+def wait_for_trigger(serial_controller: SerialController, prompt: str, unattended: bool):
+    """
+    Wait for the user to press Enter, or arm a simulated ball in unattended mode
+
+    Args:
+        serial_controller: Connected SerialController instance
+        prompt: Prompt shown to the user
+        unattended: Skip the prompt and let the Arduino simulate a ball crossing
+    """
+    if unattended:
+        time.sleep(0.1)
+        serial_controller.simulate_ball_crossing()
+    else:
+        input(prompt)
+
+
+def test_manual_trigger(serial_controller: SerialController, unattended: bool = False):
     """
     Test manual triggering of ball blocking system
 
     Args:
         serial_controller: Connected SerialController instance
+        unattended: Skip prompts and use a simulated ball crossing
     """
-    print("\n" + "="*70)
+    print("\n" + _SEP)
     print("Manual Trigger Test - High-Speed Ultrasonic Ball Blocking")
-    print("="*70)
+    print(_SEP)
     print("\nThis test will manually trigger the Arduino's high-speed monitoring.")
     print("The Arduino will:")
     print("  1. Monitor ultrasonic sensor for 4 seconds at ~50Hz")
@@ -57,7 +81,7 @@ def test_manual_trigger(serial_controller: SerialController):
     blocker = BallBlocker(serial_controller)
 
     # Test left side
-    input("Press Enter to test LEFT side (pins 8,9 sensor -> servo 7)...")
+    wait_for_trigger(serial_controller, "Press Enter to test LEFT side (pins 8,9 sensor -> servo 7)...", unattended)
     print("\nTriggering left side monitoring for 4 seconds...")
     print("Wave your hand in front of the LEFT sensor now!")
 
@@ -74,7 +98,7 @@ def test_manual_trigger(serial_controller: SerialController):
     time.sleep(2)
 
     # Test right side
-    input("\nPress Enter to test RIGHT side (pins 10,11 sensor -> servo 5)...")
+    wait_for_trigger(serial_controller, "\nPress Enter to test RIGHT side (pins 10,11 sensor -> servo 5)...", unattended)
     print("\nTriggering right side monitoring for 4 seconds...")
     print("Wave your hand in front of the RIGHT sensor now!")
 
@@ -90,22 +114,22 @@ def test_manual_trigger(serial_controller: SerialController):
 
     # Show statistics
     stats = blocker.get_statistics()
-    print("\n" + "-"*70)
+    print("\n" + _SUB)
     print("Test Statistics:")
     print(f"  Total detections: {stats['total_detections']}")
     print(f"  Successful blocks: {stats['successful_blocks']}")
     print(f"  Failed blocks: {stats['failed_blocks']}")
     print(f"  Success rate: {stats['success_rate']:.1f}%")
-    print("-"*70)
+    print(_SUB)
 
 
 def test_ball_side_detection():
     """
     Test ball side detection logic without Arduino
     """
-    print("\n" + "="*70)
+    print("\n" + _SEP)
     print("Ball Side Detection Test")
-    print("="*70)
+    print(_SEP)
     print("\nTesting ball position to side mapping logic...")
     print()
 
@@ -141,8 +165,23 @@ def test_ball_side_detection():
     for x_pos, expected_side in test_positions:
         detected_side = blocker.determine_ball_side(x_pos, frame_width)
         normalized = x_pos / frame_width
-        match = "✓" if detected_side.value.upper() == expected_side else "✗"
-        print(f"  {match} X={x_pos:3d}px ({normalized:.3f}) -> {detected_side.value.upper():6s} (expected: {expected_side})")
+        match = "✓" if detected_side.name == expected_side else "✗"
+        print(f"  {match} X={x_pos:3d}px ({normalized:.3f}) -> {detected_side.name:6s} (expected: {expected_side})")
+
+    # Side distribution for a tracked ball (positions clustered around center)
+    rng = random.Random(0)
+    counts = Counter(
+        blocker.determine_ball_side(min(max(rng.gauss(frame_width / 2, frame_width / 6), 0), frame_width - 1), frame_width)
+        for _ in range(1000)
+    )
+
+    print("\nSide distribution (1000 tracked positions):")
+    for side in (BallSide.LEFT, BallSide.CENTER, BallSide.RIGHT):
+        print(f"  {side.name:6s}: {counts[side] / 10:5.1f}%")
+
+    # determine_ball_side checks CENTER first, so it should be the common case
+    most_common = counts.most_common(1)[0][0]
+    print(f"  {'✓' if most_common == BallSide.CENTER else '✗'} Most common side: {most_common.name}")
 
 
 def test_ultrasonic_sensors(serial_controller: SerialController):
@@ -152,9 +191,9 @@ def test_ultrasonic_sensors(serial_controller: SerialController):
     Args:
         serial_controller: Connected SerialController instance
     """
-    print("\n" + "="*70)
+    print("\n" + _SEP)
     print("Ultrasonic Sensors Test")
-    print("="*70)
+    print(_SEP)
     print("\nTesting left and right ultrasonic sensors individually...")
     print("Hardware mapping:")
     print("  - Left sensor: pins 8 (TRIG), 9 (ECHO)")
@@ -163,6 +202,11 @@ def test_ultrasonic_sensors(serial_controller: SerialController):
     print("Move your hand in front of each sensor to see distance readings.")
     print("Press Ctrl+C to stop.\n")
 
+    # Suppress per-read INFO records from lower layers during the polling loop
+    root_logger = logging.getLogger()
+    old_level = root_logger.level
+    root_logger.setLevel(logging.WARNING)
+
     try:
         for i in range(30):
             # Read left sensor
@@ -182,17 +226,21 @@ def test_ultrasonic_sensors(serial_controller: SerialController):
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user")
 
+    finally:
+        root_logger.setLevel(old_level)
+
 
-def test_complete_workflow(serial_controller: SerialController):
+def test_complete_workflow(serial_controller: SerialController, unattended: bool = False):
     """
     Test complete workflow: simulate camera detection -> trigger blocking
 
     Args:
         serial_controller: Connected SerialController instance
+        unattended: Skip prompts and use a simulated ball crossing
     """
-    print("\n" + "="*70)
+    print("\n" + _SEP)
     print("Complete Workflow Test")
-    print("="*70)
+    print(_SEP)
     print("\nThis test simulates the complete ball blocking workflow:")
     print("  1. Simulate camera detecting ball at position")
     print("  2. Determine side (left/right)")
@@ -205,7 +253,7 @@ def test_complete_workflow(serial_controller: SerialController):
     # Simulate ball detection on left side
     print("Simulating ball detection on LEFT side (x=150, width=640)...")
     print("Wave your hand in front of LEFT sensor during monitoring!")
-    input("Press Enter to start...")
+    wait_for_trigger(serial_controller, "Press Enter to start...", unattended)
 
     success = blocker.process_ball_detection(
         ball_x=150,
@@ -225,7 +273,7 @@ def test_complete_workflow(serial_controller: SerialController):
     # Simulate ball detection on right side
     print("\nSimulating ball detection on RIGHT side (x=500, width=640)...")
     print("Wave your hand in front of RIGHT sensor during monitoring!")
-    input("Press Enter to start...")
+    wait_for_trigger(serial_controller, "Press Enter to start...", unattended)
 
     success = blocker.process_ball_detection(
         ball_x=500,
@@ -242,13 +290,13 @@ def test_complete_workflow(serial_controller: SerialController):
 
     # Show final statistics
     stats = blocker.get_statistics()
-    print("\n" + "-"*70)
+    print("\n" + _SUB)
     print("Final Statistics:")
     print(f"  Total detections: {stats['total_detections']}")
     print(f"  Successful blocks: {stats['successful_blocks']}")
     print(f"  Failed blocks: {stats['failed_blocks']}")
     print(f"  Success rate: {stats['success_rate']:.1f}%")
-    print("-"*70)
+    print(_SUB)
 
 
 def main():
@@ -269,12 +317,17 @@ def main():
         default='/dev/ttyACM0',
         help='Arduino serial port (default: /dev/ttyACM0)'
     )
+    parser.add_argument(
+        '--unattended',
+        action='store_true',
+        help='Skip Enter prompts and drive a simulated ball crossing (for CI)'
+    )
 
     args = parser.parse_args()
 
-    print("="*70)
+    print(_SEP)
     print("Ball Blocking System Test - High-Speed Ultrasonic")
-    print("="*70)
+    print(_SEP)
     print(f"Arduino port: {args.port}")
     print(f"Test mode: {args.test}")
     print()
@@ -291,9 +344,9 @@ def main():
         serial = SerialController(port=args.port)
 
         if not serial.connect():
-            print("\n" + "="*70)
+            print("\n" + _SEP)
             print("ERROR: Failed to connect to Arduino")
-            print("="*70)
+            print(_SEP)
             print("Please check:")
             print("  1. Arduino is connected to USB")
             print("  2. Correct port specified (current: {})".format(args.port))
@@ -301,7 +354,7 @@ def main():
             print("  4. User has permission to access serial port")
             print("\nTry: sudo usermod -a -G dialout $USER")
             print("Then log out and log back in")
-            print("="*70)
+            print(_SEP)
             sys.exit(1)
 
         print("✓ Connected to Arduino successfully\n")
@@ -309,17 +362,17 @@ def main():
         try:
             # Run Arduino-dependent tests
             if args.test in ['manual', 'all']:
-                test_manual_trigger(serial)
+                test_manual_trigger(serial, args.unattended)
 
             if args.test in ['ultrasonic', 'all']:
                 test_ultrasonic_sensors(serial)
 
             if args.test in ['workflow', 'all']:
-                test_complete_workflow(serial)
+                test_complete_workflow(serial, args.unattended)
 
-            print("\n" + "="*70)
+            print("\n" + _SEP)
             print("All tests completed successfully!")
-            print("="*70)
+            print(_SEP)
 
         except KeyboardInterrupt:
             print("\n\nTests interrupted by user")
@@ -12,9 +12,14 @@
 import io
 import sys
 import os
+import json
 import time
+import queue
 import logging
-from threading import Condition, Thread
+import functools
+from dataclasses import dataclass, field
+from typing import Optional
+from threading import Event, Thread
 from http.server import BaseHTTPRequestHandler, HTTPServer
 import cv2
 import numpy as np
@@ -27,6 +32,9 @@ from src.camera import CameraController
 from src.arduino.serial_controller import SerialController
 from src.tracking.pid_controller import PIDController
 from src.tracking.tracker import BallTracker
+from src.detection.labels import load_labels
+from src.utils.affinity import pin_current_thread
+from src.utils.jpeg import encode_jpeg
 
 # PyCoral インポート
 from pycoral.utils import edgetpu
@@ -39,26 +47,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+# Numbaが使えればBBoxスケーリングをJITコンパイル
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _scale_boxes(boxes, scale):
+        """(N,4) float32 BBox配列をフレーム座標の (N,4) int32 に変換"""
+        out = np.empty(boxes.shape, np.int32)
+        for i in range(boxes.shape[0]):
+            for j in range(4):
+                out[i, j] = np.int32(boxes[i, j] * scale[j])
+        return out
+else:
+    def _scale_boxes(boxes, scale):
+        """(N,4) float32 BBox配列をフレーム座標の (N,4) int32 に変換"""
+        return (boxes * scale).astype(np.int32)
+
+
+# MJPEGの各フレームに付けるパートヘッダ（% でContent-Lengthを埋める）
+FRAME_HEADER = b'--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+
+
 # ストリーミング出力クラス
 class StreamingOutput(io.BufferedIOBase):
+    """
+    最新フレームを1つだけ保持する出力スロット（書き込み1・読み出し多）
+
+    (seq, frame) のタプルを丸ごと差し替えるため、読み出し側はロック無しで
+    一貫したスナップショットを得られる。新フレーム通知は世代ごとの Event で行う。
+    """
+
     def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-        self.frame_count = 0
+        self._slot = (0, None, None)  # (フレーム番号, MJPEGパート, JPEGバイト列)
+        self._new_frame = Event()
+
+    @property
+    def frame(self):
+        return self._slot[2]
+
+    @property
+    def frame_count(self):
+        return self._slot[0]
 
     def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.frame_count += 1
-            if self.frame_count % 30 == 0:
-                logger.info(f"ストリーム出力: {self.frame_count} フレーム送信完了")
-            self.condition.notify_all()
+        # ヘッダ付きのMJPEGパートをフレーム毎に1回だけ組み立て、全クライアントで共有
+        # （buf は bytes / memoryview どちらでも可。コピーはこの join の1回のみ）
+        part = b''.join((FRAME_HEADER % len(buf), buf, b'\r\n'))
+        seq = self._slot[0] + 1
+        self._slot = (seq, part, buf)
+        # 待機中のクライアントを起こし、次のフレーム用に新しい Event へ差し替え
+        event, self._new_frame = self._new_frame, Event()
+        event.set()
+        if seq % 30 == 0:
+            logger.info(f"ストリーム出力: {seq} フレーム送信完了")
+
+    def wait_for_frame(self, last_seq, timeout=5.0):
+        """
+        last_seq より新しいフレームを待つ
+
+        Returns:
+            (seq, ヘッダ付きMJPEGパート)。タイムアウト時は seq == last_seq
+        """
+        event = self._new_frame
+        slot = self._slot
+        if slot[0] == last_seq:
+            event.wait(timeout)
+            slot = self._slot
+        return slot[0], slot[1]
 
 
 # グローバル変数
 output = StreamingOutput()
 interpreter = None
-labels = []
+labels = {}
 detection_enabled = True
 fps_counter = 0
 fps_start_time = time.time()
@@ -69,6 +135,12 @@ avg_inference_time = 0
 current_servo_pan = 90
 current_servo_tilt = 90
 tracking_state = "idle"
+JPEG_QUALITY_TRACKING = 80  # 追跡中のストリームJPEG品質
+JPEG_QUALITY_IDLE = 60  # 待機・ロスト中のストリームJPEG品質
+_BALL_IDS = frozenset((36, 73))  # sports ball (36) or mouse (73)
+MODEL_INPUT_SIZE = None  # (width, height): TPUモデルの入力サイズ（起動時に取得）
+BBOX_SCALE = None  # [sx, sy, sx, sy]: モデル座標 → フレーム座標（起動時に計算）
+stats_bytes = b'{}'  # /stats 用JSON（フレーム毎に1回だけエンコード）
 
 
 # HTTPリクエストハンドラ
@@ -79,12 +151,11 @@ class StreamingHandler(BaseHTTPRequestHandler):
             self.send_header('Location', '/index.html')
             self.end_headers()
         elif self.path == '/index.html':
-            content = PAGE.encode('utf-8')
             self.send_response(200)
             self.send_header('Content-Type', 'text/html')
-            self.send_header('Content-Length', len(content))
+            self.send_header('Content-Length', PAGE_LEN)
             self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(PAGE_BYTES)
         elif self.path == '/stream.mjpg':
             logger.info(f"📹 ストリーミングクライアント接続: {self.client_address}")
             self.send_response(200)
@@ -95,23 +166,18 @@ class StreamingHandler(BaseHTTPRequestHandler):
             self.end_headers()
             try:
                 frame_sent = 0
+                last_sent = 0  # frame_count=0 はフレーム未出力
                 while True:
-                    with output.condition:
-                        if output.frame is None:
-                            logger.warning("⚠️  フレームが利用不可、待機中...")
-                        output.condition.wait(timeout=5.0)  # 5秒タイムアウト
-                        frame = output.frame
-
-                    if frame is None:
-                        logger.warning("⚠️  タイムアウト後もフレームがNone")
+                    # 新しいフレームが来るまで待機（同じフレームの再送はしない）
+                    seq, part = output.wait_for_frame(last_sent, timeout=5.0)
+
+                    if part is None or seq == last_sent:
+                        logger.warning("⚠️  タイムアウト: 新しいフレームなし")
                         continue
+                    last_sent = seq
 
-                    self.wfile.write(b'--FRAME\r\n')
-                    self.send_header('Content-Type', 'image/jpeg')
-                    self.send_header('Content-Length', len(frame))
-                    self.end_headers()
-                    self.wfile.write(frame)
-                    self.wfile.write(b'\r\n')
+                    # 区切り・ヘッダ・JPEG・末尾改行を1回の write（1回の send）で送信
+                    self.wfile.write(part)
 
                     frame_sent += 1
                     if frame_sent == 1:
@@ -119,18 +185,8 @@ class StreamingHandler(BaseHTTPRequestHandler):
             except Exception as e:
                 logger.warning(f'Removed streaming client {self.client_address}: {str(e)}')
         elif self.path == '/stats':
-            # 統計情報をJSON形式で返す
-            stats = {
-                'fps': current_fps,
-                'total_detections': total_detections,
-                'ball_detections': ball_detections,
-                'inference_time': avg_inference_time,
-                'servo_pan': current_servo_pan,
-                'servo_tilt': current_servo_tilt,
-                'tracking_state': tracking_state
-            }
-            import json
-            content = json.dumps(stats).encode('utf-8')
+            # 統計情報をJSON形式で返す（フレーム処理側でエンコード済み）
+            content = stats_bytes
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Cache-Control', 'no-cache')
@@ -293,99 +349,82 @@ setInterval(function() {
 </html>
 """
 
+# 静的ページなので起動時に1回だけエンコード
+PAGE_BYTES = PAGE.encode('utf-8')
+PAGE_LEN = str(len(PAGE_BYTES))
+
 
 class StreamingServer(HTTPServer):
     allow_reuse_address = True
     daemon_threads = True
 
 
-def update_detection_stats(detections):
-    """検出統計を更新"""
-    global total_detections, ball_detections
-
-    total_detections += len(detections)
-    for det in detections:
-        if det.id == 36 or det.id == 73:  # sports ball (36) or mouse (73)
-            ball_detections += 1
-
-
-def find_ball_detection(detections, frame_width=640, frame_height=480):
+def process_detections(detections):
     """
-    検出結果からボールを抽出
+    検出結果を1回の走査で集計（ボール数・最初のボール・描画用BBox）
 
     Args:
-        detections: PyCoral検出結果のリスト
-        frame_width: フレーム幅
-        frame_height: フレーム高さ
+        detections: PyCoral検出結果のリスト（スコア降順）
 
     Returns:
-        ボールの中心座標dict {'center_x': x, 'center_y': y} or None
+        (ボール検出数, ボールの中心座標dict {'center_x': x, 'center_y': y} or None,
+         フレーム座標にスケーリング済みのBBox配列 (N, 4) int32)
     """
-    for det in detections:
-        if det.id == 36 or det.id == 73:  # sports ball (36) or mouse (73)
-            bbox = det.bbox
+    ball_count = 0
+    ball = None
+    rows = []
+    is_ball = _BALL_IDS.__contains__
 
-            # TPUモデルは300x300の座標を返すので、フレームサイズにスケーリング
-            input_size = common.input_size(interpreter)  # (300, 300)
-            model_w, model_h = input_size[1], input_size[0]
+    for det in detections:
+        bbox = det.bbox
+        rows.append((bbox.xmin, bbox.ymin, bbox.xmax, bbox.ymax))
 
-            scale_x = frame_width / model_w
-            scale_y = frame_height / model_h
+        if is_ball(det.id):
+            ball_count += 1
+            if ball is None:
+                # TPUモデルは300x300の座標を返すので、フレームサイズにスケーリング
+                center_x = float(bbox.xmin + bbox.xmax) * float(BBOX_SCALE[0]) / 2
+                center_y = float(bbox.ymin + bbox.ymax) * float(BBOX_SCALE[1]) / 2
+                ball = {'center_x': center_x, 'center_y': center_y, 'score': det.score}
 
-            center_x = ((bbox.xmin + bbox.xmax) / 2) * scale_x
-            center_y = ((bbox.ymin + bbox.ymax) / 2) * scale_y
+    # BBoxをモデルサイズから元の画像サイズにまとめてスケーリング
+    boxes = _scale_boxes(np.array(rows, dtype=np.float32).reshape(-1, 4), BBOX_SCALE)
 
-            return {'center_x': center_x, 'center_y': center_y, 'score': det.score}
-    return None
+    return ball_count, ball, boxes
 
 
-def draw_detections(frame, detections):
+def draw_detections(frame, detections, boxes):
     """
     フレームに検出結果を描画（PyCoral形式）
 
     Args:
-        frame: 入力フレーム (RGB)
+        frame: 入力フレーム (BGR)
         detections: PyCoral検出結果のリスト
+        boxes: process_detections() でスケーリング済みのBBox配列
 
     Returns:
         描画済みフレーム
     """
     h, w = frame.shape[:2]
 
-    # モデルの入力サイズを取得（BBoxはこのサイズに対する座標）
-    input_size = common.input_size(interpreter)  # (height, width)
-    model_h, model_w = input_size[0], input_size[1]
-
-    # スケーリング係数を計算
-    scale_x = w / model_w
-    scale_y = h / model_h
-
-    for det in detections:
-        # PyCoral BBox形式: det.bbox (BBox object with xmin, ymin, xmax, ymax)
-        bbox = det.bbox
+    for det, (xmin, ymin, xmax, ymax) in zip(detections, boxes.tolist()):
         score = det.score
         class_id = det.id
 
-        # BBoxをモデルサイズから元の画像サイズにスケーリング
-        xmin = int(bbox.xmin * scale_x)
-        ymin = int(bbox.ymin * scale_y)
-        xmax = int(bbox.xmax * scale_x)
-        ymax = int(bbox.ymax * scale_y)
-
         # ボール（class 36）またはMouse（class 73）は赤、その他は緑
-        if class_id == 36 or class_id == 73:
-            color = (255, 0, 0)  # 赤 (RGB)
+        if class_id in _BALL_IDS:
+            color = (0, 0, 255)  # 赤 (BGR)
             label = f"Ball {score:.2f}"
             thickness = 3
 
             # ボールの中心にクロスヘアを描画
             center_x = (xmin + xmax) // 2
             center_y = (ymin + ymax) // 2
-            cv2.drawMarker(frame, (center_x, center_y), (255, 255, 0),
+            cv2.drawMarker(frame, (center_x, center_y), (0, 255, 255),
                           cv2.MARKER_CROSS, 20, 2)
         else:
             color = (0, 255, 0)  # 緑
-            label_name = labels[class_id] if class_id < len(labels) else f"ID:{class_id}"
+            label_name = labels.get(class_id, f"ID:{class_id}")
             label = f"{label_name} {score:.2f}"
             thickness = 2
 
@@ -400,47 +439,112 @@ def draw_detections(frame, detections):
         cv2.putText(frame, label, (xmin, label_ymin - 5),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
 
-    # 画面中央に目標マーカーを描画
-    center_x = w // 2
-    center_y = h // 2
-    cv2.drawMarker(frame, (center_x, center_y), (0, 255, 255),
-                  cv2.MARKER_TILTED_CROSS, 30, 2)
-    cv2.circle(frame, (center_x, center_y), 50, (0, 255, 255), 1)
+    # 画面中央に目標マーカーを描画（事前描画済みの画素をコピー）
+    index, pixels = static_overlay(h, w)
+    frame[index] = pixels
 
     return frame
 
 
-def resize_with_cv2(image_rgb, target_size):
+@functools.lru_cache(maxsize=1)
+def static_overlay(h, w):
     """
-    cv2.resize + INTER_LINEAR で高速リサイズ
+    画面中央の目標マーカー（固定）を1回だけ描画し、描画画素を返す
 
     Args:
-        image_rgb: RGB numpy array (H x W x 3)
-        target_size: (width, height) タプル
+        h: フレーム高さ
+        w: フレーム幅
 
     Returns:
-        リサイズされたRGB numpy array
+        (描画画素のインデックス, 描画画素の色)
     """
-    # cv2.resizeは(width, height)の順序
-    return cv2.resize(image_rgb, target_size, interpolation=cv2.INTER_LINEAR)
+    canvas = np.zeros((h, w, 3), dtype=np.uint8)
+    center_x = w // 2
+    center_y = h // 2
+    cv2.drawMarker(canvas, (center_x, center_y), (255, 255, 0),
+                  cv2.MARKER_TILTED_CROSS, 30, 2)
+    cv2.circle(canvas, (center_x, center_y), 50, (255, 255, 0), 1)
 
+    index = np.nonzero(canvas.any(axis=2))
+    return index, canvas[index]
 
-def process_frames(camera, tracker, serial_controller):
-    """
-    フレームを処理し、TPUで検出してサーボ制御
-    """
-    global fps_counter, fps_start_time, current_fps, avg_inference_time
-    global current_servo_pan, current_servo_tilt, tracking_state
 
-    logger.info("フレーム処理ループ開始")
+# HUDテキストのキャッシュ {key: (text, region, mask, color, alpha)}
+_hud_cache = {}
+
 
+def draw_hud_text(frame, key, text, org, font_scale, color):
+    """
+    HUDテキストを描画（文字列が前回と同じならキャッシュ済みの画素を貼るだけ）
+
+    Args:
+        frame: 描画先フレーム
+        key: HUD項目名
+        text: 表示文字列
+        org: 文字列の左下座標
+        font_scale: フォントスケール
+        color: 文字色
+    """
+    cached = _hud_cache.get(key)
+
+    if cached is None or cached[0] != text:
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 2)
+        x, y = org
+        x0 = max(x - 2, 0)
+        y0 = max(y - text_h - 2, 0)
+        x1 = min(x + text_w + 2, frame.shape[1])
+        y1 = min(y + baseline + 2, frame.shape[0])
+
+        patch = np.zeros((y1 - y0, x1 - x0, 3), dtype=np.uint8)
+        cv2.putText(patch, text, (x - x0, y - y0),
+                   cv2.FONT_HERSHEY_SIMPLEX, font_scale, color, 2)
+        mask = patch.any(axis=2)
+
+        # 黒背景に描いた濃度から不透明度を求める（アンチエイリアスの縁を背景と合成するため）
+        alpha = patch[mask].max(axis=1, keepdims=True).astype(np.float32) / max(color)
+        cached = (text, (slice(y0, y1), slice(x0, x1)), mask,
+                  np.array(color, dtype=np.float32), alpha)
+        _hud_cache[key] = cached
+
+    _, region, mask, color_arr, alpha = cached
+    roi = frame[region]
+    background = roi[mask].astype(np.float32)
+    roi[mask] = (background + (color_arr - background) * alpha + 0.5).astype(np.uint8)
+
+
+@dataclass
+class FramePacket:
+    """パイプライン各ステージ間で受け渡すフレーム単位のデータ"""
+    frame: np.ndarray
+    resized: Optional[np.ndarray] = None
+    detections: list = field(default_factory=list)
+    boxes: Optional[np.ndarray] = None
+    pan_angle: float = 90.0
+    tilt_angle: float = 90.0
+    timestamp: float = 0.0
+
+
+# 各処理を固定するCPUコア（Raspberry Pi 4コア: キャッシュ局所性を保ちスレッド移動を防ぐ）
+CORE_CAPTURE = 0
+CORE_INFERENCE = 1
+CORE_OUTPUT = 2
+CORE_HTTP = 3
+
+
+def capture_stage(camera, frame_queue):
+    """
+    ステージA: フレーム取得（+ ISPで縮小済みのモデル入力フレーム）
+    """
+    pin_current_thread(CORE_CAPTURE)
     frame_count = 0
-    last_detections = []
-    inference_times = []
 
     while True:
-        # フレーム取得
-        frame = camera.capture_frame()
+        # フレーム取得（検出時はlores streamも同じリクエストから取得）
+        resized = None
+        if detection_enabled and interpreter:
+            frame, resized = camera.capture_frame_and_lores()
+        else:
+            frame = camera.capture_frame()
         if frame is None:
             if frame_count % 30 == 0:
                 logger.warning("⚠️  フレーム取得失敗（None）")
@@ -449,44 +553,68 @@ def process_frames(camera, tracker, serial_controller):
         # 最初のフレーム取得成功をログ
         if frame_count == 0:
             logger.info(f"✅ 最初のフレーム取得成功: shape={frame.shape}, dtype={frame.dtype}")
-
-        # TPU検出実行（毎フレーム）
         frame_count += 1
-        ball_detection = None
 
-        if detection_enabled and interpreter:
-            inference_start = time.time()
+        # lores stream（300x300 RGB, uint8）をそのままモデル入力に使う
+        frame_queue.put(FramePacket(frame=frame, resized=resized, timestamp=time.time()))
+
+
+def inference_stage(frame_queue, result_queue, tracker, serial_controller):
+    """
+    ステージB: TPU推論 + トラッカー更新 + サーボ制御
+    """
+    global avg_inference_time, current_servo_pan, current_servo_tilt, tracking_state
+    global total_detections, ball_detections
+
+    pin_current_thread(CORE_INFERENCE)
+    last_detections = []
+    last_boxes = None
 
-            # 画像リサイズ（640x480 → 300x300）
-            input_size = common.input_size(interpreter)  # (300, 300)
+    # 入力テンソルのアクセサを1回だけ取得（毎フレームの get_input_details を省く）
+    # ※ビューを保持したまま invoke() できないため、アクセサだけ保持して毎回呼び出す
+    input_tensor = interpreter.tensor(interpreter.get_input_details()[0]['index'])
 
-            # cv2.resize + INTER_LINEAR で高速リサイズ
-            resized = resize_with_cv2(frame, (input_size[1], input_size[0]))  # (width, height)
+    # 推論時間の移動平均用リングバッファ（最新30フレーム、合計を逐次更新）
+    ring = np.zeros(30, dtype=np.float32)
+    ring_i = 0
+    ring_n = 0
+    ring_sum = 0.0
+
+    while True:
+        packet = frame_queue.get()
+        ball_detection = None
 
-            # uint8型確保
-            if resized.dtype != np.uint8:
-                resized = resized.astype(np.uint8)
+        # TPU検出実行（毎フレーム）
+        if packet.resized is not None:
+            inference_start = time.time()
 
-            # TPU推論
-            common.set_input(interpreter, resized)
+            # TPU推論（lores frameを入力テンソルへ直接コピー）
+            # libcameraがloresサイズを調整した場合はモデル入力サイズへリサイズ
+            tensor = input_tensor()[0]
+            if packet.resized.shape[:2] == tensor.shape[:2]:
+                np.copyto(tensor, packet.resized)
+            else:
+                cv2.resize(packet.resized, MODEL_INPUT_SIZE, dst=tensor,
+                           interpolation=cv2.INTER_LINEAR)
+            del tensor  # invoke()前にテンソルへのビューを手放す
             interpreter.invoke()
 
             # 検出結果取得（しきい値30%）
             last_detections = detect.get_objects(interpreter, score_threshold=0.3)
 
             inference_time = (time.time() - inference_start) * 1000
-            inference_times.append(inference_time)
-
-            # 統計更新
-            update_detection_stats(last_detections)
 
-            # ボールを検出
-            ball_detection = find_ball_detection(last_detections)
+            # 統計更新・ボール抽出・BBoxスケーリングを1回の走査で実行
+            ball_count, ball_detection, last_boxes = process_detections(last_detections)
+            total_detections += len(last_detections)
+            ball_detections += ball_count
 
             # 推論時間の移動平均（最新30フレーム）
-            if len(inference_times) > 30:
-                inference_times.pop(0)
-            avg_inference_time = np.mean(inference_times)
+            ring_sum += inference_time - float(ring[ring_i])
+            ring[ring_i] = inference_time
+            ring_i = (ring_i + 1) % 30
+            ring_n = min(30, ring_n + 1)
+            avg_inference_time = ring_sum / ring_n
 
         # トラッカーを更新
         pan_angle, tilt_angle = tracker.update(ball_detection)
@@ -498,9 +626,30 @@ def process_frames(camera, tracker, serial_controller):
         if serial_controller.is_connected:
             serial_controller.set_pan_tilt(pan_angle, tilt_angle)
 
+        packet.detections = last_detections
+        packet.boxes = last_boxes
+        packet.pan_angle = pan_angle
+        packet.tilt_angle = tilt_angle
+        result_queue.put(packet)
+
+
+def output_stage(result_queue):
+    """
+    ステージC: 描画 + JPEGエンコード + ストリーミング出力
+    """
+    global fps_counter, fps_start_time, current_fps, stats_bytes
+
+    pin_current_thread(CORE_OUTPUT)
+    frame_count = 0
+
+    while True:
+        packet = result_queue.get()
+        frame = packet.frame
+        frame_count += 1
+
         # 検出結果を描画
-        if last_detections:
-            frame = draw_detections(frame, last_detections)
+        if packet.detections:
+            frame = draw_detections(frame, packet.detections, packet.boxes)
 
         # FPS計算
         fps_counter += 1
@@ -510,30 +659,62 @@ def process_frames(camera, tracker, serial_controller):
             fps_start_time = time.time()
 
         # FPS表示
-        cv2.putText(frame, f"FPS: {current_fps:.1f}", (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Inference: {avg_inference_time:.1f}ms", (10, 65),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-        cv2.putText(frame, f"State: {tracking_state}", (10, 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
-        cv2.putText(frame, f"Servo: ({pan_angle:.0f}, {tilt_angle:.0f})", (10, 135),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
-
-        # BGRに変換してJPEGエンコード
-        frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        _, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 80])
-
-        # ストリーミング出力に書き込み
-        jpeg_bytes = jpeg.tobytes()
-        with output.condition:
-            output.frame = jpeg_bytes
-            output.condition.notify_all()
+        draw_hud_text(frame, 'fps', f"FPS: {current_fps:.1f}", (10, 30),
+                      1, (0, 255, 0))
+        draw_hud_text(frame, 'inference', f"Inference: {avg_inference_time:.1f}ms", (10, 65),
+                      0.7, (255, 255, 0))
+        draw_hud_text(frame, 'state', f"State: {tracking_state}", (10, 100),
+                      0.7, (0, 255, 255))
+        draw_hud_text(frame, 'servo', f"Servo: ({packet.pan_angle:.0f}, {packet.tilt_angle:.0f})", (10, 135),
+                      0.7, (255, 0, 255))
+
+        # /stats 用JSONを更新（クライアント数に関係なくフレーム毎に1回）
+        stats_bytes = json.dumps({
+            'fps': current_fps,
+            'total_detections': total_detections,
+            'ball_detections': ball_detections,
+            'inference_time': avg_inference_time,
+            'servo_pan': current_servo_pan,
+            'servo_tilt': current_servo_tilt,
+            'tracking_state': tracking_state
+        }).encode('utf-8')
+
+        # JPEGエンコード（カメラがBGRで出力するので変換不要）
+        # 追跡中以外は背景がほぼ静止しているので品質を下げてエンコード量を削減
+        quality = JPEG_QUALITY_TRACKING if tracking_state == "tracking" else JPEG_QUALITY_IDLE
+        jpeg_bytes = encode_jpeg(frame, quality=quality)
+
+        # ストリーミング出力に書き込み（frame_count更新 + 待機中クライアントに通知）
+        output.write(jpeg_bytes)
 
         # 最初のフレーム出力成功をログ
         if frame_count == 1:
             logger.info(f"✅ 最初のJPEGフレーム出力成功: {len(jpeg_bytes)} bytes")
 
 
+def process_frames(camera, tracker, serial_controller):
+    """
+    フレームを処理し、TPUで検出してサーボ制御
+
+    取得(A) → 推論(B) → 描画/エンコード(C) の3ステージを別スレッドで実行し、
+    TPU推論中に前フレームのエンコードと次フレームの取得を重ねる
+    """
+    logger.info("フレーム処理ループ開始")
+
+    # maxsize=2: ダブルバッファ（遅いステージがあれば前段がブロック）
+    frame_queue = queue.Queue(maxsize=2)
+    result_queue = queue.Queue(maxsize=2)
+
+    Thread(target=capture_stage, args=(camera, frame_queue), daemon=True).start()
+    Thread(
+        target=inference_stage,
+        args=(frame_queue, result_queue, tracker, serial_controller),
+        daemon=True
+    ).start()
+
+    output_stage(result_queue)
+
+
 if __name__ == '__main__':
     print("=" * 70)
     print("🎯 ボール追跡テスト - Phase 5")
@@ -553,15 +734,37 @@ if __name__ == '__main__':
         logger.error(f"❌ TPUモデルの読み込み失敗: {e}")
         sys.exit(1)
 
+    # モデル入力サイズ・BBoxスケール（モデル入力 → 640x480）は定数なので起動時に1回だけ計算
+    MODEL_INPUT_SIZE = common.input_size(interpreter)
+    model_w, model_h = MODEL_INPUT_SIZE
+    BBOX_SCALE = np.array(
+        [640 / model_w, 480 / model_h, 640 / model_w, 480 / model_h],
+        dtype=np.float32
+    )
+
+    # ウォームアップ推論（初回invokeのTPUコールドスタートを起動時に済ませる）
+    logger.info("🔥 TPUウォームアップ中...")
+    warmup_start = time.time()
+    common.set_input(interpreter, np.zeros((model_h, model_w, 3), dtype=np.uint8))
+    for _ in range(5):
+        interpreter.invoke()
+    logger.info(f"✅ TPUウォームアップ完了: {(time.time() - warmup_start) * 1000:.1f}ms")
+
     # ラベル読み込み
     logger.info(f"📝 ラベル読み込み: {labels_path}")
-    with open(labels_path, 'r') as f:
-        labels = [line.strip() for line in f.readlines()]
+    labels = load_labels(labels_path)
     logger.info(f"✅ {len(labels)} ラベル読み込み完了")
 
     # カメラ初期化
     logger.info("📷 カメラを初期化中...")
-    camera = CameraController(resolution=(640, 480), framerate=30, debug=False)
+    # lores stream: ISPでモデル入力サイズ（300x300）に縮小（CPUリサイズ不要）
+    camera = CameraController(
+        resolution=(640, 480),
+        framerate=30,
+        debug=False,
+        pixel_format="BGR888",
+        lores_size=MODEL_INPUT_SIZE
+    )
 
     if not camera.initialize():
         logger.error("❌ カメラの初期化に失敗しました")
@@ -591,7 +794,7 @@ if __name__ == '__main__':
 
     # Arduinoシリアル通信初期化
     logger.info("📡 Arduinoに接続中...")
-    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=9600)
+    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=115200)
 
     if not serial_controller.connect():
         logger.warning("⚠️  Arduinoへの接続に失敗しました。サーボ制御なしで続行します。")
@@ -624,6 +827,8 @@ if __name__ == '__main__':
         logger.info("=" * 70)
         logger.info("終了するには Ctrl+C を押してください")
         logger.info("=" * 70)
+        # HTTPサーバー（メインスレッド）は処理ステージと別のコアで動かす
+        pin_current_thread(CORE_HTTP)
         server.serve_forever()
     except KeyboardInterrupt:
         logger.info("\n🛑 停止中...")
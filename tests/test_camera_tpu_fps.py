@@ -1,30 +1,66 @@
 #!/usr/bin/env python3
 """
 カメラ + Edge TPU統合FPS性能測定テスト
-CPU版とTPU版を比較
+TPU版を測定（--cpu-reference 指定時はCPU版と比較）
 """
 
 import sys
 import os
 import time
+import argparse
+import collections
+import functools
+import multiprocessing
+import queue
+import threading
+import traceback
+import cv2
 import numpy as np
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.camera import CameraController
-from pycoral.utils import edgetpu
-from pycoral.adapters import common
-from pycoral.adapters import detect
+from src.camera import CameraController, SharedFrameRing
+from src.detection.labels import load_labels, find_label_id
+from src.utils.affinity import pin_current_thread, restore_affinity
 
-def test_camera_setup():
-    """カメラのセットアップ"""
+# pycoral は読み込み時に libedgetpu を初期化するため、使う関数の中で import する
+# （--help 等で不要なら読み込まない）
+
+# HDR Histogramが使えれば推論時間の分布を記録（無ければNumPyで集計）
+try:
+    from hdrh.histogram import HdrHistogram
+except ImportError:
+    HdrHistogram = None
+
+# 統計から除外する先頭フレーム数（TPUコールドスタート・カメラAE/AWB収束）
+WARMUP_FRAMES = 5
+
+# 取得スレッドとTPU推論スレッドを別コアに固定（キャッシュを温かく保ち、移動による揺らぎを抑える）
+CORE_CAPTURE = 0
+CORE_INFERENCE = 1
+# 推論スレッドのnice値増分（負値はroot/CAP_SYS_NICEが必要。無ければそのまま続行）
+INFERENCE_NICE = -5
+
+# 推論時間分布の表示パーセンタイルと、ストール判定（中央値の何倍超か）
+LATENCY_PERCENTILES = (50, 90, 99, 99.9)
+STALL_FACTOR = 2
+
+def test_camera_setup(lores_size=None):
+    """
+    カメラのセットアップ
+
+    Args:
+        lores_size: モデル入力サイズ (width, height)。指定時はISPで縮小した
+                    lores streamも出力する（TPU入力のCPUリサイズが不要になる）
+    """
     print("=" * 60)
     print("Setting up camera...")
     print("=" * 60)
 
     try:
-        camera = CameraController(resolution=(640, 480), framerate=30, debug=True)
+        camera = CameraController(resolution=(640, 480), framerate=30, debug=True,
+                                  lores_size=lores_size)
 
         if not camera.initialize():
             print("❌ Camera initialization failed")
@@ -43,97 +79,506 @@ def test_camera_setup():
         print(f"❌ Camera initialization failed: {e}")
         return None
 
-def test_tpu_fps(camera, duration=10):
+def latency_distribution(times_ns):
+    """
+    推論時間の分布を集計（平均では隠れるUSB転送ストール等の二峰性を見る）
+
+    Args:
+        times_ns: 1フレーム毎の推論時間（perf_counter_ns 差分、整数ナノ秒）
+
+    Returns:
+        ({パーセンタイル: ミリ秒}, ストール数（中央値の STALL_FACTOR 倍超のサンプル数）)
+    """
+    if HdrHistogram is not None:
+        # 1us〜10s を有効桁3桁で記録
+        histogram = HdrHistogram(1000, 10 * 10**9, 3)
+        for t in times_ns:
+            histogram.record_value(t)
+        values_ns = [histogram.get_value_at_percentile(p) for p in LATENCY_PERCENTILES]
+    else:
+        values_ns = np.percentile(np.asarray(times_ns, dtype=np.int64), LATENCY_PERCENTILES)
+
+    percentiles = {p: v / 1e6 for p, v in zip(LATENCY_PERCENTILES, values_ns)}
+    median_ns = percentiles[50] * 1e6
+    stalls = int(np.count_nonzero(np.asarray(times_ns, dtype=np.int64) > STALL_FACTOR * median_ns))
+    return percentiles, stalls
+
+def print_latency_distribution(times_ns):
+    """推論時間のパーセンタイルとストール数を表示"""
+    percentiles, stalls = latency_distribution(times_ns)
+    for p, ms in percentiles.items():
+        label = f"P{p:g} inference:"
+        print(f"   {label:<19}{ms:.2f}ms")
+    label = f"Stalls (>{STALL_FACTOR}x P50):"
+    print(f"   {label:<19}{stalls}")
+    return percentiles, stalls
+
+def renice_current_thread(increment):
+    """
+    呼び出し元スレッドのnice値を変更（Linuxではスレッド単位）
+
+    Returns:
+        変更できれば True（権限不足等で失敗したら False）
+    """
+    try:
+        os.nice(increment)
+        return True
+    except (OSError, AttributeError) as e:
+        print(f"⚠️ Could not change thread priority (nice {increment:+d}): {e}")
+        return False
+
+@functools.lru_cache(maxsize=4)
+def get_interpreter(model_path):
+    """
+    Edge TPUインタプリタを生成（同一プロセス内ではモデルパス毎に1回だけロード）
+
+    Args:
+        model_path: Edge TPUモデルのパス
+
+    Returns:
+        allocate_tensors() 済みのインタプリタ
+    """
+    from pycoral.utils import edgetpu
+
+    interpreter = edgetpu.make_interpreter(model_path)
+    interpreter.allocate_tensors()
+    return interpreter
+
+def capture_worker(camera, frame_queue, stop_event, use_lores=False):
+    """
+    フレーム取得スレッド（推論中に次のフレームを取得しておく）
+
+    Args:
+        camera: CameraController
+        frame_queue: 取得フレームの受け渡しキュー（maxsize=2: ダブルバッファ）
+        stop_event: 停止指示
+        use_lores: Trueならモデル入力サイズのlores frameを渡す
+    """
+    pin_current_thread(CORE_CAPTURE)
+    while not stop_event.is_set():
+        if use_lores:
+            _, frame = camera.capture_frame_and_lores()
+        else:
+            frame = camera.capture_frame()
+        if frame is None:
+            continue
+        # キューが一杯なら空くまで待つ（停止指示を確認するためタイムアウト付き）
+        while not stop_event.is_set():
+            try:
+                frame_queue.put(frame, timeout=0.5)
+                break
+            except queue.Full:
+                pass
+
+def test_tpu_fps(camera, duration=10,
+                 model_path='models/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite',
+                 labels_path='models/coco_labels.txt'):
     """TPU版のFPS測定"""
     print("\n" + "=" * 60)
     print("Test: TPU-Accelerated Detection FPS")
     print("=" * 60)
 
-    model_path = 'models/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite'
-    labels_path = 'models/coco_labels.txt'
-
     try:
+        from pycoral.adapters import common
+        from pycoral.adapters import detect
+
         # TPUモデルのロード
         print(f"Loading TPU model: {model_path}")
-        interpreter = edgetpu.make_interpreter(model_path)
-        interpreter.allocate_tensors()
-
-        # ラベルの読み込み
-        with open(labels_path, 'r') as f:
-            labels = [line.strip() for line in f.readlines()]
+        interpreter = get_interpreter(model_path)
+
+        # ラベルの読み込み（"id name" 形式にも対応。行番号≠クラスIDの場合がある）
+        labels = load_labels(labels_path)
+
+        # ループ不変値を事前に用意（入力サイズ・ボールのクラスID・入力テンソルのアクセサ）
+        # ※ビューを保持したまま invoke() できないため、アクセサだけ保持して毎回呼び出す
+        input_w, input_h = common.input_size(interpreter)
+        try:
+            ball_id = find_label_id(labels, 'sports ball')
+        except ValueError:
+            # 'sports ball' のないラベル（models/labels.txt 等）でもFPSは計測する
+            print(f"⚠️  'sports ball' not in {labels_path}; ball counting disabled")
+            ball_id = None
+        input_tensor = interpreter.tensor(interpreter.get_input_details()[0]['index'])
+
+        # カメラがモデル入力サイズのlores streamを出していればリサイズ不要
+        use_lores = getattr(camera, 'lores_size', None) == (input_w, input_h)
+        print(f"Input source: {'camera lores stream' if use_lores else 'cv2.resize'}")
 
         print(f"Model loaded. Starting FPS test for {duration} seconds...")
 
         frame_count = 0
         ball_detections = 0
         inference_times = []
-        start_time = time.time()
 
-        while (time.time() - start_time) < duration:
-            # フレーム取得
-            frame = camera.capture_frame()
+        # フレーム取得を別スレッドで行い、TPU推論と重ねる
+        frame_queue = queue.Queue(maxsize=2)
+        stop_event = threading.Event()
+        capture_thread = threading.Thread(
+            target=capture_worker, args=(camera, frame_queue, stop_event, use_lores), daemon=True
+        )
+        capture_thread.start()
+
+        # 推論ループ（このスレッド）を取得スレッドと別コアに固定し、優先度を上げる
+        previous_affinity = pin_current_thread(CORE_INFERENCE)
+        reniced = renice_current_thread(INFERENCE_NICE)
+
+        # モデルロード分のコストを計測区間外で払う（ダミー入力で1回推論）
+        interpreter.invoke()
+
+        print(f"Warming up ({WARMUP_FRAMES} frames)...")
+        warmup_left = WARMUP_FRAMES
+        duration_ns = int(duration * 1e9)
+        start_ns = time.monotonic_ns()
+
+        try:
+            while (time.monotonic_ns() - start_ns) < duration_ns:
+                # フレーム取得（取得スレッドから受け取る）
+                try:
+                    frame = frame_queue.get(timeout=1.0)
+                except queue.Empty:
+                    continue
+
+                # 推論開始（区間計測は perf_counter_ns の整数ナノ秒）
+                inference_start_ns = time.perf_counter_ns()
+
+                # 入力画像を入力テンソルへ直接書き込み
+                # （lores frameでも実際の形状がモデル入力と違えばリサイズにフォールバック）
+                if frame.shape[:2] == (input_h, input_w):
+                    np.copyto(input_tensor()[0], frame)
+                else:
+                    # np.resizeは画素補間しないのでcv2を使用
+                    cv2.resize(frame, (input_w, input_h), dst=input_tensor()[0],
+                               interpolation=cv2.INTER_LINEAR)
+
+                # 推論実行
+                interpreter.invoke()
+
+                # 結果取得
+                objs = detect.get_objects(interpreter, score_threshold=0.6)
+
+                # ウォームアップ区間は統計に含めず、終了時点から計測を開始
+                if warmup_left:
+                    warmup_left -= 1
+                    if not warmup_left:
+                        start_ns = time.monotonic_ns()
+                    continue
+
+                inference_times.append(time.perf_counter_ns() - inference_start_ns)
+
+                # sports ball の検出をカウント（1フレーム1回まで）
+                if ball_id is not None and any(obj.id == ball_id for obj in objs):
+                    ball_detections += 1
+
+                frame_count += 1
+        finally:
+            # 次のテストでカメラを使うので取得スレッドを確実に停止
+            stop_event.set()
+            capture_thread.join(timeout=2.0)
+            # 後続のテストに影響しないようコア固定・優先度を元に戻す
+            restore_affinity(previous_affinity)
+            if reniced:
+                os.nice(-INFERENCE_NICE)
+
+        # 区間計測は整数ナノ秒で集計し、最後に秒・ミリ秒へ変換
+        elapsed_time = (time.monotonic_ns() - start_ns) / 1e9
+        fps = frame_count / elapsed_time
+        avg_inference = np.mean(inference_times) / 1e6
+
+        print(f"\n✅ TPU Test Results:")
+        print(f"   Total frames:      {frame_count}")
+        print(f"   Elapsed time:      {elapsed_time:.2f}s")
+        print(f"   FPS:               {fps:.2f}")
+        print(f"   Avg inference:     {avg_inference:.2f}ms")
+        percentiles, stalls = print_latency_distribution(inference_times)
+        print(f"   Ball detections:   {ball_detections}")
+
+        return {
+            'fps': fps,
+            'frames': frame_count,
+            'inference_time': avg_inference,
+            'inference_time_p99': percentiles[99],
+            'inference_percentiles': percentiles,
+            'stalls': stalls,
+            'ball_detections': ball_detections
+        }
+    except Exception as e:
+        print(f"❌ TPU test failed: {e}")
+        traceback.print_exc()
+        return None
+
+def capture_process_worker(ring_name, shape, slots, ready, stop_event):
+    """
+    フレーム取得プロセス（カメラを子プロセスで開き、共有メモリのリングへ書き込む）
+
+    Args:
+        ring_name: SharedFrameRing の共有メモリ名
+        shape: 1フレームの形状 (height, width, 3)（モデル入力サイズ）
+        slots: リングのスロット数
+        ready: フレーム書き込み通知のセマフォ
+        stop_event: 停止指示（multiprocessing.Event）
+    """
+    # カメラ内部のスレッドも継承するよう、カメラを開く前に固定
+    pin_current_thread(CORE_CAPTURE)
+    input_h, input_w = shape[:2]
+    ring = SharedFrameRing(shape, slots, name=ring_name, ready=ready)
+    camera = test_camera_setup(lores_size=(input_w, input_h))
+    if camera is None:
+        ring.close()
+        return
+
+    use_lores = getattr(camera, 'lores_size', None) == (input_w, input_h)
+    try:
+        while not stop_event.is_set():
+            if use_lores:
+                _, frame = camera.capture_frame_and_lores()
+            else:
+                frame = camera.capture_frame()
             if frame is None:
                 continue
+            # リングのスロットは入力サイズ固定。lores frameでも実際の形状が違えばリサイズ
+            if frame.shape[:2] != (input_h, input_w):
+                frame = cv2.resize(frame, (input_w, input_h), interpolation=cv2.INTER_LINEAR)
+            ring.write(frame)
+    finally:
+        camera.stop()
+        camera.cleanup()
+        ring.close()
+
+def test_tpu_fps_capture_process(duration=10,
+                                 model_path='models/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite',
+                                 slots=3):
+    """
+    TPU版のFPS測定（フレーム取得を別プロセスで行い、共有メモリ経由で受け取る）
+
+    取得側のPythonコード（JPEG/YUVデコード等）がGILを奪い合わないよう別プロセスに
+    分け、フレームは SharedFrameRing から入力テンソルへ直接コピーする
+    （multiprocessing.Queue と違い pickle/パイプ転送が発生しない）。
+    カメラは子プロセスで開くため、他のテストでカメラを閉じた後に実行すること。
+    """
+    print("\n" + "=" * 60)
+    print("Test: TPU Detection FPS (capture process + shared memory)")
+    print("=" * 60)
 
-            # 推論開始
-            inference_start = time.time()
+    try:
+        interpreter = get_interpreter(model_path)
+        input_details = interpreter.get_input_details()[0]
+        _, input_h, input_w, _ = input_details['shape']
+        input_tensor = interpreter.tensor(input_details['index'])
+        shape = (int(input_h), int(input_w), 3)
+
+        ring = SharedFrameRing(shape, slots)
+        stop_event = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=capture_process_worker,
+            args=(ring.name, shape, slots, ring.ready, stop_event),
+            daemon=True
+        )
+        process.start()
+
+        print(f"Capture process started (pid={process.pid}). "
+              "Waiting for first frame...")
 
-            # 入力画像のリサイズと前処理
-            input_size = common.input_size(interpreter)
-            resized = np.array(
-                np.resize(frame, (input_size[0], input_size[1], 3)),
-                dtype=np.uint8
-            )
+        frame_count = 0
+        dropped = 0
+        copy_times = []
+        inference_times = []
 
-            # 推論実行
-            common.set_input(interpreter, resized)
-            interpreter.invoke()
+        # 推論ループを取得プロセスと別コアに固定し、優先度を上げる
+        previous_affinity = pin_current_thread(CORE_INFERENCE)
+        reniced = renice_current_thread(INFERENCE_NICE)
 
-            # 結果取得
-            objs = detect.get_objects(interpreter, score_threshold=0.6)
+        # モデルロード分のコストを計測区間外で払う（ダミー入力で1回推論）
+        interpreter.invoke()
 
-            inference_time = (time.time() - inference_start) * 1000
-            inference_times.append(inference_time)
+        try:
+            # 子プロセスのカメラ起動（安定化待ち含む）を計測区間外で待つ
+            last_seq = ring.read_latest(input_tensor()[0], timeout=10.0) or 0
+            if not last_seq:
+                print("❌ No frames received from capture process")
+                return None
 
-            # sports ball (class 37) の検出をカウント
-            for obj in objs:
-                if labels[obj.id] == 'sports ball':
-                    ball_detections += 1
-                    break
+            print(f"Warming up ({WARMUP_FRAMES} frames)...")
+            warmup_left = WARMUP_FRAMES
+            duration_ns = int(duration * 1e9)
+            start_ns = time.monotonic_ns()
 
-            frame_count += 1
+            while (time.monotonic_ns() - start_ns) < duration_ns:
+                if not process.is_alive():
+                    print("❌ Capture process exited")
+                    break
 
-        elapsed_time = time.time() - start_time
+                # 最新フレームを共有メモリから入力テンソルへ直接コピー
+                copy_start_ns = time.monotonic_ns()
+                seq = ring.read_latest(input_tensor()[0], last_seq, timeout=1.0)
+                if seq is None:
+                    continue
+                dropped += seq - last_seq - 1
+                last_seq = seq
+
+                inference_start_ns = time.monotonic_ns()
+                interpreter.invoke()
+
+                # ウォームアップ区間は統計に含めず、終了時点から計測を開始
+                if warmup_left:
+                    warmup_left -= 1
+                    if not warmup_left:
+                        start_ns = time.monotonic_ns()
+                        dropped = 0
+                    continue
+
+                copy_times.append(inference_start_ns - copy_start_ns)
+                inference_times.append(time.monotonic_ns() - inference_start_ns)
+                frame_count += 1
+        finally:
+            stop_event.set()
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+            ring.close()
+            ring.unlink()
+            restore_affinity(previous_affinity)
+            if reniced:
+                os.nice(-INFERENCE_NICE)
+
+        # 区間計測は整数ナノ秒で集計し、最後に秒・ミリ秒へ変換
+        elapsed_time = (time.monotonic_ns() - start_ns) / 1e9
         fps = frame_count / elapsed_time
-        avg_inference = np.mean(inference_times)
+        copy_ms = np.asarray(copy_times, dtype=np.float64) / 1e6
+        inference_ms = np.asarray(inference_times, dtype=np.float64) / 1e6
 
-        print(f"\n✅ TPU Test Results:")
+        print(f"\n✅ Capture Process Test Results:")
         print(f"   Total frames:      {frame_count}")
+        print(f"   Skipped frames:    {dropped}")
         print(f"   Elapsed time:      {elapsed_time:.2f}s")
         print(f"   FPS:               {fps:.2f}")
-        print(f"   Avg inference:     {avg_inference:.2f}ms")
-        print(f"   Ball detections:   {ball_detections}")
+        print(f"   Avg wait+copy:     {copy_ms.mean():.2f}ms")
+        print(f"   Avg inference:     {inference_ms.mean():.2f}ms")
 
         return {
             'fps': fps,
             'frames': frame_count,
-            'inference_time': avg_inference,
-            'ball_detections': ball_detections
+            'skipped': dropped,
+            'copy_time': copy_ms.mean(),
+            'inference_time': inference_ms.mean()
         }
     except Exception as e:
-        print(f"❌ TPU test failed: {e}")
-        import traceback
+        print(f"❌ Capture process test failed: {e}")
         traceback.print_exc()
         return None
 
-def test_cpu_fps(camera, duration=10):
+def test_pipelined_tpu_fps(camera, segment_paths, duration=10):
+    """
+    複数Edge TPUでのパイプライン推論FPS測定
+
+    edgetpu_compiler --num_segments N で分割したモデルの各セグメントを
+    別々のTPUに割り当て、連続するフレームを流れ作業で処理する。
+
+    Args:
+        camera: CameraController
+        segment_paths: セグメントモデルのパス（実行順）
+        duration: 測定時間（秒）
+    """
+    print("\n" + "=" * 60)
+    print(f"Test: Pipelined Detection FPS ({len(segment_paths)} Edge TPUs)")
+    print("=" * 60)
+
+    try:
+        from pycoral.utils import edgetpu
+        from pycoral.pipeline import pipelined_model_runner as pipeline
+
+        tpus = edgetpu.list_edge_tpus()
+        if len(tpus) < len(segment_paths):
+            print(f"⚠️ {len(segment_paths)} segments but only {len(tpus)} Edge TPU(s) found. Skipping.")
+            return None
+
+        # セグメント i を TPU i に割り当て
+        interpreters = []
+        for i, path in enumerate(segment_paths):
+            print(f"Loading segment {i} on TPU :{i}: {path}")
+            interpreter = edgetpu.make_interpreter(path, device=f':{i}')
+            interpreter.allocate_tensors()
+            interpreters.append(interpreter)
+
+        runner = pipeline.PipelinedModelRunner(interpreters)
+        input_details = interpreters[0].get_input_details()[0]
+        input_name = input_details['name']
+        _, input_h, input_w, _ = input_details['shape']
+        use_lores = getattr(camera, 'lores_size', None) == (input_w, input_h)
+
+        print(f"Segments loaded. Starting FPS test for {duration} seconds...")
+
+        # 出力は投入順に返るので、投入時刻のFIFOで1フレーム毎のレイテンシを求める
+        push_times = collections.deque()
+        latencies = []
+
+        def consume():
+            while True:
+                result = runner.pop()
+                if not result:  # 終了通知（空入力）で None / 空dict
+                    break
+                latencies.append(time.monotonic_ns() - push_times.popleft())
+
+        consumer_thread = threading.Thread(target=consume, daemon=True)
+        consumer_thread.start()
+
+        duration_ns = int(duration * 1e9)
+        start_ns = time.monotonic_ns()
+
+        while (time.monotonic_ns() - start_ns) < duration_ns:
+            if use_lores:
+                _, frame = camera.capture_frame_and_lores()
+            else:
+                frame = camera.capture_frame()
+            if frame is None:
+                continue
+
+            # lores frameでも実際の形状がモデル入力と違えばリサイズにフォールバック
+            if frame.shape[:2] != (input_h, input_w):
+                frame = cv2.resize(frame, (input_w, input_h), interpolation=cv2.INTER_LINEAR)
+
+            push_times.append(time.monotonic_ns())
+            # ストライド分を切り落としたlores frameはビューなので、連続配列にして渡す
+            runner.push({input_name: np.ascontiguousarray(frame[np.newaxis, ...])})
+
+        # 空入力で終了を通知し、投入済みフレームを全て取り出す
+        runner.push({})
+        consumer_thread.join()
+
+        # 区間計測は整数ナノ秒で集計し、最後に秒・ミリ秒へ変換
+        elapsed_time = (time.monotonic_ns() - start_ns) / 1e9
+        frame_count = len(latencies)
+        fps = frame_count / elapsed_time
+        latency_ms = np.asarray(latencies, dtype=np.float64) / 1e6
+        avg_latency = latency_ms.mean()
+        p99_latency = np.percentile(latency_ms, 99)
+
+        print(f"\n✅ Pipelined TPU Test Results:")
+        print(f"   Edge TPUs:         {len(segment_paths)}")
+        print(f"   Total frames:      {frame_count}")
+        print(f"   Elapsed time:      {elapsed_time:.2f}s")
+        print(f"   FPS (aggregate):   {fps:.2f}")
+        print(f"   Avg latency:       {avg_latency:.2f}ms")
+        print(f"   P99 latency:       {p99_latency:.2f}ms")
+
+        return {
+            'fps': fps,
+            'frames': frame_count,
+            'num_tpus': len(segment_paths),
+            'latency': avg_latency,
+            'latency_p99': p99_latency
+        }
+    except Exception as e:
+        print(f"❌ Pipelined TPU test failed: {e}")
+        traceback.print_exc()
+        return None
+
+def test_cpu_fps(camera, duration=10,
+                 model_path='models/ssd_mobilenet_v2_coco_quant_postprocess.tflite'):
     """CPU版のFPS測定（参考用）"""
     print("\n" + "=" * 60)
     print("Test: CPU-Only Detection FPS (Reference)")
     print("=" * 60)
 
-    model_path = 'models/ssd_mobilenet_v2_coco_quant_postprocess.tflite'
-
     try:
         # TensorFlow Liteのインポート（CPU版）
         import tflite_runtime.interpreter as tflite
@@ -145,89 +590,169 @@ def test_cpu_fps(camera, duration=10):
         input_details = interpreter.get_input_details()
         output_details = interpreter.get_output_details()
 
+        # モデル入力サイズ（ループ外で1回だけ取得）
+        _, input_h, input_w, _ = input_details[0]['shape']
+
         print(f"Model loaded. Starting FPS test for {duration} seconds...")
 
         frame_count = 0
         inference_times = []
-        start_time = time.time()
+        print(f"Warming up ({WARMUP_FRAMES} frames)...")
+        warmup_left = WARMUP_FRAMES
+        duration_ns = int(duration * 1e9)
+        start_ns = time.monotonic_ns()
 
-        while (time.time() - start_time) < duration:
+        while (time.monotonic_ns() - start_ns) < duration_ns:
             # フレーム取得
             frame = camera.capture_frame()
             if frame is None:
                 continue
 
             # 推論開始
-            inference_start = time.time()
+            inference_start_ns = time.monotonic_ns()
 
-            # 入力画像のリサイズ
-            input_shape = input_details[0]['shape']
-            resized = np.array(
-                np.resize(frame, (input_shape[1], input_shape[2], 3)),
-                dtype=np.uint8
-            )
-            resized = np.expand_dims(resized, axis=0)
+            # 入力画像のリサイズ（バッチ次元はビューで追加）
+            resized = cv2.resize(frame, (input_w, input_h), interpolation=cv2.INTER_LINEAR)
+            resized = resized[np.newaxis, ...]
 
             # 推論実行
             interpreter.set_tensor(input_details[0]['index'], resized)
             interpreter.invoke()
 
-            inference_time = (time.time() - inference_start) * 1000
-            inference_times.append(inference_time)
+            # ウォームアップ区間は統計に含めず、終了時点から計測を開始
+            if warmup_left:
+                warmup_left -= 1
+                if not warmup_left:
+                    start_ns = time.monotonic_ns()
+                continue
+
+            inference_times.append(time.monotonic_ns() - inference_start_ns)
 
             frame_count += 1
 
-        elapsed_time = time.time() - start_time
+        # 区間計測は整数ナノ秒で集計し、最後に秒・ミリ秒へ変換
+        elapsed_time = (time.monotonic_ns() - start_ns) / 1e9
         fps = frame_count / elapsed_time
-        avg_inference = np.mean(inference_times)
+        inference_ms = np.asarray(inference_times, dtype=np.float64) / 1e6
+        avg_inference = inference_ms.mean()
+        p99_inference = np.percentile(inference_ms, 99)
 
         print(f"\n✅ CPU Test Results:")
         print(f"   Total frames:      {frame_count}")
         print(f"   Elapsed time:      {elapsed_time:.2f}s")
         print(f"   FPS:               {fps:.2f}")
         print(f"   Avg inference:     {avg_inference:.2f}ms")
+        print(f"   P99 inference:     {p99_inference:.2f}ms")
 
         return {
             'fps': fps,
             'frames': frame_count,
-            'inference_time': avg_inference
+            'inference_time': avg_inference,
+            'inference_time_p99': p99_inference
         }
     except Exception as e:
         print(f"❌ CPU test failed: {e}")
-        import traceback
         traceback.print_exc()
         return None
 
 def main():
     """メイン関数"""
+    parser = argparse.ArgumentParser(description='Camera + Edge TPU FPS Performance Test')
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=10,
+        help='Measurement time per test in seconds (default: 10)'
+    )
+    parser.add_argument(
+        '--cpu-reference',
+        action='store_true',
+        help='Also run the CPU-only reference test for comparison'
+    )
+    parser.add_argument(
+        '--model',
+        type=str,
+        default='models/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite',
+        help='Edge TPU model path'
+    )
+    parser.add_argument(
+        '--cpu-model',
+        type=str,
+        default='models/ssd_mobilenet_v2_coco_quant_postprocess.tflite',
+        help='CPU model path (used with --cpu-reference)'
+    )
+    parser.add_argument(
+        '--labels',
+        type=str,
+        default='models/coco_labels.txt',
+        help='Label file path'
+    )
+    parser.add_argument(
+        '--segments',
+        type=str,
+        nargs='+',
+        metavar='SEGMENT',
+        help='Segmented Edge TPU models (edgetpu_compiler --num_segments N) '
+             'to also run as a pipeline across N Edge TPUs'
+    )
+    parser.add_argument(
+        '--capture-process',
+        action='store_true',
+        help='Also run the TPU test with capture in a separate process, '
+             'handing frames over through a shared-memory ring buffer'
+    )
+    args = parser.parse_args()
+
     print("\n" + "=" * 60)
     print("Camera + Edge TPU FPS Performance Test")
     print("=" * 60)
     print(f"Python version: {sys.version}")
     print("=" * 60)
 
+    # モデル入力サイズを先に取得し、カメラ側（ISP）でその解像度まで縮小させる
+    # （インタプリタはキャッシュされ、TPU版テストでそのまま再利用される）
+    try:
+        from pycoral.adapters import common
+        lores_size = common.input_size(get_interpreter(args.model))
+    except Exception as e:
+        print(f"⚠️ Could not read model input size, using CPU resize: {e}")
+        lores_size = None
+
     # カメラ初期化
-    camera = test_camera_setup()
+    camera = test_camera_setup(lores_size=lores_size)
     if not camera:
         print("❌ Camera setup failed. Exiting.")
         return 1
 
     # TPU版テスト
-    tpu_results = test_tpu_fps(camera, duration=10)
+    tpu_results = test_tpu_fps(camera, duration=args.duration,
+                               model_path=args.model, labels_path=args.labels)
+
+    # CPU版テスト（参考用、--cpu-reference 指定時のみ）
+    cpu_results = None
+    if args.cpu_reference:
+        cpu_results = test_cpu_fps(camera, duration=args.duration, model_path=args.cpu_model)
 
-    # CPU版テスト（参考用）
-    cpu_results = test_cpu_fps(camera, duration=10)
+    # 複数TPUパイプライン版テスト（--segments 指定時のみ）
+    pipeline_results = None
+    if args.segments:
+        pipeline_results = test_pipelined_tpu_fps(camera, args.segments, duration=args.duration)
 
     # カメラクリーンアップ
     camera.stop()
     camera.cleanup()
 
-    # 比較結果
-    print("\n" + "=" * 60)
-    print("Performance Comparison")
-    print("=" * 60)
+    # 別プロセス取得版テスト（--capture-process 指定時のみ、子プロセスがカメラを開き直す）
+    process_results = None
+    if args.capture_process:
+        process_results = test_tpu_fps_capture_process(duration=args.duration, model_path=args.model)
 
+    # 比較結果
     if tpu_results and cpu_results:
+        print("\n" + "=" * 60)
+        print("Performance Comparison")
+        print("=" * 60)
+
         print(f"\n{'Metric':<20} {'CPU':<15} {'TPU':<15} {'Improvement':<15}")
         print("-" * 65)
 
@@ -237,6 +762,24 @@ def main():
         inference_improvement = (cpu_results['inference_time'] / tpu_results['inference_time'])
         print(f"{'Avg Inference (ms)':<20} {cpu_results['inference_time']:<15.2f} {tpu_results['inference_time']:<15.2f} {inference_improvement:<15.1f}x faster")
 
+    if tpu_results and pipeline_results:
+        print("\n" + "=" * 60)
+        print("Single TPU vs Pipelined")
+        print("=" * 60)
+        speedup = pipeline_results['fps'] / tpu_results['fps']
+        pipeline_label = f"Pipelined FPS ({pipeline_results['num_tpus']} TPUs):"
+        print(f"  {'Single TPU FPS:':<30} {tpu_results['fps']:.2f}")
+        print(f"  {pipeline_label:<30} {pipeline_results['fps']:.2f} ({speedup:.2f}x)")
+        print(f"  {'Pipelined FPS per TPU:':<30} {pipeline_results['fps'] / pipeline_results['num_tpus']:.2f}")
+
+    if tpu_results and process_results:
+        print("\n" + "=" * 60)
+        print("Capture Thread vs Capture Process")
+        print("=" * 60)
+        print(f"  {'Thread + Queue FPS:':<30} {tpu_results['fps']:.2f}")
+        print(f"  {'Process + shared memory FPS:':<30} {process_results['fps']:.2f}")
+
+    if tpu_results:
         print("\n" + "=" * 60)
         print("✅ Test completed successfully!")
         print("=" * 60)
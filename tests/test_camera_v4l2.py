@@ -9,10 +9,14 @@ in the Python 3.9 environment needed for Edge TPU.
 import sys
 import os
 import time
+import logging
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
 print("=" * 70)
 print("RaspberryPi Camera Module 3 - v4l2/OpenCV Test")
 print("=" * 70)
@@ -104,34 +108,47 @@ print("✅ Camera started")
 
 # Capture frames and measure FPS
 print("\n" + "=" * 70)
-print("Capturing frames (30 frames)...")
+NUM_FRAMES = 30
+WARMUP_FRAMES = 5  # 先頭フレームはAE/AWB収束中のため統計から除外
+
+print(f"Capturing frames ({NUM_FRAMES} frames)...")
 print("=" * 70)
 
-frame_times = []
+# 計測値は事前確保したint64配列へ格納（Python int をリストに溜めない）
+frame_times = np.empty(NUM_FRAMES - WARMUP_FRAMES, dtype=np.int64)
+timed_frames = 0
 successful_captures = 0
 
-for i in range(30):
-    start = time.time()
+print(f"Warming up ({WARMUP_FRAMES} frames)...")
+for i in range(NUM_FRAMES):
+    start_ns = time.monotonic_ns()
     frame = camera.capture_frame()
-    end = time.time()
+    end_ns = time.monotonic_ns()
 
     if frame is not None:
         successful_captures += 1
-        frame_times.append(end - start)
+        if i >= WARMUP_FRAMES:
+            frame_times[timed_frames] = end_ns - start_ns  # ナノ秒（整数）
+            timed_frames += 1
 
+        # 計測ループ内では標準出力に書かない（DEBUGレベル時のみ表示）
         if i % 10 == 0:
-            print(f"Frame {i+1}/30: shape={frame.shape}, dtype={frame.dtype}")
+            logger.debug(f"Frame {i+1}/{NUM_FRAMES}: shape={frame.shape}, dtype={frame.dtype}")
     else:
-        print(f"❌ Failed to capture frame {i+1}")
+        logger.warning(f"❌ Failed to capture frame {i+1}")
 
-print(f"\n✅ Captured {successful_captures}/30 frames")
+print(f"\n✅ Captured {successful_captures}/{NUM_FRAMES} frames")
+frame_times = frame_times[:timed_frames]  # 取得失敗分を除外（ビュー、コピーなし）
 
 # Calculate FPS statistics
-if frame_times:
-    avg_time = sum(frame_times) / len(frame_times)
+if frame_times.size:
+    # 区間計測は整数ナノ秒で集計し、最後に秒へ変換
+    ft = frame_times / 1e9
+    avg_time = ft.mean()
     avg_fps = 1.0 / avg_time if avg_time > 0 else 0
-    min_time = min(frame_times)
-    max_time = max(frame_times)
+    min_time = ft.min()
+    max_time = ft.max()
+    p99_time = np.percentile(ft, 99)
     max_fps = 1.0 / min_time if min_time > 0 else 0
     min_fps = 1.0 / max_time if max_time > 0 else 0
 
@@ -140,6 +157,7 @@ if frame_times:
     print(f"  Min FPS: {min_fps:.2f}")
     print(f"  Max FPS: {max_fps:.2f}")
     print(f"  Average capture time: {avg_time*1000:.2f} ms")
+    print(f"  P99 capture time: {p99_time*1000:.2f} ms")
 
     if avg_fps >= 30:
         print(f"\n✅ Target FPS achieved: {avg_fps:.2f} >= 30")
@@ -153,14 +171,10 @@ print("\n" + "=" * 70)
 print("Testing JPEG capture...")
 print("=" * 70)
 
-test_jpeg = "/tmp/test_camera_v4l2.jpg"
-if camera.capture_jpeg(test_jpeg):
-    if os.path.exists(test_jpeg):
-        file_size = os.path.getsize(test_jpeg)
-        print(f"✅ JPEG saved: {test_jpeg} ({file_size} bytes)")
-        os.remove(test_jpeg)
-    else:
-        print(f"❌ JPEG file not created: {test_jpeg}")
+# メモリ上でエンコード（ディスク書き込みなし）
+jpeg_bytes = camera.capture_jpeg_bytes()
+if jpeg_bytes and jpeg_bytes[:2] == b'\xff\xd8':
+    print(f"✅ JPEG encoded: {len(jpeg_bytes)} bytes")
 else:
     print("❌ JPEG capture failed")
 
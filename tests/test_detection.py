@@ -6,62 +6,81 @@ Success Criteria:
 - TPU model loads successfully
 - Detection runs at >20 FPS (inference time <20ms)
 - Detects sports ball with ≥80% accuracy
+
+Run with pytest (tests are skipped when no Edge TPU is available):
+    pytest tests/test_detection.py -v
 """
 
 import sys
 import os
+import time
 import logging
 
+import numpy as np
+import pytest
+
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 logger = logging.getLogger(__name__)
 
+MODEL_PATH = "models/ssd_mobilenet_v2_coco_quant_postprocess_edgetpu.tflite"
+LABELS_PATH = "models/coco_labels.txt"
+
+# Inference time target (ms) and number of timed runs per resolution
+INFERENCE_TARGET_MS = 20
+TIMED_RUNS = 20
+
+
+@pytest.fixture(scope="module")
+def detector():
+    """Edge TPU detector, loaded once for all tests in this module"""
+    from src.detection.edgetpu_detector import EdgeTPUDetector
+
+    try:
+        det = EdgeTPUDetector(MODEL_PATH, LABELS_PATH)
+    except (RuntimeError, OSError) as e:
+        pytest.skip(f"Edge TPU detector unavailable: {e}")
+
+    yield det
+    det.close()
 
-def test_tpu_initialization():
+
+def test_tpu_initialization(detector):
     """Test TPU engine initialization"""
     logger.info("TEST: TPU Initialization")
-    # Placeholder - implementation pending
-    return False
-
+    assert detector.interpreter is not None
+    assert detector.labels, "No labels loaded"
 
-def test_ball_detection():
-    """Test ball detection"""
-    logger.info("TEST: Ball Detection")
-    # Placeholder - implementation pending
-    return False
 
+@pytest.mark.parametrize("resolution", [(640, 480), (1280, 720)])
+def test_inference_time(detector, resolution):
+    """Test that inference (incl. preprocessing) stays under the target"""
+    logger.info(f"TEST: Inference Time {resolution[0]}x{resolution[1]}")
+    width, height = resolution
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
 
-def run_all_tests():
-    """Run all Phase 2 tests"""
-    logger.info("=" * 70)
-    logger.info("PHASE 2: TPU DETECTION TEST SUITE")
-    logger.info("=" * 70)
+    # Warm-up run (first invoke includes model upload to the TPU)
+    detector.detect_objects(frame)
 
-    tests = [
-        ("TPU Initialization", test_tpu_initialization),
-        ("Ball Detection", test_ball_detection),
-    ]
+    times_ns = []
+    for _ in range(TIMED_RUNS):
+        start_ns = time.monotonic_ns()
+        detector.detect_objects(frame)
+        times_ns.append(time.monotonic_ns() - start_ns)
 
-    passed = 0
-    failed = 0
+    avg_ms = np.mean(times_ns) / 1e6
+    logger.info(f"Average inference: {avg_ms:.2f}ms")
+    assert avg_ms < INFERENCE_TARGET_MS
 
-    for test_name, test_func in tests:
-        try:
-            result = test_func()
-            if result:
-                passed += 1
-            else:
-                failed += 1
-        except Exception as e:
-            logger.error(f"Exception in '{test_name}': {e}")
-            failed += 1
 
-    logger.info(f"\nResults: {passed} passed, {failed} failed")
-    return failed == 0
+def test_ball_detection(detector):
+    """Test ball detection"""
+    logger.info("TEST: Ball Detection")
+    # Placeholder - implementation pending (needs labelled ball images)
+    pytest.skip("Ball detection accuracy test not implemented yet")
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    success = run_all_tests()
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, "-v"]))
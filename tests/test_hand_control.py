@@ -14,16 +14,18 @@ MediaPipe Handsを使用して人の手と指の角度を検出し、
   ブラウザで http://<RaspberryPiのIPアドレス>:8000 にアクセス
 """
 
+import asyncio
 import io
 import sys
 import os
+import socket
 import time
 import logging
-from threading import Condition, Thread, Lock
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Thread, Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import cv2
 import numpy as np
-import json
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -32,6 +34,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.camera import CameraController
 from src.arduino.serial_controller import SerialController
 from src.hand_control import HandDetector, FingerMapper
+from src.utils.jpeg import encode_jpeg
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,52 +42,157 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# aiohttp（asyncio単一スレッドのイベントループ）が使えればMJPEGサーバーに使用
+try:
+    from aiohttp import web
+except ImportError as e:
+    web = None
+    logger.warning(f"aiohttp not available, using http.server: {e}")
+
+
 # ストリーミング出力クラス
 class StreamingOutput(io.BufferedIOBase):
+    """
+    最新フレームを1つだけ保持する出力スロット（書き込み1・読み出し多）
+
+    (seq, frame) のタプルを丸ごと差し替えるため、書き込み側はクライアントを
+    待たずに次のフレームへ進め、読み出し側は常に最新フレームだけを取得する。
+    新フレーム通知は世代ごとの Event で行う（aiohttp使用時はイベントループにも通知）。
+    """
+
     def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-        self.frame_count = 0
+        self._slot = (0, None)  # (フレーム番号, JPEGバイト列)
+        self._new_frame = Event()
+        self._loop = None  # attach_loop() 後はasyncioイベントループにも通知
+        self._new_frame_async = None
+        self._clients = 0  # 接続中のストリーミングクライアント数
+        self._clients_lock = Lock()
+
+    @property
+    def frame(self):
+        return self._slot[1]
+
+    @property
+    def frame_count(self):
+        return self._slot[0]
+
+    @property
+    def clients(self):
+        return self._clients
+
+    def add_client(self):
+        with self._clients_lock:
+            self._clients += 1
+
+    def remove_client(self):
+        with self._clients_lock:
+            self._clients -= 1
 
     def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.frame_count += 1
-            if self.frame_count % 30 == 0:
-                logger.info(f"ストリーム出力: {self.frame_count} フレーム送信完了")
-            self.condition.notify_all()
+        self._slot = (self._slot[0] + 1, buf)
+        # 待機中のクライアントを起こし、次のフレーム用に新しい Event へ差し替え
+        event, self._new_frame = self._new_frame, Event()
+        event.set()
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._notify_async)
+            except RuntimeError:
+                # サーバー停止でイベントループが閉じた後は通知しない
+                self._loop = None
+
+    def attach_loop(self, loop):
+        """asyncioイベントループから新フレームを待てるようにする（ループ上で呼ぶ）"""
+        self._new_frame_async = asyncio.Event()
+        self._loop = loop
+
+    def detach_loop(self):
+        """イベントループへの通知をやめる（ループを閉じる前に呼ぶ）"""
+        self._loop = None
+
+    def _notify_async(self):
+        # イベントループのスレッドで実行（asyncio.Event はスレッドセーフでないため）
+        event, self._new_frame_async = self._new_frame_async, asyncio.Event()
+        event.set()
+
+    async def frames(self, timeout=5.0):
+        """
+        新しいフレームを順に返す非同期イテレータ（遅いクライアントは途中のフレームを読み飛ばす）
+        """
+        last_sent = 0  # frame_count=0 はフレーム未出力
+        while True:
+            event = self._new_frame_async
+            seq, frame = self._slot
+            if seq == last_sent:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    logger.warning("⚠️  タイムアウト: 新しいフレームなし")
+                continue
+            last_sent = seq
+            yield frame
+
+    def wait_for_frame(self, last_seq, timeout=5.0):
+        """
+        last_seq より新しいフレームを待つ
+
+        Returns:
+            (seq, JPEGバイト列)。タイムアウト時は seq == last_seq
+        """
+        event = self._new_frame
+        slot = self._slot
+        if slot[0] == last_seq:
+            event.wait(timeout)
+            slot = self._slot
+        return slot
 
 
 # グローバル変数
 output = StreamingOutput()
+stats_output = StreamingOutput()  # 最新の統計JSON（変化時のみ更新、SSEで配信）
+last_stats = b''  # 最後に公開した統計JSON
+last_stats_ns = 0  # 最後に統計を公開した時刻（単調時計、ナノ秒）
 hand_detector = None
 finger_mapper = None
 serial_controller = None
 fps_counter = 0
-fps_start_time = time.time()
+fps_start_ns = time.monotonic_ns()  # FPS計測区間の開始（単調時計、ナノ秒）
 current_fps = 0
 total_detections = 0
 left_hand_detections = 0
 right_hand_detections = 0
 avg_detection_time = 0
+DETECTION_AVG_WINDOW = 30  # 検出時間の移動平均を取るフレーム数
+# 統計の公開間隔の下限（ナノ秒）。検出時間・検出回数はほぼ毎フレーム変わるため、
+# 変化時の公開でもSSEイベントは最大2回/秒（従来のポーリングと同じ頻度）に抑える
+STATS_PUBLISH_INTERVAL_NS = 500_000_000
+STREAM_SNDBUF = 1 << 20  # ストリーミングソケットの送信バッファ（バイト）
+# /stats のJSONテンプレート（json.dumps を使わず数値だけを埋め込む）
+STATS_FMT = (b'{"fps":%.2f,"detection_time":%.2f,"total_detections":%d,'
+             b'"left_hand_detections":%d,"right_hand_detections":%d,"servo_states":{%s}}')
 current_servo_states = {}  # {channel: angle}
 servo_lock = Lock()
 
 
 # HTTPリクエストハンドラ
 class StreamingHandler(BaseHTTPRequestHandler):
+    def setup(self):
+        super().setup()
+        # Nagleアルゴリズムを無効化し（ACK待ちの遅延を防ぐ）、送信バッファを拡大
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, STREAM_SNDBUF)
+
     def do_GET(self):
         if self.path == '/':
             self.send_response(301)
             self.send_header('Location', '/index.html')
             self.end_headers()
         elif self.path == '/index.html':
-            content = PAGE.encode('utf-8')
             self.send_response(200)
             self.send_header('Content-Type', 'text/html')
-            self.send_header('Content-Length', len(content))
+            self.send_header('Content-Length', PAGE_LEN)
             self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(PAGE_BYTES)
         elif self.path == '/stream.mjpg':
             logger.info(f"📹 ストリーミングクライアント接続: {self.client_address}")
             self.send_response(200)
@@ -93,45 +201,51 @@ class StreamingHandler(BaseHTTPRequestHandler):
             self.send_header('Pragma', 'no-cache')
             self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
             self.end_headers()
+            output.add_client()
             try:
                 frame_sent = 0
+                last_sent = 0  # frame_count=0 はフレーム未出力
                 while True:
-                    with output.condition:
-                        if output.frame is None:
-                            logger.warning("⚠️  フレームが利用不可、待機中...")
-                        output.condition.wait(timeout=5.0)
-                        frame = output.frame
-
-                    if frame is None:
-                        logger.warning("⚠️  タイムアウト後もフレームがNone")
+                    # 最新フレームを取得（遅いクライアントは途中のフレームを読み飛ばす）
+                    seq, frame = output.wait_for_frame(last_sent, timeout=5.0)
+
+                    if frame is None or seq == last_sent:
+                        logger.warning("⚠️  タイムアウト: 新しいフレームなし")
                         continue
+                    last_sent = seq
 
-                    self.wfile.write(b'--FRAME\r\n')
-                    self.send_header('Content-Type', 'image/jpeg')
-                    self.send_header('Content-Length', len(frame))
-                    self.end_headers()
-                    self.wfile.write(frame)
-                    self.wfile.write(b'\r\n')
+                    # 境界・ヘッダー・本体を1回の書き込みで送る（パケット数を減らす）
+                    self.wfile.write(
+                        b'--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%s\r\n'
+                        % (len(frame), frame)
+                    )
 
                     frame_sent += 1
                     if frame_sent == 1:
                         logger.info(f"✅ 最初のフレームをクライアントに送信")
             except Exception as e:
                 logger.warning(f'Removed streaming client {self.client_address}: {str(e)}')
+            finally:
+                output.remove_client()
+        elif self.path == '/stats/stream':
+            # 統計情報が変化するたびにServer-Sent Eventsでプッシュ
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            try:
+                last_sent = 0
+                while True:
+                    seq, content = stats_output.wait_for_frame(last_sent, timeout=5.0)
+                    if content is None or seq == last_sent:
+                        continue
+                    last_sent = seq
+                    self.wfile.write(b'data: %s\n\n' % content)
+            except Exception as e:
+                logger.info(f'Removed stats client {self.client_address}: {str(e)}')
         elif self.path == '/stats':
             # 統計情報をJSON形式で返す
-            with servo_lock:
-                servo_states_copy = current_servo_states.copy()
-
-            stats = {
-                'fps': current_fps,
-                'total_detections': total_detections,
-                'left_hand_detections': left_hand_detections,
-                'right_hand_detections': right_hand_detections,
-                'detection_time': avg_detection_time,
-                'servo_states': servo_states_copy
-            }
-            content = json.dumps(stats).encode('utf-8')
+            content = stats_json()
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Cache-Control', 'no-cache')
@@ -326,41 +440,158 @@ img {
 </div>
 
 <script>
-// 統計情報を定期的に更新
-setInterval(function() {
-    fetch('/stats')
-        .then(response => response.json())
-        .then(data => {
-            document.getElementById('fps').textContent = data.fps.toFixed(1);
-            document.getElementById('detection').textContent = data.detection_time.toFixed(1) + 'ms';
-            document.getElementById('total').textContent = data.total_detections;
-            document.getElementById('left').textContent = data.left_hand_detections;
-            document.getElementById('right').textContent = data.right_hand_detections;
-
-            // サーボ状態を更新（walk_program.ino準拠: 中指はch 8）
-            const servos = data.servo_states;
-            document.getElementById('left_thumb').textContent = servos[0] !== undefined ? servos[0] + '°' : '--°';
-            document.getElementById('left_index').textContent = servos[2] !== undefined ? servos[2] + '°' : '--°';
-            document.getElementById('left_middle').textContent = servos[8] !== undefined ? servos[8] + '°' : '--°';  // ch 8
-            document.getElementById('left_ring').textContent = servos[6] !== undefined ? servos[6] + '°' : '--°';
-            document.getElementById('right_thumb').textContent = servos[1] !== undefined ? servos[1] + '°' : '--°';
-            document.getElementById('right_index').textContent = servos[3] !== undefined ? servos[3] + '°' : '--°';
-            document.getElementById('right_middle').textContent = servos[5] !== undefined ? servos[5] + '°' : '--°';
-            document.getElementById('right_ring').textContent = servos[7] !== undefined ? servos[7] + '°' : '--°';
-        })
-        .catch(err => console.error('Stats update failed:', err));
-}, 500);  // 0.5秒ごとに更新
+// 統計情報はサーバーから変化時にプッシュされる（Server-Sent Events）
+const statsSource = new EventSource('/stats/stream');
+statsSource.onmessage = function(event) {
+    const data = JSON.parse(event.data);
+    document.getElementById('fps').textContent = data.fps.toFixed(1);
+    document.getElementById('detection').textContent = data.detection_time.toFixed(1) + 'ms';
+    document.getElementById('total').textContent = data.total_detections;
+    document.getElementById('left').textContent = data.left_hand_detections;
+    document.getElementById('right').textContent = data.right_hand_detections;
+
+    // サーボ状態を更新（walk_program.ino準拠: 中指はch 8）
+    const servos = data.servo_states;
+    document.getElementById('left_thumb').textContent = servos[0] !== undefined ? servos[0] + '°' : '--°';
+    document.getElementById('left_index').textContent = servos[2] !== undefined ? servos[2] + '°' : '--°';
+    document.getElementById('left_middle').textContent = servos[8] !== undefined ? servos[8] + '°' : '--°';  // ch 8
+    document.getElementById('left_ring').textContent = servos[6] !== undefined ? servos[6] + '°' : '--°';
+    document.getElementById('right_thumb').textContent = servos[1] !== undefined ? servos[1] + '°' : '--°';
+    document.getElementById('right_index').textContent = servos[3] !== undefined ? servos[3] + '°' : '--°';
+    document.getElementById('right_middle').textContent = servos[5] !== undefined ? servos[5] + '°' : '--°';
+    document.getElementById('right_ring').textContent = servos[7] !== undefined ? servos[7] + '°' : '--°';
+};
+statsSource.onerror = err => console.error('Stats stream error:', err);  // 切断時は自動再接続
 </script>
 </body>
 </html>
 """
 
+# 静的ページなので起動時に1回だけエンコード
+PAGE_BYTES = PAGE.encode('utf-8')
+PAGE_LEN = str(len(PAGE_BYTES))
 
-class StreamingServer(HTTPServer):
+
+# ストリーム・SSEの接続は開いたままになるため、クライアントごとにスレッドで処理
+class StreamingServer(ThreadingHTTPServer):
     allow_reuse_address = True
     daemon_threads = True
 
 
+def stats_json():
+    """統計情報をJSONバイト列で返す"""
+    # ロック中はタプルへのスナップショットのみ
+    with servo_lock:
+        servo_items = tuple(current_servo_states.items())
+
+    servo_states = b','.join(b'"%d":%d' % item for item in sorted(servo_items))
+    return STATS_FMT % (current_fps, avg_detection_time, total_detections,
+                        left_hand_detections, right_hand_detections, servo_states)
+
+
+async def handle_root(request):
+    raise web.HTTPMovedPermanently('/index.html')
+
+
+async def handle_index(request):
+    return web.Response(body=PAGE_BYTES, content_type='text/html', charset='utf-8')
+
+
+async def handle_stream(request):
+    """MJPEGストリーム（multipart/x-mixed-replace）"""
+    logger.info(f"📹 ストリーミングクライアント接続: {request.remote}")
+    response = web.StreamResponse(headers={
+        'Age': '0',
+        'Cache-Control': 'no-cache, private',
+        'Pragma': 'no-cache',
+        'Content-Type': 'multipart/x-mixed-replace; boundary=FRAME'
+    })
+    await response.prepare(request)
+    output.add_client()
+    try:
+        frame_sent = 0
+        async for frame in output.frames():
+            # 境界・ヘッダー・本体を1回の書き込みで送る
+            await response.write(
+                b'--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%s\r\n'
+                % (len(frame), frame)
+            )
+
+            frame_sent += 1
+            if frame_sent == 1:
+                logger.info(f"✅ 最初のフレームをクライアントに送信")
+    except Exception as e:
+        logger.warning(f'Removed streaming client {request.remote}: {str(e)}')
+    finally:
+        output.remove_client()
+    return response
+
+
+async def handle_stats_stream(request):
+    """統計情報が変化するたびにServer-Sent Eventsでプッシュ"""
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache'
+    })
+    await response.prepare(request)
+    try:
+        async for content in stats_output.frames():
+            await response.write(b'data: %s\n\n' % content)
+    except Exception as e:
+        logger.info(f'Removed stats client {request.remote}: {str(e)}')
+    return response
+
+
+async def handle_stats(request):
+    return web.Response(body=stats_json(), content_type='application/json', headers={
+        'Cache-Control': 'no-cache',
+        'Access-Control-Allow-Origin': '*'
+    })
+
+
+def run_aiohttp_server(port=8000):
+    """
+    aiohttpでHTTPサーバーを実行（1スレッドのイベントループで全クライアントを処理）
+
+    フレーム処理スレッドからの新フレーム通知は call_soon_threadsafe で受け取る。
+    """
+    async def on_startup(app):
+        output.attach_loop(asyncio.get_running_loop())
+        stats_output.attach_loop(asyncio.get_running_loop())
+
+    async def on_cleanup(app):
+        # run_app はこの後イベントループを閉じるが、フレーム処理スレッドは書き込みを続ける
+        output.detach_loop()
+        stats_output.detach_loop()
+
+    app = web.Application()
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    app.router.add_get('/', handle_root)
+    app.router.add_get('/index.html', handle_index)
+    app.router.add_get('/stream.mjpg', handle_stream)
+    app.router.add_get('/stats', handle_stats)
+    app.router.add_get('/stats/stream', handle_stats_stream)
+    web.run_app(app, port=port, print=None, access_log=None)
+
+
+def publish_stats():
+    """
+    統計情報が前回から変化していれば stats_output に書き込む（SSEクライアントへ通知）
+
+    毎フレーム呼ばれるが、前回の公開から STATS_PUBLISH_INTERVAL_NS 経つまでは何もしない
+    """
+    global last_stats, last_stats_ns
+    now_ns = time.monotonic_ns()
+    if now_ns - last_stats_ns < STATS_PUBLISH_INTERVAL_NS:
+        return
+    content = stats_json()
+    if content != last_stats:
+        stats_output.write(content)
+        last_stats = content
+        last_stats_ns = now_ns
+
+
 def update_servo_states(servo_commands: dict):
     """サーボ状態を更新"""
     global current_servo_states
@@ -373,17 +604,36 @@ def process_frames(camera, detector, mapper, serial):
     """
     フレームを処理し、手を検出してサーボ制御
     """
-    global fps_counter, fps_start_time, current_fps, avg_detection_time
+    global fps_counter, fps_start_ns, current_fps, avg_detection_time
     global total_detections, left_hand_detections, right_hand_detections
 
     logger.info("フレーム処理ループ開始")
 
+    # OpenCVの内部並列化を無効化（resize・putText・imencodeが全コアにスレッドを広げ、
+    # 検出・取得・エンコード・HTTPの各スレッドとコアを奪い合うのを防ぐ）
+    cv2.setNumThreads(1)
+    cv2.ocl.setUseOpenCL(False)
+
     frame_count = 0
-    detection_times = []
+    last_servo_commands = None  # 最後に送信したサーボコマンド
+
+    # 検出時間の移動平均用リングバッファ（合計を差分更新し、毎フレームの
+    # list.pop(0)・np.mean を避ける）
+    detection_times = np.zeros(DETECTION_AVG_WINDOW, dtype=np.float64)
+    detection_idx = 0
+    detection_sum = 0.0
+    detection_n = 0
+
+    # フレーム取得（次フレーム）とJPEGエンコード（前フレーム）をスレッドプールで
+    # 手検出（このスレッド）と並行実行する。いずれもGILを解放するネイティブ処理が主体
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hand-io')
+    capture_future = executor.submit(camera.capture_frame)
+    encode_future = None
 
     while True:
-        # フレーム取得
-        frame = camera.capture_frame()
+        # フレーム取得（取得済みのものを受け取り、すぐ次の取得を投入）
+        frame = capture_future.result()
+        capture_future = executor.submit(camera.capture_frame)
         if frame is None:
             if frame_count % 30 == 0:
                 logger.warning("⚠️  フレーム取得失敗（None）")
@@ -396,15 +646,16 @@ def process_frames(camera, detector, mapper, serial):
         frame_count += 1
 
         # 手検出実行
-        detection_start = time.time()
+        detection_start_ns = time.monotonic_ns()
         hand_data = detector.detect(frame)
-        detection_time = (time.time() - detection_start) * 1000
-        detection_times.append(detection_time)
+        detection_time = (time.monotonic_ns() - detection_start_ns) / 1e6  # ms
 
-        # 検出時間の移動平均（最新30フレーム）
-        if len(detection_times) > 30:
-            detection_times.pop(0)
-        avg_detection_time = np.mean(detection_times)
+        # 検出時間の移動平均（最新 DETECTION_AVG_WINDOW フレーム）
+        detection_sum += detection_time - detection_times[detection_idx]
+        detection_times[detection_idx] = detection_time
+        detection_idx = (detection_idx + 1) % DETECTION_AVG_WINDOW
+        detection_n = min(detection_n + 1, DETECTION_AVG_WINDOW)
+        avg_detection_time = detection_sum / detection_n
 
         # 検出統計を更新
         hands_detected = 0
@@ -421,12 +672,16 @@ def process_frames(camera, detector, mapper, serial):
             # 指の角度をサーボ角度にマッピング
             servo_commands = mapper.map_hand_to_servos(hand_data)
 
-            # サーボ状態を更新（表示用）
-            update_servo_states(servo_commands)
+            # 前回送信時から角度が変わっていなければ更新・送信を省略
+            # （手が静止している間は servo_lock もシリアル往復も発生しない）
+            if servo_commands != last_servo_commands:
+                # サーボ状態を更新（表示用）
+                update_servo_states(servo_commands)
 
-            # Arduinoにサーボコマンドを送信
-            for channel, angle in servo_commands.items():
-                serial.send_servo_command(channel, angle)
+                # Arduinoにサーボコマンドを一括送信（1パケット・1往復）
+                # 送信に失敗したら記録せず、次フレームで同じ角度でも再送する
+                if serial.send_servo_batch(servo_commands):
+                    last_servo_commands = servo_commands
 
             # ログ出力（デバッグ用、30フレームに1回）
             if frame_count % 30 == 0:
@@ -434,47 +689,56 @@ def process_frames(camera, detector, mapper, serial):
                            f"R={hand_data['right_hand'] is not None}, "
                            f"サーボ更新: {len(servo_commands)}ch")
 
-        # ランドマークを描画
-        frame = detector.draw_landmarks(frame)
-
         # FPS計算
         fps_counter += 1
         if fps_counter >= 30:
-            current_fps = fps_counter / (time.time() - fps_start_time)
+            now_ns = time.monotonic_ns()
+            current_fps = fps_counter * 1e9 / (now_ns - fps_start_ns)
             fps_counter = 0
-            fps_start_time = time.time()
+            fps_start_ns = now_ns
 
-        # 情報を画面に表示
-        cv2.putText(frame, f"FPS: {current_fps:.1f}", (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Detection: {avg_detection_time:.1f}ms", (10, 65),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        # 配信先のクライアントがいない間は描画・JPEGエンコードを省略
+        # （手検出・サーボ制御はヘッドレスでも継続）
+        streaming = output.clients > 0
 
-        # 手検出状態を表示
-        status_text = "Hands: "
-        if hand_data['left_hand']:
-            status_text += "LEFT "
-        if hand_data['right_hand']:
-            status_text += "RIGHT"
-        if not hand_data['left_hand'] and not hand_data['right_hand']:
-            status_text += "NONE"
+        if streaming:
+            # ランドマークを描画
+            frame = detector.draw_landmarks(frame)
+
+            # 情報を画面に表示
+            cv2.putText(frame, f"FPS: {current_fps:.1f}", (10, 30),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.putText(frame, f"Detection: {avg_detection_time:.1f}ms", (10, 65),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
 
-        cv2.putText(frame, status_text, (10, 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            # 手検出状態を表示
+            status_text = "Hands: "
+            if hand_data['left_hand']:
+                status_text += "LEFT "
+            if hand_data['right_hand']:
+                status_text += "RIGHT"
+            if not hand_data['left_hand'] and not hand_data['right_hand']:
+                status_text += "NONE"
 
-        # BGRに変換してJPEGエンコード
-        frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        _, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 80])
+            cv2.putText(frame, status_text, (10, 100),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
 
-        # ストリーミング出力に書き込み
-        jpeg_bytes = jpeg.tobytes()
-        with output.condition:
-            output.frame = jpeg_bytes
-            output.condition.notify_all()
+        # 前フレームのエンコード結果をストリーミング出力に書き込み
+        # （最新フレームを差し替えるだけで待たない）
+        if encode_future is not None:
+            jpeg_bytes = encode_future.result()
+            encode_future = None
+            output.write(jpeg_bytes)
 
-        # 最初のフレーム出力成功をログ
-        if frame_count == 1:
-            logger.info(f"✅ 最初のJPEGフレーム出力成功: {len(jpeg_bytes)} bytes")
+            # 最初のフレーム出力成功をログ
+            if output.frame_count == 1:
+                logger.info(f"✅ 最初のJPEGフレーム出力成功: {len(jpeg_bytes)} bytes")
+
+        publish_stats()
+
+        # JPEGエンコードを投入（RGBのまま。次フレームの検出中にバックグラウンドで実行）
+        if streaming:
+            encode_future = executor.submit(encode_jpeg, frame, 80, 'RGB')
 
 
 if __name__ == '__main__':
@@ -521,7 +785,7 @@ if __name__ == '__main__':
 
     # Arduinoシリアル通信初期化
     logger.info("📡 Arduinoに接続中...")
-    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=9600)
+    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=115200)
 
     if not serial_controller.connect():
         logger.error("❌ Arduinoへの接続に失敗しました。Arduino接続が必要です。")
@@ -542,8 +806,6 @@ if __name__ == '__main__':
 
     try:
         # サーバー起動
-        address = ('', 8000)
-        server = StreamingServer(address, StreamingHandler)
         logger.info("=" * 70)
         logger.info("🌐 手指検出ストリーミングサーバー起動！")
         logger.info("=" * 70)
@@ -557,7 +819,11 @@ if __name__ == '__main__':
         logger.info("=" * 70)
         logger.info("終了するには Ctrl+C を押してください")
         logger.info("=" * 70)
-        server.serve_forever()
+        if web is not None:
+            run_aiohttp_server(8000)
+        else:
+            server = StreamingServer(('', 8000), StreamingHandler)
+            server.serve_forever()
     except KeyboardInterrupt:
         logger.info("\n🛑 停止中...")
     finally:
@@ -14,24 +14,27 @@ Google Coral TPUとhand_landmark_newモデルを使用して人の手と指の
   ブラウザで http://<RaspberryPiのIPアドレス>:8000 にアクセス
 """
 
-import io
+import multiprocessing
 import sys
 import os
+import socket
 import time
 import logging
-from threading import Condition, Thread, Lock
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import cv2
 import numpy as np
-import json
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 # Import components
-from src.camera import CameraController
+from src.camera import CameraController, SharedFrameSlot
 from src.arduino.serial_controller import SerialController
 from src.hand_control import HandDetectorTPU, FingerMapper
+from src.utils.affinity import pin_current_thread, restore_affinity
+from src.utils.jpeg import encode_jpeg
 
 logging.basicConfig(
     level=logging.INFO,
@@ -39,52 +42,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# ストリーミング出力クラス
-class StreamingOutput(io.BufferedIOBase):
-    def __init__(self):
-        self.frame = None
-        self.condition = Condition()
-        self.frame_count = 0
-
-    def write(self, buf):
-        with self.condition:
-            self.frame = buf
-            self.frame_count += 1
-            if self.frame_count % 30 == 0:
-                logger.info(f"ストリーム出力: {self.frame_count} フレーム送信完了")
-            self.condition.notify_all()
+# 共有メモリ上のJPEG/統計スロットのサイズ上限（640x480 JPEGは通常100KB未満）
+MAX_JPEG_BYTES = 1 << 20
+MAX_STATS_BYTES = 4096
 
 
 # グローバル変数
-output = StreamingOutput()
+# 最新JPEG・統計JSONのスロット（__main__で生成し、HTTPサーバープロセスと共有）
+output = None
+stats_output = None
+last_stats = b''  # 最後に公開した統計JSON
+last_stats_ns = 0  # 最後に統計を公開した時刻（単調時計、ナノ秒）
 hand_detector = None
 finger_mapper = None
 serial_controller = None
 fps_counter = 0
-fps_start_time = time.time()
+fps_start_ns = time.monotonic_ns()  # FPS計測区間の開始（単調時計、ナノ秒）
 current_fps = 0
 total_detections = 0
 left_hand_detections = 0
 right_hand_detections = 0
 avg_detection_time = 0
+DETECTION_AVG_WINDOW = 30  # 検出時間の移動平均を取るフレーム数
+# 統計の公開間隔の下限（ナノ秒）。検出時間・検出回数はほぼ毎フレーム変わるため、
+# 変化時の公開でもSSEイベントは最大2回/秒（従来のポーリングと同じ頻度）に抑える
+STATS_PUBLISH_INTERVAL_NS = 500_000_000
+STREAM_SNDBUF = 1 << 20  # ストリーミングソケットの送信バッファ（バイト）
+CORE_TPU = 3  # TPU推論（手検出）スレッドを固定するCPUコア（RPi 4では割り込みの少ないコア）
+# /stats のJSONテンプレート（json.dumps を使わず数値だけを埋め込む）
+STATS_FMT = (b'{"fps":%.2f,"detection_time":%.2f,"total_detections":%d,'
+             b'"left_hand_detections":%d,"right_hand_detections":%d,"servo_states":{%s}}')
 current_servo_states = {}  # {channel: angle}
 servo_lock = Lock()
 
 
 # HTTPリクエストハンドラ
 class StreamingHandler(BaseHTTPRequestHandler):
+    def setup(self):
+        super().setup()
+        # Nagleアルゴリズムを無効化し（ACK待ちの遅延を防ぐ）、送信バッファを拡大
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, STREAM_SNDBUF)
+
     def do_GET(self):
         if self.path == '/':
             self.send_response(301)
             self.send_header('Location', '/index.html')
             self.end_headers()
         elif self.path == '/index.html':
-            content = PAGE.encode('utf-8')
             self.send_response(200)
             self.send_header('Content-Type', 'text/html')
-            self.send_header('Content-Length', len(content))
+            self.send_header('Content-Length', PAGE_LEN)
             self.end_headers()
-            self.wfile.write(content)
+            self.wfile.write(PAGE_BYTES)
         elif self.path == '/stream.mjpg':
             logger.info(f"📹 ストリーミングクライアント接続: {self.client_address}")
             self.send_response(200)
@@ -93,45 +103,51 @@ class StreamingHandler(BaseHTTPRequestHandler):
             self.send_header('Pragma', 'no-cache')
             self.send_header('Content-Type', 'multipart/x-mixed-replace; boundary=FRAME')
             self.end_headers()
+            output.add_client()
             try:
                 frame_sent = 0
+                last_sent = 0  # frame_count=0 はフレーム未出力
                 while True:
-                    with output.condition:
-                        if output.frame is None:
-                            logger.warning("⚠️  フレームが利用不可、待機中...")
-                        output.condition.wait(timeout=5.0)
-                        frame = output.frame
-
-                    if frame is None:
-                        logger.warning("⚠️  タイムアウト後もフレームがNone")
+                    # 最新フレームを取得（遅いクライアントは途中のフレームを読み飛ばす）
+                    seq, frame = output.wait_for_frame(last_sent, timeout=5.0)
+
+                    if frame is None or seq == last_sent:
+                        logger.warning("⚠️  タイムアウト: 新しいフレームなし")
                         continue
+                    last_sent = seq
 
-                    self.wfile.write(b'--FRAME\r\n')
-                    self.send_header('Content-Type', 'image/jpeg')
-                    self.send_header('Content-Length', len(frame))
-                    self.end_headers()
-                    self.wfile.write(frame)
-                    self.wfile.write(b'\r\n')
+                    # 境界・ヘッダー・本体を1回の書き込みで送る（パケット数を減らす）
+                    self.wfile.write(
+                        b'--FRAME\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n%s\r\n'
+                        % (len(frame), frame)
+                    )
 
                     frame_sent += 1
                     if frame_sent == 1:
                         logger.info(f"✅ 最初のフレームをクライアントに送信")
             except Exception as e:
                 logger.warning(f'Removed streaming client {self.client_address}: {str(e)}')
+            finally:
+                output.remove_client()
+        elif self.path == '/stats/stream':
+            # 統計情報が変化するたびにServer-Sent Eventsでプッシュ
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            try:
+                last_sent = 0
+                while True:
+                    seq, content = stats_output.wait_for_frame(last_sent, timeout=5.0)
+                    if content is None or seq == last_sent:
+                        continue
+                    last_sent = seq
+                    self.wfile.write(b'data: %s\n\n' % content)
+            except Exception as e:
+                logger.info(f'Removed stats client {self.client_address}: {str(e)}')
         elif self.path == '/stats':
-            # 統計情報をJSON形式で返す
-            with servo_lock:
-                servo_states_copy = current_servo_states.copy()
-
-            stats = {
-                'fps': current_fps,
-                'total_detections': total_detections,
-                'left_hand_detections': left_hand_detections,
-                'right_hand_detections': right_hand_detections,
-                'detection_time': avg_detection_time,
-                'servo_states': servo_states_copy
-            }
-            content = json.dumps(stats).encode('utf-8')
+            # 統計情報をJSON形式で返す（フレーム処理プロセスでエンコード済み）
+            content = stats_output.frame or b'{}'
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.send_header('Cache-Control', 'no-cache')
@@ -335,37 +351,40 @@ img {
 </div>
 
 <script>
-// 統計情報を定期的に更新
-setInterval(function() {
-    fetch('/stats')
-        .then(response => response.json())
-        .then(data => {
-            document.getElementById('fps').textContent = data.fps.toFixed(1);
-            document.getElementById('detection').textContent = data.detection_time.toFixed(1) + 'ms';
-            document.getElementById('total').textContent = data.total_detections;
-            document.getElementById('left').textContent = data.left_hand_detections;
-            document.getElementById('right').textContent = data.right_hand_detections;
-
-            // サーボ状態を更新
-            const servos = data.servo_states;
-            document.getElementById('left_thumb').textContent = servos[0] !== undefined ? servos[0] + '°' : '--°';
-            document.getElementById('left_index').textContent = servos[2] !== undefined ? servos[2] + '°' : '--°';
-            document.getElementById('left_middle').textContent = servos[4] !== undefined ? servos[4] + '°' : '--°';
-            document.getElementById('left_ring').textContent = servos[6] !== undefined ? servos[6] + '°' : '--°';
-            document.getElementById('right_thumb').textContent = servos[1] !== undefined ? servos[1] + '°' : '--°';
-            document.getElementById('right_index').textContent = servos[3] !== undefined ? servos[3] + '°' : '--°';
-            document.getElementById('right_middle').textContent = servos[5] !== undefined ? servos[5] + '°' : '--°';
-            document.getElementById('right_ring').textContent = servos[7] !== undefined ? servos[7] + '°' : '--°';
-        })
-        .catch(err => console.error('Stats update failed:', err));
-}, 500);  // 0.5秒ごとに更新
+// 統計情報はサーバーから変化時にプッシュされる（Server-Sent Events）
+const statsSource = new EventSource('/stats/stream');
+statsSource.onmessage = function(event) {
+    const data = JSON.parse(event.data);
+    document.getElementById('fps').textContent = data.fps.toFixed(1);
+    document.getElementById('detection').textContent = data.detection_time.toFixed(1) + 'ms';
+    document.getElementById('total').textContent = data.total_detections;
+    document.getElementById('left').textContent = data.left_hand_detections;
+    document.getElementById('right').textContent = data.right_hand_detections;
+
+    // サーボ状態を更新
+    const servos = data.servo_states;
+    document.getElementById('left_thumb').textContent = servos[0] !== undefined ? servos[0] + '°' : '--°';
+    document.getElementById('left_index').textContent = servos[2] !== undefined ? servos[2] + '°' : '--°';
+    document.getElementById('left_middle').textContent = servos[4] !== undefined ? servos[4] + '°' : '--°';
+    document.getElementById('left_ring').textContent = servos[6] !== undefined ? servos[6] + '°' : '--°';
+    document.getElementById('right_thumb').textContent = servos[1] !== undefined ? servos[1] + '°' : '--°';
+    document.getElementById('right_index').textContent = servos[3] !== undefined ? servos[3] + '°' : '--°';
+    document.getElementById('right_middle').textContent = servos[5] !== undefined ? servos[5] + '°' : '--°';
+    document.getElementById('right_ring').textContent = servos[7] !== undefined ? servos[7] + '°' : '--°';
+};
+statsSource.onerror = err => console.error('Stats stream error:', err);  // 切断時は自動再接続
 </script>
 </body>
 </html>
 """
 
+# 静的ページなので起動時に1回だけエンコード
+PAGE_BYTES = PAGE.encode('utf-8')
+PAGE_LEN = str(len(PAGE_BYTES))
+
 
-class StreamingServer(HTTPServer):
+# ストリーム・SSEの接続は開いたままになるため、クライアントごとにスレッドで処理
+class StreamingServer(ThreadingHTTPServer):
     allow_reuse_address = True
     daemon_threads = True
 
@@ -378,21 +397,100 @@ def update_servo_states(servo_commands: dict):
             current_servo_states[channel] = angle
 
 
+def stats_json():
+    """統計情報をJSONバイト列で返す"""
+    # ロック中はタプルへのスナップショットのみ
+    with servo_lock:
+        servo_items = tuple(current_servo_states.items())
+
+    servo_states = b','.join(b'"%d":%d' % item for item in sorted(servo_items))
+    return STATS_FMT % (current_fps, avg_detection_time, total_detections,
+                        left_hand_detections, right_hand_detections, servo_states)
+
+
+def publish_stats():
+    """
+    統計情報が前回から変化していれば共有スロットに書き込む（SSEクライアントへ通知）
+
+    毎フレーム呼ばれるが、前回の公開から STATS_PUBLISH_INTERVAL_NS 経つまでは何もしない
+    """
+    global last_stats, last_stats_ns
+    now_ns = time.monotonic_ns()
+    if now_ns - last_stats_ns < STATS_PUBLISH_INTERVAL_NS:
+        return
+    content = stats_json()
+    if content != last_stats:
+        stats_output.write(content)
+        last_stats = content
+        last_stats_ns = now_ns
+
+
+def run_http_server(frame_slot, stats_slot, port=8000):
+    """
+    MJPEGストリーミングサーバー（別プロセスで実行。HTTP処理が検出ループのGILを奪わない）
+
+    Args:
+        frame_slot: 最新JPEGの SharedFrameSlot
+        stats_slot: 統計JSONの SharedFrameSlot
+        port: 待ち受けポート
+    """
+    global output, stats_output
+    output = frame_slot
+    stats_output = stats_slot
+
+    server = StreamingServer(('', port), StreamingHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        frame_slot.close()
+        stats_slot.close()
+
+
 def process_frames(camera, detector, mapper, serial):
     """
     フレームを処理し、手を検出してサーボ制御
     """
-    global fps_counter, fps_start_time, current_fps, avg_detection_time
+    global fps_counter, fps_start_ns, current_fps, avg_detection_time
     global total_detections, left_hand_detections, right_hand_detections
 
     logger.info("フレーム処理ループ開始")
 
+    # OpenCVの内部並列化を無効化（resize・putText・imencodeが全コアにスレッドを広げ、
+    # 検出・取得・エンコード・HTTPの各スレッドとコアを奪い合うのを防ぐ）
+    cv2.setNumThreads(1)
+    cv2.ocl.setUseOpenCL(False)
+
     frame_count = 0
-    detection_times = []
+    last_servo_commands = None  # 最後に送信したサーボコマンド
+
+    # 検出時間の移動平均用リングバッファ（合計を差分更新し、毎フレームの
+    # list.pop(0)・np.mean を避ける）
+    detection_times = np.zeros(DETECTION_AVG_WINDOW, dtype=np.float64)
+    detection_idx = 0
+    detection_sum = 0.0
+    detection_n = 0
+
+    # TPUを呼び出すこのスレッドを1コアに固定（USB転送ごとのコア間移動を避ける）
+    # インタープリタは HandDetectorTPU 初期化時の1つを使い回す
+    all_cores = pin_current_thread(CORE_TPU)
+    if all_cores is not None:
+        logger.info(f"📌 TPU推論スレッドをCPU {CORE_TPU % (os.cpu_count() or 1)} に固定")
+
+    # フレーム取得（次フレーム）とJPEGエンコード（前フレーム）をスレッドプールで
+    # 手検出（このスレッド）と並行実行する。いずれもGILを解放するネイティブ処理が主体
+    # （ワーカーは固定を継承するので、固定前のCPU集合に戻す）
+    executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='hand-io',
+                                  initializer=restore_affinity, initargs=(all_cores,))
+    capture_future = executor.submit(camera.capture_frame)
+    encode_future = None
 
     while True:
-        # フレーム取得
-        frame = camera.capture_frame()
+        # フレーム取得（取得済みのものを受け取り、すぐ次の取得を投入）
+        frame = capture_future.result()
+        capture_future = executor.submit(camera.capture_frame)
         if frame is None:
             if frame_count % 30 == 0:
                 logger.warning("⚠️  フレーム取得失敗（None）")
@@ -404,16 +502,17 @@ def process_frames(camera, detector, mapper, serial):
 
         frame_count += 1
 
-        # 手検出実行
-        detection_start = time.time()
+        # 手検出実行（フレームはBGRのまま渡し、検出器側でモデル入力サイズに縮小後RGB化）
+        detection_start_ns = time.monotonic_ns()
         hand_data = detector.detect(frame)
-        detection_time = (time.time() - detection_start) * 1000
-        detection_times.append(detection_time)
+        detection_time = (time.monotonic_ns() - detection_start_ns) / 1e6  # ms
 
-        # 検出時間の移動平均（最新30フレーム）
-        if len(detection_times) > 30:
-            detection_times.pop(0)
-        avg_detection_time = np.mean(detection_times)
+        # 検出時間の移動平均（最新 DETECTION_AVG_WINDOW フレーム）
+        detection_sum += detection_time - detection_times[detection_idx]
+        detection_times[detection_idx] = detection_time
+        detection_idx = (detection_idx + 1) % DETECTION_AVG_WINDOW
+        detection_n = min(detection_n + 1, DETECTION_AVG_WINDOW)
+        avg_detection_time = detection_sum / detection_n
 
         # 検出統計を更新
         hands_detected = 0
@@ -430,13 +529,16 @@ def process_frames(camera, detector, mapper, serial):
             # 指の角度をサーボ角度にマッピング
             servo_commands = mapper.map_hand_to_servos(hand_data)
 
-            # サーボ状態を更新（表示用）
-            update_servo_states(servo_commands)
+            # 前回送信時から角度が変わっていなければ更新・送信を省略
+            # （手が静止している間は servo_lock もシリアル往復も発生しない）
+            if servo_commands != last_servo_commands:
+                # サーボ状態を更新（表示用）
+                update_servo_states(servo_commands)
 
-            # Arduinoにサーボコマンドを送信
-            if serial:
-                for channel, angle in servo_commands.items():
-                    serial.send_servo_command(channel, angle)
+                # Arduinoにサーボコマンドを一括送信（1パケット・1往復）
+                # 送信に失敗したら記録せず、次フレームで同じ角度でも再送する
+                if serial is None or serial.send_servo_batch(servo_commands):
+                    last_servo_commands = servo_commands
 
             # ログ出力（デバッグ用、30フレームに1回）
             if frame_count % 30 == 0:
@@ -444,47 +546,56 @@ def process_frames(camera, detector, mapper, serial):
                            f"R={hand_data['right_hand'] is not None}, "
                            f"サーボ更新: {len(servo_commands)}ch")
 
-        # ランドマークを描画
-        frame = detector.draw_landmarks(frame)
-
         # FPS計算
         fps_counter += 1
         if fps_counter >= 30:
-            current_fps = fps_counter / (time.time() - fps_start_time)
+            now_ns = time.monotonic_ns()
+            current_fps = fps_counter * 1e9 / (now_ns - fps_start_ns)
             fps_counter = 0
-            fps_start_time = time.time()
+            fps_start_ns = now_ns
 
-        # 情報を画面に表示
-        cv2.putText(frame, f"FPS: {current_fps:.1f}", (10, 30),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        cv2.putText(frame, f"Detection: {avg_detection_time:.1f}ms (TPU)", (10, 65),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        # 配信先のクライアントがいない間は描画・JPEGエンコードを省略
+        # （手検出・サーボ制御はヘッドレスでも継続）
+        streaming = output.clients > 0
 
-        # 手検出状態を表示
-        status_text = "Hands: "
-        if hand_data['left_hand']:
-            status_text += "LEFT "
-        if hand_data['right_hand']:
-            status_text += "RIGHT"
-        if not hand_data['left_hand'] and not hand_data['right_hand']:
-            status_text += "NONE"
+        if streaming:
+            # ランドマークを描画（このフレームは以降JPEG化するだけなので直接描画）
+            frame = detector.draw_landmarks(frame, inplace=True)
 
-        cv2.putText(frame, status_text, (10, 100),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+            # 情報を画面に表示
+            cv2.putText(frame, f"FPS: {current_fps:.1f}", (10, 30),
+                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            cv2.putText(frame, f"Detection: {avg_detection_time:.1f}ms (TPU)", (10, 65),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
 
-        # BGRに変換してJPEGエンコード
-        frame_bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-        _, jpeg = cv2.imencode('.jpg', frame_bgr, [cv2.IMWRITE_JPEG_QUALITY, 80])
+            # 手検出状態を表示
+            status_text = "Hands: "
+            if hand_data['left_hand']:
+                status_text += "LEFT "
+            if hand_data['right_hand']:
+                status_text += "RIGHT"
+            if not hand_data['left_hand'] and not hand_data['right_hand']:
+                status_text += "NONE"
 
-        # ストリーミング出力に書き込み
-        jpeg_bytes = jpeg.tobytes()
-        with output.condition:
-            output.frame = jpeg_bytes
-            output.condition.notify_all()
+            cv2.putText(frame, status_text, (10, 100),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
 
-        # 最初のフレーム出力成功をログ
-        if frame_count == 1:
-            logger.info(f"✅ 最初のJPEGフレーム出力成功: {len(jpeg_bytes)} bytes")
+        # 前フレームのエンコード結果をストリーミング出力に書き込み
+        # （最新フレームを差し替えるだけで待たない）
+        if encode_future is not None:
+            jpeg_bytes = encode_future.result()
+            encode_future = None
+            output.write(jpeg_bytes)
+
+            # 最初のフレーム出力成功をログ
+            if output.frame_count == 1:
+                logger.info(f"✅ 最初のJPEGフレーム出力成功: {len(jpeg_bytes)} bytes")
+
+        publish_stats()
+
+        # JPEGエンコードを投入（BGRのまま色変換なし。次フレームの検出中にバックグラウンドで実行）
+        if streaming:
+            encode_future = executor.submit(encode_jpeg, frame, 80)
 
 
 if __name__ == '__main__':
@@ -500,7 +611,8 @@ if __name__ == '__main__':
             palm_model_path='models/palm_detection_builtin_256_integer_quant.tflite',
             max_num_hands=2,  # 両手検出
             min_detection_confidence=0.01,  # 閾値を大幅に下げて検出テスト
-            min_palm_confidence=0.5
+            min_palm_confidence=0.5,
+            bgr_input=True  # カメラのBGRフレームをそのまま渡す
         )
         logger.info("✅ TPU初期化完了")
     except Exception as e:
@@ -522,7 +634,9 @@ if __name__ == '__main__':
 
     # カメラ初期化
     logger.info("📷 カメラを初期化中...")
-    camera = CameraController(resolution=(640, 480), framerate=30, debug=False)
+    # OpenCV描画・JPEGエンコードに合わせてBGRで出力（フレーム毎のcvtColorが不要）
+    camera = CameraController(resolution=(640, 480), framerate=30, debug=False,
+                              pixel_format="BGR888")
 
     if not camera.initialize():
         logger.error("❌ カメラの初期化に失敗しました")
@@ -538,7 +652,7 @@ if __name__ == '__main__':
 
     # Arduinoシリアル通信初期化（オプション）
     logger.info("📡 Arduinoに接続中...")
-    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=9600)
+    serial_controller = SerialController(port="/dev/ttyACM0", baudrate=115200)
 
     if not serial_controller.connect():
         logger.warning("⚠️  Arduinoへの接続に失敗しました。サーボ制御なしで続行します。")
@@ -546,18 +660,17 @@ if __name__ == '__main__':
     else:
         logger.info("✅ Arduino接続完了")
 
-    # バックグラウンドでフレーム処理開始
-    processing_thread = Thread(
-        target=process_frames,
-        args=(camera, hand_detector, finger_mapper, serial_controller),
+    # HTTPサーバーを別プロセスで起動（JPEG・統計は共有メモリ経由で受け渡し）
+    output = SharedFrameSlot(MAX_JPEG_BYTES)
+    stats_output = SharedFrameSlot(MAX_STATS_BYTES)
+    server_process = multiprocessing.get_context('spawn').Process(
+        target=run_http_server,
+        args=(output, stats_output, 8000),
         daemon=True
     )
-    processing_thread.start()
+    server_process.start()
 
     try:
-        # サーバー起動
-        address = ('', 8000)
-        server = StreamingServer(address, StreamingHandler)
         logger.info("=" * 70)
         logger.info("🌐 手指検出ストリーミングサーバー起動！(TPU版)")
         logger.info("=" * 70)
@@ -571,7 +684,9 @@ if __name__ == '__main__':
         logger.info("=" * 70)
         logger.info("終了するには Ctrl+C を押してください")
         logger.info("=" * 70)
-        server.serve_forever()
+
+        # フレーム処理はメインプロセスのメインスレッドで実行
+        process_frames(camera, hand_detector, finger_mapper, serial_controller)
     except KeyboardInterrupt:
         logger.info("\n🛑 停止中...")
     finally:
@@ -580,4 +695,9 @@ if __name__ == '__main__':
         if serial_controller:
             serial_controller.disconnect()
         hand_detector.cleanup()
+        server_process.terminate()
+        server_process.join(timeout=2.0)
+        for slot in (output, stats_output):
+            slot.close()
+            slot.unlink()
         logger.info("✅ システムを終了しました")
@@ -116,11 +116,10 @@ def test_tpu_inference_speed():
         # 実測定
         times = []
         for i in range(10):
-            start = time.time()
+            start_ns = time.perf_counter_ns()
             interpreter.set_tensor(input_details[0]['index'], dummy_input)
             interpreter.invoke()
-            elapsed = time.time() - start
-            times.append(elapsed * 1000)  # ms
+            times.append((time.perf_counter_ns() - start_ns) / 1e6)  # ms
 
         avg_time = np.mean(times)
         min_time = np.min(times)
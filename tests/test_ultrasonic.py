@@ -10,78 +10,122 @@ RaspberryPiからArduino経由で超音波センサの値を高速取得
 - CSVファイル保存オプション
 """
 
+import math
+import os
+import queue
+import re
+import selectors
 import sys
+import threading
 import time
 import serial
-import serial.tools.list_ports
-from collections import deque
 from datetime import datetime
 
 def find_arduino_port():
     """Arduinoのシリアルポートを自動検出"""
-    ports = serial.tools.list_ports.comports()
+    # ポート列挙は起動時に毎回は不要なので、使うときだけimportする
+    from serial.tools import list_ports
+
+    ports = list_ports.comports()
     for port in ports:
         # Arduino Uno は通常 ACM0 として認識される
         if 'ACM' in port.device or 'USB' in port.device:
             return port.device
     return None
 
+# Arduino（ultrasonic_test.ino）がsetup()完了時に出力する行と、その待ち時間の上限（秒）
+READY_LINE = b'Ready\r\n'
+INIT_TIMEOUT = 3.0
+
+# 受信スレッドが1回のos.readで読む最大バイト数
+READ_CHUNK = 4096
+
+# CSVに書き出す前にまとめる行数（1行ごとのwriteを避ける）
+CSV_BATCH_ROWS = 256
+
+
 class UltrasonicDataLogger:
     """超音波センサデータの高速ロギングクラス"""
 
+    # データ行フォーマット（固定）: D:<distance>,T:<time>,N:<seq>
+    _PATTERN = re.compile(rb'D:(-?[\d.]+),T:(\d+),N:(\d+)')
+
     def __init__(self, save_to_file=False):
         self.save_to_file = save_to_file
         self.file_handle = None
-        self.distances = []
-        self.timestamps = []
+        self._rows = []  # ファイル未書き込みのCSV行
+        # 距離の統計はWelford法で逐次更新（全サンプルをリストに保持しない）
+        self._n = 0
+        self._mean = 0.0
+        self._M2 = 0.0  # 平均からの偏差の二乗和
+        self._min = math.inf
+        self._max = -math.inf
         self.valid_count = 0
         self.error_count = 0
         self.last_sequence = None
         self.lost_packets = 0
-        self.measurement_times = deque(maxlen=10)  # 最新10測定のタイムスタンプ
+        # 測定頻度: 受信間隔の指数移動平均（EWMA）
+        self._last_t = 0.0
+        self._ewma_dt = 0.0
+        self._alpha = 0.05  # EWMAの平滑化係数
+        # monotonic時刻 → UNIX時刻の差（CSVのtimestamp列用、start_loggingで設定）
+        self._wall_offset = 0.0
 
     def start_logging(self):
         """ログファイルを開始"""
         if self.save_to_file:
             filename = f"ultrasonic_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            self.file_handle = open(filename, 'w')
+            self.file_handle = open(filename, 'w', buffering=1 << 16)
+            self._rows = []
+            self._wall_offset = time.time() - time.monotonic()
             self.file_handle.write("timestamp,distance_cm,arduino_time_ms,sequence\n")
             print(f"Logging to file: {filename}")
 
     def stop_logging(self):
         """ログファイルを閉じる"""
         if self.file_handle:
+            # 残りの行を書き出してから閉じる
+            self.file_handle.writelines(self._rows)
+            self._rows.clear()
             self.file_handle.close()
+            self.file_handle = None
             print(f"Log file saved")
 
     def parse_data(self, line):
         """
-        データをパース（新フォーマット対応）
+        データをパース（デコードせずバイト列のまま正規表現1回で取り出す）
         Format: D:<distance>,T:<time>,N:<seq>
+
+        Args:
+            line: 受信した1行（bytes / bytearray）
+
+        Returns:
+            (distance, arduino_time, sequence)。データ行でなければ (None, None, None)
         """
-        try:
-            parts = line.split(',')
-            data = {}
-            for part in parts:
-                if ':' in part:
-                    key, value = part.split(':', 1)
-                    data[key] = value
-
-            if 'D' in data:
-                distance = float(data['D'])
-                arduino_time = int(data.get('T', 0))
-                sequence = int(data.get('N', 0))
-
-                return distance, arduino_time, sequence
-        except (ValueError, IndexError):
-            pass
+        m = self._PATTERN.match(line)
+        if m:
+            try:
+                return float(m.group(1)), int(m.group(2)), int(m.group(3))
+            except ValueError:
+                pass
 
         return None, None, None
 
-    def log_measurement(self, distance, arduino_time, sequence):
-        """測定データを記録"""
-        current_time = time.time()
-        self.measurement_times.append(current_time)
+    def log_measurement(self, distance, arduino_time, sequence, current_time):
+        """
+        測定データを記録
+
+        Args:
+            current_time: 受信時刻（time.monotonic()）。NTPによる時刻補正の影響を受けない
+        """
+        # 受信間隔の指数移動平均を更新（1サンプル目の間隔で初期化）
+        if self._last_t:
+            dt = current_time - self._last_t
+            if self._ewma_dt == 0.0:
+                self._ewma_dt = dt
+            else:
+                self._ewma_dt += self._alpha * (dt - self._ewma_dt)
+        self._last_t = current_time
 
         # シーケンス番号チェック（データロス検出）
         if self.last_sequence is not None and sequence != self.last_sequence + 1:
@@ -94,25 +138,32 @@ class UltrasonicDataLogger:
         # 有効データチェック
         if distance > 0 and 2.0 <= distance <= 400.0:
             self.valid_count += 1
-            self.distances.append(distance)
-            self.timestamps.append(current_time)
 
-            # ファイルに保存
+            # 統計を逐次更新（Welford法）
+            self._n += 1
+            delta = distance - self._mean
+            self._mean += delta / self._n
+            self._M2 += delta * (distance - self._mean)
+            if distance < self._min:
+                self._min = distance
+            if distance > self._max:
+                self._max = distance
+
+            # ファイルに保存（CSV_BATCH_ROWS行ごとにまとめて書き出す）
             if self.file_handle:
-                self.file_handle.write(f"{current_time:.3f},{distance:.2f},{arduino_time},{sequence}\n")
+                self._rows.append(f"{current_time + self._wall_offset:.3f},{distance:.2f},{arduino_time},{sequence}\n")
+                if len(self._rows) >= CSV_BATCH_ROWS:
+                    self.file_handle.writelines(self._rows)
+                    self._rows.clear()
         else:
             self.error_count += 1
 
     def get_measurement_rate(self):
         """実測の測定頻度を計算（Hz）"""
-        if len(self.measurement_times) < 2:
+        if self._ewma_dt <= 0.0:
             return 0.0
 
-        time_diff = self.measurement_times[-1] - self.measurement_times[0]
-        if time_diff == 0:
-            return 0.0
-
-        return (len(self.measurement_times) - 1) / time_diff
+        return 1.0 / self._ewma_dt
 
     def print_statistics(self):
         """統計情報を表示"""
@@ -123,11 +174,11 @@ class UltrasonicDataLogger:
         print(f"Lost packets:      {self.lost_packets}")
         print(f"Success rate:      {self.valid_count/(self.valid_count+self.error_count)*100:.1f}%")
 
-        if self.distances:
+        if self._n:
             print(f"\nDistance Statistics:")
-            print(f"  Min:  {min(self.distances):.2f} cm")
-            print(f"  Max:  {max(self.distances):.2f} cm")
-            print(f"  Avg:  {sum(self.distances)/len(self.distances):.2f} cm")
+            print(f"  Min:  {self._min:.2f} cm")
+            print(f"  Max:  {self._max:.2f} cm")
+            print(f"  Avg:  {self._mean:.2f} cm")
             print(f"  StdDev: {self._calc_stddev():.2f} cm")
 
         rate = self.get_measurement_rate()
@@ -135,12 +186,71 @@ class UltrasonicDataLogger:
             print(f"\nMeasurement Rate:  {rate:.2f} Hz")
 
     def _calc_stddev(self):
-        """標準偏差を計算"""
-        if len(self.distances) < 2:
+        """標準偏差を計算（逐次更新済みの二乗和から）"""
+        if self._n < 2:
             return 0.0
-        mean = sum(self.distances) / len(self.distances)
-        variance = sum((x - mean) ** 2 for x in self.distances) / len(self.distances)
-        return variance ** 0.5
+        return (self._M2 / self._n) ** 0.5
+
+
+def serial_reader(ser, parse_data, measurements, stop_event):
+    """
+    シリアル受信スレッド（受信とパースのみ行い、表示・記録はメインスレッドに任せる）
+
+    printやファイル書き込みで受信が止まらないので、pyserialの受信バッファが溢れない。
+
+    Args:
+        ser: serial.Serial（timeout付き）
+        parse_data: 1行（bytes）を (distance, arduino_time, sequence) に変換する関数
+        measurements: (distance, arduino_time, sequence, 受信時刻) を入れるQueue
+        stop_event: セットされたら終了
+    """
+    buf = bytearray()  # 受信バッファ（行の途中までのデータは次回に持ち越す）
+    # ループ内で使うメソッドはローカルに束縛（毎回の属性探索を避ける）
+    find = buf.find
+    startswith = buf.startswith
+    put = measurements.put_nowait
+
+    # POSIXではポート設定（ボーレート等）だけpyserialに任せ、受信はfdから直接読む
+    # （Serial.read()のPython側のループとバッファコピーを通さない）
+    try:
+        fd = ser.fileno()
+    except AttributeError:
+        fd = None  # fileno()のない環境（Windows等）はSerial.read()を使う
+    if fd is not None:
+        sel = selectors.DefaultSelector()
+        sel.register(fd, selectors.EVENT_READ)
+
+    while not stop_event.is_set():
+        if fd is not None:
+            # 受信があるまでカーネル内で待つ（stop_event確認のため0.1秒で戻る）
+            if not sel.select(timeout=0.1):
+                continue
+            chunk = os.read(fd, READ_CHUNK)
+            if not chunk:
+                break  # 読み取り可能なのに0バイト = デバイス切断
+            buf += chunk
+        else:
+            # 受信済みのデータをまとめて1回で読み出す（readlineの細かい読み出しを避ける）
+            # 何も届いていなければ最初の1バイトをtimeoutまで待つ（ビジーループにしない）
+            buf += ser.read(max(1, ser.in_waiting))
+        received_time = time.monotonic()
+
+        # 完結した行だけを切り出して処理
+        while True:
+            nl = find(b'\n')
+            if nl < 0:
+                break
+
+            # データ行のみ処理。起動メッセージ等は先頭2バイトで判定して
+            # 切り出し（コピー）もパースもせずに捨てる
+            if startswith(b'D:'):
+                distance, arduino_time, sequence = parse_data(buf[:nl])
+                if distance is not None:
+                    put((distance, arduino_time, sequence, received_time))
+            del buf[:nl + 1]
+
+    if fd is not None:
+        sel.close()
 
 
 def test_ultrasonic_sensor(port='/dev/ttyACM0', baudrate=115200, duration=30, save_to_file=False):
@@ -165,47 +275,64 @@ def test_ultrasonic_sensor(port='/dev/ttyACM0', baudrate=115200, duration=30, sa
     try:
         # シリアルポート接続
         ser = serial.Serial(port, baudrate, timeout=0.1)
-        time.sleep(2)  # Arduino起動待ち
+        ser.reset_input_buffer()
 
         # 初期メッセージをスキップ
+        # ポートを開くとArduinoがリセットされる。setup()の最後に出力される
+        # "Ready"行まで1回のread_untilで待つ（固定のsleepやin_waitingのポーリングをしない）。
+        # "Ready"を出さない古いスケッチではINIT_TIMEOUT秒で打ち切って続行する
         print("Waiting for Arduino initialization...")
-        for _ in range(10):
-            if ser.in_waiting > 0:
-                line = ser.readline().decode('utf-8', errors='ignore').strip()
-                print(f"  {line}")
+        ser.timeout = INIT_TIMEOUT
+        banner = ser.read_until(READY_LINE, size=2048)
+        ser.timeout = 0.1
+        for line in banner.decode('utf-8', errors='ignore').splitlines():
+            if line.strip():
+                print(f"  {line.strip()}")
+        if not banner.endswith(READY_LINE):
+            print("  WARNING: Ready line not received, continuing anyway")
 
         print("\nReading sensor data...")
         print("(Press Ctrl+C to stop)")
         print()
 
         logger.start_logging()
-        start_time = time.time()
+        # 経過時間はmonotonic時計で計る（システム時刻の変更に影響されない）
+        start_time = time.monotonic()
         last_display_time = start_time
+        now = start_time
+
+        # 受信は別スレッドで行い、このスレッドは記録と表示のみ
+        measurements = queue.Queue()
+        stop_event = threading.Event()
+        reader = threading.Thread(
+            target=serial_reader,
+            args=(ser, logger.parse_data, measurements, stop_event),
+            daemon=True
+        )
+        reader.start()
 
-        while (time.time() - start_time) < duration:
-            if ser.in_waiting > 0:
+        try:
+            while (now - start_time) < duration:
                 try:
-                    line = ser.readline().decode('utf-8', errors='ignore').strip()
-
-                    # データ行のみ処理
-                    if line.startswith("D:"):
-                        distance, arduino_time, sequence = logger.parse_data(line)
-
-                        if distance is not None:
-                            logger.log_measurement(distance, arduino_time, sequence)
-
-                            # リアルタイム表示（1秒ごと）
-                            current_time = time.time()
-                            if current_time - last_display_time >= 1.0:
-                                rate = logger.get_measurement_rate()
-                                print(f"[{logger.valid_count:4d}] Distance: {distance:6.2f} cm | "
-                                      f"Rate: {rate:5.2f} Hz | "
-                                      f"Errors: {logger.error_count} | "
-                                      f"Lost: {logger.lost_packets}")
-                                last_display_time = current_time
-
-                except UnicodeDecodeError:
-                    pass
+                    distance, arduino_time, sequence, now = measurements.get(timeout=0.1)
+                except queue.Empty:
+                    now = time.monotonic()
+                    continue
+
+                # 時刻は受信スレッドが付けた受信時刻を使い回す（1反復1回も時計を読まない）
+                logger.log_measurement(distance, arduino_time, sequence, now)
+
+                # リアルタイム表示（1秒ごと）
+                if now - last_display_time >= 1.0:
+                    rate = logger.get_measurement_rate()
+                    print(f"[{logger.valid_count:4d}] Distance: {distance:6.2f} cm | "
+                          f"Rate: {rate:5.2f} Hz | "
+                          f"Errors: {logger.error_count} | "
+                          f"Lost: {logger.lost_packets}")
+                    last_display_time = now
+        finally:
+            stop_event.set()
+            reader.join()
 
         logger.stop_logging()
         logger.print_statistics()
@@ -215,7 +342,8 @@ def test_ultrasonic_sensor(port='/dev/ttyACM0', baudrate=115200, duration=30, sa
         print(f"Error: Could not open serial port {port}")
         print(f"Details: {e}")
         print("\nAvailable ports:")
-        for port in serial.tools.list_ports.comports():
+        from serial.tools import list_ports
+        for port in list_ports.comports():
             print(f"  - {port.device}: {port.description}")
         sys.exit(1)
 
@@ -245,7 +373,8 @@ def main():
     if port is None:
         print("Error: Arduino not found")
         print("\nAvailable ports:")
-        for p in serial.tools.list_ports.comports():
+        from serial.tools import list_ports
+        for p in list_ports.comports():
             print(f"  - {p.device}: {p.description}")
         sys.exit(1)
 
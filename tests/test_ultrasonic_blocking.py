@@ -18,7 +18,9 @@ import sys
 import os
 import time
 import logging
-from threading import Thread, Lock
+import math
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
@@ -32,10 +34,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 監視周期（秒）: 左右1回ずつ読み取る1サイクルの長さ（約3Hz）
+SAMPLE_PERIOD = 0.3
+# 左右センサーの読み取り開始間隔（秒）: 片側のエコーが消えてから反対側を測る
+SENSOR_GAP = 0.1
+
 # グローバル変数
 blocking_state = "idle"  # idle, blocking_left, blocking_right
 total_blocks = 0
 block_lock = Lock()  # ブロック動作の排他制御
+# ブロック動作用の常駐ワーカー（検出のたびにスレッドを生成しない）
+# block_lockで直列化されるため1スレッドで十分
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='blocker')
 
 
 def block_ball_worker(serial_controller, side):
@@ -62,6 +72,18 @@ def block_ball_worker(serial_controller, side):
         logger.info(f"✅ ブロック完了 (累計: {total_blocks}回)")
 
 
+def wait_until(deadline):
+    """
+    monotonic時刻deadlineまで待機（既に過ぎていれば即座に戻る）
+
+    Args:
+        deadline: time.monotonic()基準の時刻
+    """
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
 def monitor_ultrasonic_sensors(serial_controller):
     """
     超音波センサーを監視してボールブロック
@@ -74,7 +96,7 @@ def monitor_ultrasonic_sensors(serial_controller):
     logger.info("超音波センサー監視開始")
 
     # ブロッククールダウン（連続ブロックを防ぐ）
-    last_block_time = 0
+    last_block_time = -math.inf
     block_cooldown = 6.0  # 6秒間は再度ブロックしない
 
     # 検出閾値（cm）
@@ -82,12 +104,18 @@ def monitor_ultrasonic_sensors(serial_controller):
 
     sample_count = 0
 
+    # 固定sleepではなく次の読み取り時刻（デッドライン）まで待つ。
+    # read_distance()の応答待ち（readline）は受信までカーネル内で待機するので、
+    # その時間を周期から差し引き、サイクルが応答時間分だけ延びないようにする
+    next_sample = time.monotonic()
+
     while True:
-        current_time = time.time()
+        # クールダウン判定もmonotonic時計で行う（システム時刻の変更に影響されない）
+        current_time = time.monotonic()
 
         # 左右のセンサーを交互に読み取り
         distance_left = serial_controller.read_distance('L')
-        time.sleep(0.1)  # センサー間隔を開ける
+        wait_until(next_sample + SENSOR_GAP)  # センサー間隔を開ける
         distance_right = serial_controller.read_distance('R')
 
         sample_count += 1
@@ -102,21 +130,21 @@ def monitor_ultrasonic_sensors(serial_controller):
             if distance_left is not None and 0 < distance_left < DETECTION_THRESHOLD:
                 logger.info(f"⚽ 物体検出: 左側 (距離={distance_left:.1f}cm)")
                 last_block_time = current_time
-                # 別スレッドでブロック実行（メインループをブロックしない）
-                block_thread = Thread(target=block_ball_worker, args=(serial_controller, 'left'))
-                block_thread.daemon = True
-                block_thread.start()
+                # ワーカースレッドでブロック実行（メインループをブロックしない）
+                executor.submit(block_ball_worker, serial_controller, 'left')
 
             # 右側センサーが物体検知
             elif distance_right is not None and 0 < distance_right < DETECTION_THRESHOLD:
                 logger.info(f"⚽ 物体検出: 右側 (距離={distance_right:.1f}cm)")
                 last_block_time = current_time
-                # 別スレッドでブロック実行（メインループをブロックしない）
-                block_thread = Thread(target=block_ball_worker, args=(serial_controller, 'right'))
-                block_thread.daemon = True
-                block_thread.start()
+                # ワーカースレッドでブロック実行（メインループをブロックしない）
+                executor.submit(block_ball_worker, serial_controller, 'right')
 
-        time.sleep(0.2)  # 200msごとにチェック（約5Hz）
+        next_sample += SAMPLE_PERIOD
+        now = time.monotonic()
+        if next_sample < now:
+            next_sample = now  # ブロック動作等で遅れた分は取り戻さない
+        wait_until(next_sample)
 
 
 if __name__ == '__main__':
@@ -153,5 +181,7 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         logger.info("\n🛑 停止中...")
     finally:
+        # 実行中のブロック動作の完了を待ってから切断
+        executor.shutdown(wait=True)
         serial_controller.disconnect()
         logger.info("✅ システムを終了しました")
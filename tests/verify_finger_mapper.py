@@ -21,6 +21,12 @@ finger_mapper_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(finger_mapper_module)
 FingerMapper = finger_mapper_module.FingerMapper
 
+# (チャンネル, open角度, close角度) をチャンネル順に並べた表（モジュール読み込み時に一度だけ作る）
+_SORTED_CONFIG = sorted(
+    (channel, config['open'], config['close'])
+    for channel, config in FingerMapper.SERVO_CONFIG.items()
+)
+
 
 def pwm_to_angle(pwm):
     """PWM値を角度に変換（walk_program.inoの変換式）"""
@@ -86,22 +92,25 @@ def verify_servo_config():
         7: {"open": 80, "close": 0, "name": "BR knee (右膝)"},
     }
 
+    servo_config = mapper.SERVO_CONFIG  # ループ外で一度だけ属性を引く
+
     all_match = True
     for channel, exp in expected.items():
-        actual = mapper.SERVO_CONFIG.get(channel)
+        actual = servo_config.get(channel)
 
         if actual is None:
             print(f"\n✗ ch {channel} ({exp['name']}): 設定なし")
             all_match = False
             continue
 
-        match = (actual['open'] == exp['open'] and
-                 actual['close'] == exp['close'])
+        exp_open, exp_close = exp['open'], exp['close']
+        act_open, act_close = actual['open'], actual['close']
+        match = (act_open == exp_open and act_close == exp_close)
 
         status = "✓" if match else "✗"
         print(f"\n{status} ch {channel} ({exp['name']}):")
-        print(f"  期待値: open={exp['open']:2d}°, close={exp['close']:2d}°")
-        print(f"  実際値: open={actual['open']:2d}°, close={actual['close']:2d}°")
+        print(f"  期待値: open={exp_open:2d}°, close={exp_close:2d}°")
+        print(f"  実際値: open={act_open:2d}°, close={act_close:2d}°")
 
         if not match:
             all_match = False
@@ -121,16 +130,21 @@ def test_finger_mapping():
     test_channels = [0, 1, 2, 3, 5, 6, 7, 8]
     test_angles = [0, 90, 180]  # 開く、中間、閉じる
 
+    servo_config = mapper.SERVO_CONFIG
+    map_finger_to_servo = mapper.map_finger_to_servo
+
     for channel in test_channels:
-        config = mapper.SERVO_CONFIG[channel]
+        # チャンネルごとの設定は角度ループの外でローカル変数に展開
+        config = servo_config[channel]
+        open_angle, close_angle = config['open'], config['close']
         print(f"\nch {channel} ({config['type']}):")
 
         for finger_angle in test_angles:
-            servo_angle = mapper.map_finger_to_servo(finger_angle, channel=channel)
+            servo_angle = map_finger_to_servo(finger_angle, channel=channel)
 
             # 期待値を計算
             normalized = finger_angle / 180.0
-            expected = int(config['open'] + normalized * (config['close'] - config['open']))
+            expected = int(open_angle + normalized * (close_angle - open_angle))
 
             match = "✓" if servo_angle == expected else "✗"
             print(f"  {match} 指{finger_angle:3d}° → サーボ{servo_angle:3d}° (期待値: {expected:3d}°)")
@@ -187,20 +201,20 @@ def test_hand_to_servos():
     print("\n【全ての指が開いている状態（0°）】")
     print("期待される動作: ヒップは前、膝は上げる")
     servo_commands = mapper.map_hand_to_servos(test_data_open)
-    for channel in sorted(servo_commands.keys()):
-        angle = servo_commands[channel]
-        config = mapper.SERVO_CONFIG[channel]
-        expected = config['open']
+    for channel, expected, _ in _SORTED_CONFIG:
+        angle = servo_commands.get(channel)
+        if angle is None:
+            continue
         match = "✓" if angle == expected else "✗"
         print(f"  {match} ch {channel:2d}: {angle:3d}° (期待値: {expected:3d}° = open)")
 
     print("\n【全ての指が閉じている状態（180°）】")
     print("期待される動作: ヒップは後ろ、膝は下ろす")
     servo_commands = mapper.map_hand_to_servos(test_data_closed)
-    for channel in sorted(servo_commands.keys()):
-        angle = servo_commands[channel]
-        config = mapper.SERVO_CONFIG[channel]
-        expected = config['close']
+    for channel, _, expected in _SORTED_CONFIG:
+        angle = servo_commands.get(channel)
+        if angle is None:
+            continue
         match = "✓" if angle == expected else "✗"
         print(f"  {match} ch {channel:2d}: {angle:3d}° (期待値: {expected:3d}° = close)")
 
@@ -4,6 +4,107 @@ finger_mapper.pyの検証スクリプト（依存関係なし版）
 walk_program.inoのPWM値との整合性を確認
 """
 
+import contextlib
+import io
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None  # NumPyがなければスカラー計算で検証
+
+# 検証用テーブル（モジュール読み込み時に一度だけ構築し、各verify_*関数で共有）
+
+# walk_program.inoのPWM値（line 13-24）
+PWM_VALUES = {
+    "左ヒップ": {
+        "FORWARD": 150,
+        "NEUTRAL": 263,
+        "BACKWARD": 375
+    },
+    "右ヒップ": {
+        "FORWARD": 375,
+        "NEUTRAL": 263,
+        "BACKWARD": 150
+    },
+    "左膝": {
+        "UP": 150,
+        "DOWN": 350
+    },
+    "右膝": {
+        "UP": 350,
+        "DOWN": 150
+    }
+}
+
+# finger_mapper.pyのSERVO_CONFIG（手動で転記）
+SERVO_CONFIG = {
+    0: {'type': 'left_hip', 'open': 0, 'close': 90},      # FL hip
+    8: {'type': 'left_hip', 'open': 0, 'close': 90},      # BL hip
+    2: {'type': 'right_hip', 'open': 90, 'close': 0},     # FR hip
+    6: {'type': 'right_hip', 'open': 90, 'close': 0},     # BR hip
+    1: {'type': 'left_knee', 'open': 0, 'close': 80},     # FL knee
+    5: {'type': 'left_knee', 'open': 0, 'close': 80},     # BL knee
+    3: {'type': 'right_knee', 'open': 80, 'close': 0},    # FR knee
+    7: {'type': 'right_knee', 'open': 80, 'close': 0},    # BR knee
+}
+
+# 期待される値（walk_program.inoから計算）
+EXPECTED_CONFIG = {
+    # 左ヒップ: FORWARD=0°, BACKWARD=90°
+    0: {"open": 0, "close": 90, "name": "FL hip (左ヒップ)"},
+    8: {"open": 0, "close": 90, "name": "BL hip (左ヒップ)"},
+    # 右ヒップ: FORWARD=90°, BACKWARD=0°
+    2: {"open": 90, "close": 0, "name": "FR hip (右ヒップ)"},
+    6: {"open": 90, "close": 0, "name": "BR hip (右ヒップ)"},
+    # 左膝: UP=0°, DOWN=80°
+    1: {"open": 0, "close": 80, "name": "FL knee (左膝)"},
+    5: {"open": 0, "close": 80, "name": "BL knee (左膝)"},
+    # 右膝: UP=80°, DOWN=0°
+    3: {"open": 80, "close": 0, "name": "FR knee (右膝)"},
+    7: {"open": 80, "close": 0, "name": "BR knee (右膝)"},
+}
+
+# finger_mapper.pyのSERVO_MAPPING（手動で転記）
+SERVO_MAPPING = {
+    'left_hand': {
+        'thumb': 0,      # FL hip
+        'index': 2,      # FR hip
+        'middle': 8,     # BL hip
+        'ring': 6        # BR hip
+    },
+    'right_hand': {
+        'thumb': 1,      # FL knee
+        'index': 3,      # FR knee
+        'middle': 5,     # BL knee
+        'ring': 7        # BR knee
+    }
+}
+
+# 期待される値（walk_program.ino準拠）
+EXPECTED_MAPPING = {
+    'left_hand': {
+        'thumb': 0,      # FL hip
+        'index': 2,      # FR hip
+        'middle': 8,     # BL hip (ch 8使用！)
+        'ring': 6        # BR hip
+    },
+    'right_hand': {
+        'thumb': 1,      # FL knee
+        'index': 3,      # FR knee
+        'middle': 5,     # BL knee
+        'ring': 7        # BR knee
+    }
+}
+
+# チャンネル番号 → 脚の名前
+LEG_MAP = {
+    0: "FL hip", 1: "FL knee",
+    2: "FR hip", 3: "FR knee",
+    5: "BL knee", 6: "BR hip",
+    7: "BR knee", 8: "BL hip"
+}
+
 
 def pwm_to_angle(pwm):
     """PWM値を角度に変換（walk_program.inoの変換式）"""
@@ -16,29 +117,8 @@ def verify_pwm_mapping():
     print("walk_program.ino PWM値と角度の対応")
     print("=" * 60)
 
-    # walk_program.inoのPWM値（line 13-24）
-    pwm_values = {
-        "左ヒップ": {
-            "FORWARD": 150,
-            "NEUTRAL": 263,
-            "BACKWARD": 375
-        },
-        "右ヒップ": {
-            "FORWARD": 375,
-            "NEUTRAL": 263,
-            "BACKWARD": 150
-        },
-        "左膝": {
-            "UP": 150,
-            "DOWN": 350
-        },
-        "右膝": {
-            "UP": 350,
-            "DOWN": 150
-        }
-    }
 
-    for part, values in pwm_values.items():
+    for part, values in PWM_VALUES.items():
         print(f"\n{part}:")
         for state, pwm in values.items():
             angle = pwm_to_angle(pwm)
@@ -51,50 +131,23 @@ def verify_servo_config():
     print("SERVO_CONFIGの検証")
     print("=" * 60)
 
-    # finger_mapper.pyのSERVO_CONFIG（手動で転記）
-    servo_config = {
-        0: {'type': 'left_hip', 'open': 0, 'close': 90},      # FL hip
-        8: {'type': 'left_hip', 'open': 0, 'close': 90},      # BL hip
-        2: {'type': 'right_hip', 'open': 90, 'close': 0},     # FR hip
-        6: {'type': 'right_hip', 'open': 90, 'close': 0},     # BR hip
-        1: {'type': 'left_knee', 'open': 0, 'close': 80},     # FL knee
-        5: {'type': 'left_knee', 'open': 0, 'close': 80},     # BL knee
-        3: {'type': 'right_knee', 'open': 80, 'close': 0},    # FR knee
-        7: {'type': 'right_knee', 'open': 80, 'close': 0},    # BR knee
-    }
-
-    # 期待される値（walk_program.inoから計算）
-    expected = {
-        # 左ヒップ: FORWARD=0°, BACKWARD=90°
-        0: {"open": 0, "close": 90, "name": "FL hip (左ヒップ)"},
-        8: {"open": 0, "close": 90, "name": "BL hip (左ヒップ)"},
-        # 右ヒップ: FORWARD=90°, BACKWARD=0°
-        2: {"open": 90, "close": 0, "name": "FR hip (右ヒップ)"},
-        6: {"open": 90, "close": 0, "name": "BR hip (右ヒップ)"},
-        # 左膝: UP=0°, DOWN=80°
-        1: {"open": 0, "close": 80, "name": "FL knee (左膝)"},
-        5: {"open": 0, "close": 80, "name": "BL knee (左膝)"},
-        # 右膝: UP=80°, DOWN=0°
-        3: {"open": 80, "close": 0, "name": "FR knee (右膝)"},
-        7: {"open": 80, "close": 0, "name": "BR knee (右膝)"},
-    }
-
     all_match = True
-    for channel, exp in expected.items():
-        actual = servo_config.get(channel)
+    for channel, exp in EXPECTED_CONFIG.items():
+        actual = SERVO_CONFIG.get(channel)
 
         if actual is None:
             print(f"\n✗ ch {channel} ({exp['name']}): 設定なし")
             all_match = False
             continue
 
-        match = (actual['open'] == exp['open'] and
-                 actual['close'] == exp['close'])
+        exp_open, exp_close = exp['open'], exp['close']
+        act_open, act_close = actual['open'], actual['close']
+        match = (act_open == exp_open and act_close == exp_close)
 
         status = "✓" if match else "✗"
         print(f"\n{status} ch {channel} ({exp['name']}):")
-        print(f"  期待値: open={exp['open']:2d}°, close={exp['close']:2d}°")
-        print(f"  実際値: open={actual['open']:2d}°, close={actual['close']:2d}°")
+        print(f"  期待値: open={exp_open:2d}°, close={exp_close:2d}°")
+        print(f"  実際値: open={act_open:2d}°, close={act_close:2d}°")
 
         if not match:
             all_match = False
@@ -108,54 +161,16 @@ def verify_channel_mapping():
     print("SERVO_MAPPINGの検証")
     print("=" * 60)
 
-    # finger_mapper.pyのSERVO_MAPPING（手動で転記）
-    servo_mapping = {
-        'left_hand': {
-            'thumb': 0,      # FL hip
-            'index': 2,      # FR hip
-            'middle': 8,     # BL hip
-            'ring': 6        # BR hip
-        },
-        'right_hand': {
-            'thumb': 1,      # FL knee
-            'index': 3,      # FR knee
-            'middle': 5,     # BL knee
-            'ring': 7        # BR knee
-        }
-    }
-
-    # 期待される値（walk_program.ino準拠）
-    expected_mapping = {
-        'left_hand': {
-            'thumb': 0,      # FL hip
-            'index': 2,      # FR hip
-            'middle': 8,     # BL hip (ch 8使用！)
-            'ring': 6        # BR hip
-        },
-        'right_hand': {
-            'thumb': 1,      # FL knee
-            'index': 3,      # FR knee
-            'middle': 5,     # BL knee
-            'ring': 7        # BR knee
-        }
-    }
-
     all_match = True
-    for hand, fingers in expected_mapping.items():
+    for hand, fingers in EXPECTED_MAPPING.items():
         print(f"\n{hand}:")
+        hand_mapping = SERVO_MAPPING[hand]  # 手ごとのマッピングは指ループの外で引く
         for finger, expected_ch in fingers.items():
-            actual_ch = servo_mapping[hand][finger]
+            actual_ch = hand_mapping[finger]
             match = (actual_ch == expected_ch)
             status = "✓" if match else "✗"
 
-            leg_map = {
-                0: "FL hip", 1: "FL knee",
-                2: "FR hip", 3: "FR knee",
-                5: "BL knee", 6: "BR hip",
-                7: "BR knee", 8: "BL hip"
-            }
-
-            print(f"  {status} {finger:6s}: ch {actual_ch} ({leg_map.get(actual_ch, '?')})")
+            print(f"  {status} {finger:6s}: ch {actual_ch} ({LEG_MAP.get(actual_ch, '?')})")
 
             if not match:
                 all_match = False
@@ -169,21 +184,9 @@ def verify_mapping_logic():
     print("マッピングロジックの検証")
     print("=" * 60)
 
-    # SERVO_CONFIG
-    servo_config = {
-        0: {'type': 'left_hip', 'open': 0, 'close': 90},
-        8: {'type': 'left_hip', 'open': 0, 'close': 90},
-        2: {'type': 'right_hip', 'open': 90, 'close': 0},
-        6: {'type': 'right_hip', 'open': 90, 'close': 0},
-        1: {'type': 'left_knee', 'open': 0, 'close': 80},
-        5: {'type': 'left_knee', 'open': 0, 'close': 80},
-        3: {'type': 'right_knee', 'open': 80, 'close': 0},
-        7: {'type': 'right_knee', 'open': 80, 'close': 0},
-    }
-
     def map_finger_to_servo(finger_angle, channel):
         """finger_mapper.pyのロジックを再現"""
-        config = servo_config[channel]
+        config = SERVO_CONFIG[channel]
         open_angle = config['open']
         close_angle = config['close']
 
@@ -202,11 +205,26 @@ def verify_mapping_logic():
         (180, "指を閉じる（後ろ・下ろす）")
     ]
 
-    for finger_angle, description in test_cases:
+    channels = list(SERVO_CONFIG)
+    finger_angles = [finger_angle for finger_angle, _ in test_cases]
+
+    if np is not None:
+        # 全(指の角度 × チャンネル)をブロードキャストで一括計算
+        open_arr = np.array([SERVO_CONFIG[ch]['open'] for ch in channels])
+        close_arr = np.array([SERVO_CONFIG[ch]['close'] for ch in channels])
+        normalized = np.clip(np.array(finger_angles) / 180.0, 0.0, 1.0)
+        grid = (open_arr + normalized[:, None] * (close_arr - open_arr)).astype(np.int32)
+    else:
+        grid = [[map_finger_to_servo(finger_angle, ch) for ch in channels]
+                for finger_angle in finger_angles]
+
+    # ループは表示と期待値との比較のみ
+    for row, (finger_angle, description) in zip(grid, test_cases):
         print(f"\n【{description}】 指の角度: {finger_angle}°")
 
-        for channel, config in servo_config.items():
-            servo_angle = map_finger_to_servo(finger_angle, channel)
+        for channel, servo_angle in zip(channels, row):
+            config = SERVO_CONFIG[channel]
+            servo_angle = int(servo_angle)
 
             # 期待値
             if finger_angle == 0:
@@ -222,14 +240,7 @@ def verify_mapping_logic():
 
             match = "✓" if servo_angle == expected else "✗"
 
-            leg_map = {
-                0: "FL hip", 1: "FL knee",
-                2: "FR hip", 3: "FR knee",
-                5: "BL knee", 6: "BR hip",
-                7: "BR knee", 8: "BL hip"
-            }
-
-            print(f"  {match} ch {channel} ({leg_map[channel]:7s}): {servo_angle:3d}° (期待値: {expected:3d}°, {state})")
+            print(f"  {match} ch {channel} ({LEG_MAP[channel]:7s}): {servo_angle:3d}° (期待値: {expected:3d}°, {state})")
 
 
 def verify_creep_gait_compatibility():
@@ -310,4 +321,10 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    # レポート全体をメモリ上に組み立て、最後に1回で標準出力へ書き出す
+    # （数百回のprintごとの書き出しを避ける）
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        main()
+    sys.stdout.write(report.getvalue())
+    sys.stdout.flush()